@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Helpers shared by benchmark scripts to save, load, and compare results.
+"""
+import json
+import platform
+import datetime
+
+__all__ = ('compare', 'save', 'load')
+
+def compare(old, new, key, time, tolerance=1.25):
+    """
+    Return a list of (result, old time, new time) of results with times in
+    the `new` results larger than in the `old` results by more than the given
+    `tolerance` factor. Results are matched by the `key` function and times
+    are given by the `time` field.
+
+    Examples
+    --------
+    >>> old = [{'name': 'a', 'time': 1.0}, {'name': 'b', 'time': 1.0}]
+    >>> new = [{'name': 'a', 'time': 2.0}, {'name': 'b', 'time': 1.1}]
+    >>> compare(old, new, key=lambda i: i['name'], time='time')
+    [({'name': 'a', 'time': 2.0}, 1.0, 2.0)]
+
+    """
+    old = {key(i): i[time] for i in old}
+    regressions = []
+    for i in new:
+        old_time = old.get(key(i))
+        if old_time is not None and i[time] > tolerance * old_time:
+            regressions.append((i, old_time, i[time]))
+    return regressions
+
+def save(results, file):
+    """Save benchmark results and environment metadata as JSON."""
+    import numpy as np
+    import thermosteam as tmo
+    data = {
+        'metadata': {
+            'thermosteam': tmo.__version__,
+            'numpy': np.__version__,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+    with open(file, 'w') as f: json.dump(data, f, indent=1)
+
+def load(file):
+    """Return benchmark results from a JSON file."""
+    with open(file) as f: return json.load(f)['results']
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Benchmark of the time to import thermosteam (and other statements) in fresh
+Python processes, including the slowest modules reported by `python -X importtime`
+and heavy optional modules that were imported.
+
+Run from the repository root to time imports and save results as JSON::
+
+    python benchmarks/benchmark_import.py --output import.json
+
+Pass `--compare old.json` to report statements that became slower relative to
+a previous run (e.g., of a prior release).
+
+"""
+import sys
+import argparse
+import subprocess
+import statistics
+import _common
+from _common import save, load
+
+__all__ = ('statements', 'run', 'parse_importtime', 'compare', 'save', 'load')
+
+#: dict[str, str] Statements timed by name.
+statements = {
+    'import': 'import thermosteam',
+    'chemicals': "import thermosteam as tmo; tmo.Chemicals(['Water', 'Ethanol'])",
+}
+
+#: Heavy modules that should only be imported when used.
+optional_modules = ('matplotlib', 'matplotlib.pyplot')
+
+#: Number of slowest modules reported.
+top = 15
+
+script = """
+import sys, time
+start = time.perf_counter()
+exec({statement!r})
+time = time.perf_counter() - start
+print(repr((time, [i for i in {optional_modules!r} if i in sys.modules])))
+"""
+
+def parse_importtime(stderr):
+    """
+    Return a dictionary of cumulative import times [s] by module name from
+    the output of `python -X importtime`.
+
+    Examples
+    --------
+    >>> parse_importtime('import time: self [us] | cumulative | imported package\\n'
+    ...                  'import time:      150 |       2500 |   numpy')
+    {'numpy': 0.0025}
+
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'): continue
+        self_time, cumulative, name = line[12:].split('|')
+        cumulative = cumulative.strip()
+        if not cumulative.isdigit(): continue # Header
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+def time_statement(statement):
+    code = script.format(statement=statement, optional_modules=optional_modules)
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, check=True,
+    )
+    time, modules = eval(process.stdout.strip().splitlines()[-1])
+    return time, modules, parse_importtime(process.stderr)
+
+def run(names=None, repeat=5):
+    """
+    Return benchmark results as a list of dictionaries with the statement
+    name, the median and best wall times [s] over `repeat` fresh processes,
+    the slowest modules by cumulative import time [s] (of the last process),
+    and heavy optional modules that were imported.
+
+    """
+    results = []
+    for name, statement in statements.items():
+        if names is not None and name not in names: continue
+        times = []
+        for i in range(repeat):
+            time, modules, import_times = time_statement(statement)
+            times.append(time)
+        slowest = sorted(import_times.items(), key=lambda i: i[1], reverse=True)[:top]
+        results.append(
+            dict(name=name, statement=statement, median=statistics.median(times),
+                 best=min(times), slowest_modules=slowest,
+                 optional_modules=modules)
+        )
+    return results
+
+def compare(old, new, tolerance=1.25):
+    """
+    Return a list of (result, old time, new time) of statements with median
+    times in the `new` results larger than in the `old` results by more than
+    the given `tolerance` factor.
+
+    """
+    return _common.compare(old, new, lambda i: i['name'], 'median', tolerance)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--output', help='JSON file to save results')
+    parser.add_argument('--compare', help='JSON file of previous results')
+    parser.add_argument('--statements', nargs='+', choices=[*statements])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(args)
+    results = run(args.statements, args.repeat)
+    if args.output: save(results, args.output)
+    for i in results:
+        print(f"{i['name']}: {i['statement']}")
+        print(f"  median {i['median']:.3f} s, best {i['best']:.3f} s")
+        if i['optional_modules']:
+            print(f"  optional modules imported: {', '.join(i['optional_modules'])}")
+        print('  slowest modules (cumulative):')
+        for module, time in i['slowest_modules']:
+            print(f"    {module:<50}{time:>8.3f} s")
+    if args.compare:
+        regressions = compare(load(args.compare), results)
+        if regressions:
+            print('\nRegressions:')
+            for i, old_time, new_time in regressions:
+                print(f"{i['name']:<12}{old_time:>8.3f} -> {new_time:.3f} s")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Micro-benchmarks of SparseVector and SparseArray objects (with rows of
+dictionaries or views of a contiguous buffer) and of mixing material indexers
+versus dense NumPy arrays across vector sizes and fill ratios (fraction of
+nonzero entries).
+
+Run from the repository root to time all operations and save results as JSON::
+
+    python benchmarks/benchmark_sparse.py --output sparse.json
+
+Pass `--compare old.json` to report operations that became slower relative to
+a previous run (e.g., of a prior release).
+
+"""
+import sys
+import timeit
+import argparse
+import numpy as np
+import _common
+import thermosteam as tmo
+from _common import save, load
+from thermosteam.base import SparseVector, SparseArray
+from thermosteam.indexer import MaterialIndexer, ChemicalIndexer
+
+__all__ = ('operations', 'run', 'break_even', 'compare', 'save', 'load')
+
+#: Default vector sizes.
+sizes = (10, 100, 1000)
+
+#: Default fill ratios (fraction of nonzero entries).
+fill_ratios = (0.01, 0.1, 0.3, 0.6, 1.0)
+
+#: Number of rows of 2-d arrays (e.g., phases of a multi-phase stream).
+rows = 4
+
+#: Phases of material indexers.
+phases = ('g', 'l', 's', 'L')
+
+#: Number of vectors or arrays mixed in `mix_from` benchmarks.
+streams = 5
+
+def random_data(shape, fill_ratio, rng):
+    arr = np.zeros(shape)
+    flat = arr.reshape(-1)
+    N = max(1, round(fill_ratio * flat.size))
+    index = rng.choice(flat.size, N, replace=False)
+    flat[index] = rng.random(N) + 0.1
+    return arr
+
+def vector_operations(size, fill_ratio, rng):
+    a, b, *others = [random_data(size, fill_ratio, rng) for i in range(streams + 2)]
+    index = rng.choice(size, max(1, size // 10), replace=False).tolist()
+    sa, sb = SparseVector(a), SparseVector(b)
+    sothers = [SparseVector(i) for i in others]
+    stacked = np.array(others)
+    out, sout = a.copy(), SparseVector(a) # In-place operations write here
+    yield 'construction', lambda: SparseVector(a), lambda: np.array(a)
+    yield 'iadd', lambda: sout.__iadd__(sb), lambda: out.__iadd__(b)
+    yield 'mul', lambda: sa * sb, lambda: a * b
+    yield 'sum', sa.sum, a.sum
+    yield 'mix_from', lambda: sout.mix_from(sothers), lambda: np.add.reduce(stacked, 0, out=out)
+    yield 'getitem_list', lambda: sa[index], lambda: a[index]
+    yield 'to_array', sa.to_array, a.copy
+    yield 'copy_like', lambda: sout.copy_like(sb), lambda: out.__setitem__(..., b)
+
+def array_operations(size, fill_ratio, rng, contiguous=False):
+    shape = (rows, size)
+    a, b = [random_data(shape, fill_ratio, rng) for i in range(2)]
+    index = rng.choice(size, max(1, size // 10), replace=False).tolist()
+    if contiguous: # Rows are views of one 2d buffer, as in large material indexers
+        sparse_array = lambda arr: SparseArray.from_buffer(arr.copy())
+    else:
+        sparse_array = SparseArray
+    sa, sb = sparse_array(a), sparse_array(b)
+    out, sout = a.copy(), sparse_array(a) # In-place operations write here
+    yield 'construction', lambda: sparse_array(a), lambda: np.array(a)
+    yield 'iadd', lambda: sout.__iadd__(sb), lambda: out.__iadd__(b)
+    yield 'mul', lambda: sa * sb, lambda: a * b
+    yield 'sum', sa.sum, a.sum
+    yield 'getitem_list', lambda: sa[:, index], lambda: a[:, index]
+    yield 'to_array', sa.to_array, a.copy
+    yield 'copy_like', lambda: sout.copy_like(sb), lambda: out.__setitem__(..., b)
+
+def contiguous_array_operations(size, fill_ratio, rng):
+    return array_operations(size, fill_ratio, rng, contiguous=True)
+
+def get_chemicals(size, cache={}):
+    # Chemicals without properties; only their indices are used when mixing
+    if size not in cache:
+        chemicals = tmo.Chemicals([tmo.Chemical.blank(f'Chemical{i}') for i in range(size)])
+        chemicals.compile(skip_checks=True)
+        cache[size] = chemicals
+    return cache[size]
+
+def indexer_operations(size, fill_ratio, rng):
+    chemicals = get_chemicals(size)
+    shape = (len(phases), size)
+    def material_indexer(arr):
+        indexer = MaterialIndexer.blank(phases, chemicals)
+        indexer.data[:] = arr
+        return indexer
+    def chemical_indexer(arr, phase):
+        indexer = ChemicalIndexer.blank(phase, chemicals)
+        indexer.data[:] = arr
+        return indexer
+    material_data = [random_data(shape, fill_ratio, rng) for i in range(streams)]
+    chemical_data = [random_data(size, fill_ratio, rng) for i in range(streams)]
+    materials = [material_indexer(i) for i in material_data]
+    single_phases = [chemical_indexer(i, j) for i, j in zip(chemical_data, phases * streams)]
+    out, sout = np.zeros(shape), MaterialIndexer.blank(phases, chemicals)
+    stacked = np.array(material_data)
+    def mix_single_phases():
+        out[:] = 0.
+        for i, j in zip(chemical_data, range(streams)): out[j % len(phases)] += i
+    yield 'mix_from', lambda: sout.mix_from(materials), lambda: np.add.reduce(stacked, 0, out=out)
+    yield 'mix_from_phases', lambda: sout.mix_from(single_phases), mix_single_phases
+    yield 'copy_like', lambda: sout.copy_like(materials[0]), lambda: out.__setitem__(..., material_data[0])
+
+#: dict[str, function] Generators of (operation, sparse function, dense function) by kind.
+operations = {
+    'vector': vector_operations,
+    'array': array_operations,
+    'contiguous': contiguous_array_operations,
+    'indexer': indexer_operations,
+}
+
+def best_time(f, repeat, min_time):
+    timer = timeit.Timer(f)
+    number = 1
+    while timer.timeit(number) < min_time: number *= 10
+    return min(timer.repeat(repeat, number)) / number
+
+def run(sizes=sizes, fill_ratios=fill_ratios, kinds=None, names=None,
+        repeat=3, min_time=0.01, seed=0):
+    """
+    Return benchmark results as a list of dictionaries with the kind of
+    sparse object, operation, size, fill ratio, and the best time per call
+    [s] of the sparse object and the dense NumPy array.
+
+    Parameters
+    ----------
+    sizes : Iterable[int], optional
+        Vector sizes.
+    fill_ratios : Iterable[float], optional
+        Fractions of nonzero entries.
+    kinds : Iterable[str], optional
+        Kinds of benchmarks ('vector', 'array', 'contiguous', and/or 'indexer').
+        Defaults to all.
+    names : Iterable[str], optional
+        Operations to time. Defaults to all.
+    repeat : int, optional
+        Number of timing repeats; the best is kept.
+    min_time : float, optional
+        Minimum time [s] of each timing repeat.
+    seed : int, optional
+        Seed of random data.
+
+    Examples
+    --------
+    >>> results = run(sizes=[10], fill_ratios=[0.5], names=['sum'], repeat=1, min_time=1e-4)
+    >>> [(i['kind'], i['operation'], i['size'], i['fill_ratio']) for i in results]
+    [('vector', 'sum', 10, 0.5), ('array', 'sum', 10, 0.5), ('contiguous', 'sum', 10, 0.5)]
+
+    """
+    if kinds is None: kinds = operations
+    if names is not None: names = set(names)
+    rng = np.random.default_rng(seed)
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            for fill_ratio in fill_ratios:
+                for name, sparse, dense in operations[kind](size, fill_ratio, rng):
+                    if names is not None and name not in names: continue
+                    sparse_time = best_time(sparse, repeat, min_time)
+                    dense_time = best_time(dense, repeat, min_time)
+                    results.append(
+                        dict(kind=kind, operation=name, size=size,
+                             fill_ratio=fill_ratio, sparse=sparse_time,
+                             dense=dense_time, ratio=sparse_time / dense_time)
+                    )
+    return results
+
+def break_even(results):
+    """
+    Return a dictionary of the largest fill ratio at which the sparse object
+    is at least as fast as the dense array by (kind, operation, size). The
+    fill ratio is None if dense arrays are always faster.
+
+    """
+    points = {}
+    for i in results:
+        key = (i['kind'], i['operation'], i['size'])
+        fill_ratio = points.get(key)
+        if i['ratio'] <= 1. and (fill_ratio is None or i['fill_ratio'] > fill_ratio):
+            fill_ratio = i['fill_ratio']
+        points[key] = fill_ratio
+    return points
+
+def compare(old, new, tolerance=1.25):
+    """
+    Return a list of (result, old time, new time) of sparse operations that
+    are slower in the `new` results than in the `old` results by more than
+    the given `tolerance` factor.
+
+    """
+    key = lambda i: (i['kind'], i['operation'], i['size'], i['fill_ratio'])
+    return _common.compare(old, new, key, 'sparse', tolerance)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--output', help='JSON file to save results')
+    parser.add_argument('--compare', help='JSON file of previous results')
+    parser.add_argument('--sizes', type=int, nargs='+', default=sizes)
+    parser.add_argument('--fill-ratios', type=float, nargs='+', default=fill_ratios)
+    parser.add_argument('--kinds', nargs='+', choices=[*operations])
+    parser.add_argument('--operations', nargs='+')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(args)
+    results = run(args.sizes, args.fill_ratios, args.kinds, args.operations, args.repeat)
+    if args.output: save(results, args.output)
+    print(f"{'kind':<11}{'operation':<17}{'size':>6}{'fill':>7}{'sparse [us]':>13}{'dense [us]':>12}{'ratio':>8}")
+    for i in results:
+        print(f"{i['kind']:<11}{i['operation']:<17}{i['size']:>6}{i['fill_ratio']:>7.2f}"
+              f"{1e6 * i['sparse']:>13.2f}{1e6 * i['dense']:>12.2f}{i['ratio']:>8.2f}")
+    print('\nBreak-even fill ratio (sparse at least as fast as dense):')
+    for (kind, name, size), fill_ratio in break_even(results).items():
+        print(f"{kind:<11}{name:<17}{size:>6}  {'never' if fill_ratio is None else fill_ratio}")
+    if args.compare:
+        regressions = compare(load(args.compare), results)
+        if regressions:
+            print('\nRegressions:')
+            for i, old_time, new_time in regressions:
+                print(f"{i['kind']:<11}{i['operation']:<17}{i['size']:>6}{i['fill_ratio']:>7.2f}"
+                      f"{1e6 * old_time:>13.2f} -> {1e6 * new_time:.2f} us")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,6 +24,207 @@ def test_chemical_ID_parsing():
     with pytest.raises(ValueError):
         tmo.Chemical('CO2,v')
     
+def test_heat_capacity_integrals():
+    from scipy.integrate import quad
+    from thermosteam.free_energy import HeatCapacityIntegral
+    for ID in ('Water', 'Ethanol', 'CO', 'Benzene'):
+        Cn = tmo.Chemical(ID).H.l.Cn_l
+        assert isinstance(Cn, HeatCapacityIntegral) and Cn.compiled
+        model = Cn.model
+        Tmin, Tmax = model.T_limits[model.method]
+        for T1, T2 in [(Tmin - 10, 0.5 * (Tmin + Tmax)), (0.5 * (Tmin + Tmax), Tmax + 20)]:
+            assert_allclose(
+                Cn.T_dependent_property_integral(T1, T2),
+                model.T_dependent_property_integral(T1, T2),
+                rtol=1e-7,
+            )
+            assert_allclose(
+                Cn.T_dependent_property_integral_over_T(T1, T2),
+                quad(lambda T: model(T) / T, T1, T2, limit=200)[0],
+                rtol=1e-7,
+            )
+
+def test_tabulation():
+    import numpy as np
+    from thermosteam.mixture import TDependentArray
+    chemicals = tmo.Chemicals(['Water', 'Glucose'])
+    Water, Glucose = chemicals
+    Psat = TDependentArray([Water.Psat, Glucose.Psat])
+    assert Psat.compiled == [False, False]
+    tabulations = chemicals.tabulate(['Psat', 'mu'], rtol=1e-5)
+    assert set(tabulations['Water']) == {'Psat'}
+    assert 'mu.l' in tabulations['Glucose']
+    for chemical in chemicals:
+        for key, tabulation in chemical.tabulations.items():
+            model = chemical.Psat if key == 'Psat' else getattr(chemical.mu, key[-1])
+            assert model.method == 'TABULATED'
+            assert tabulation.error < 1e-5
+            assert tabulation.check(model, 500) < 2e-5
+    Psat(350) # Tabulated methods are compiled on the fly
+    assert Psat.compiled == [True, False]
+    T = np.linspace(300, 600, 7)
+    assert_allclose(
+        [Psat(i)[0] for i in T],
+        [Water.Psat.calculate(i, 'IAPWS_PSAT') for i in T],
+        rtol=1e-5,
+    )
+    chemicals.untabulate()
+    assert Water.Psat.method == 'IAPWS_PSAT'
+    assert Glucose.mu.l.method == 'LETSOU_STIEL'
+    assert not Water.tabulations and not Glucose.tabulations
+    assert Psat.compiled == [True, False] and Psat(350) is not None
+    assert Psat.compiled == [False, False]
+
+def test_vapor_pressure_array():
+    import numpy as np
+    from thermosteam.mixture import VaporPressureArray
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', 'Glucose', 'Octane', 'Benzene', 'Methanol'])
+    chemicals.Methanol.Psat.method = 'LEE_KESLER_PSAT'
+    methods = [i.Psat.method for i in chemicals]
+    assert {'AMBROSE_WALTON', 'LEE_KESLER_PSAT', 'IAPWS_PSAT'}.issubset(methods)
+    Psat = VaporPressureArray(chemicals)
+    assert Psat.compiled == [i != 'IAPWS_PSAT' for i in methods]
+    T = np.array([250., 300., 350., 450., 550.])
+    Psats, dPsats_dT = Psat(T, derivative=True)
+    for k, Ti in enumerate(T):
+        assert_allclose(Psats[k], [i.Psat(Ti) for i in chemicals], rtol=1e-12)
+        assert_allclose(dPsats_dT[k], [i.Psat.T_dependent_property_derivative(Ti) for i in chemicals], rtol=1e-6)
+        values, derivatives = Psat(Ti, derivative=True)
+        assert_allclose(values, Psats[k], rtol=1e-14)
+        assert_allclose(derivatives, dPsats_dT[k], rtol=1e-14)
+    chemicals.Methanol.Psat.method = 'AMBROSE_WALTON'
+    assert_allclose(Psat(300.)[-1], chemicals.Methanol.Psat(300.), rtol=1e-12) # Compiled again
+
+def test_chemical_disk_cache():
+    import os, tempfile
+    path = tempfile.mkdtemp()
+    tmo.Chemical.enable_disk_cache(path)
+    try:
+        cache = tmo.Chemical.disk_cache
+        Water = tmo.Chemical('Water')
+        Water_g = tmo.Chemical('Water,g')
+        Water_custom = tmo.Chemical('Water', Psat=101325.) # Never cached
+        assert len(os.listdir(cache.path)) == 2
+        for chemical, ID in [(Water, 'Water'), (Water_g, 'Water,g')]:
+            cached = tmo.Chemical(ID)
+            assert cached is not chemical
+            assert cached.locked_state == chemical.locked_state
+            assert cached.CAS == chemical.CAS
+            assert cached.Psat(350) == chemical.Psat(350)
+            assert cached.Hvap(350) == chemical.Hvap(350)
+        assert tmo.Chemical('Water', Psat=101325.).Psat(350) == Water_custom.Psat(350) == 101325.
+        assert tmo.Chemical.disk_cache is cache
+        assert tmo.utils.DiskCache(path, 'other version').get(('Water',)) is None
+        cache.clear()
+        assert not os.path.exists(cache.path)
+    finally:
+        tmo.Chemical.disable_disk_cache()
+
+def test_lazy_import():
+    import sys, subprocess
+    code = (
+        "import sys, thermosteam\n"
+        "from chemicals.identifiers import pubchem_db\n"
+        "from thermosteam.equilibrium import unifac\n"
+        "print('matplotlib' in sys.modules, len(pubchem_db.unloaded_files),"
+        " unifac.UFIP._data is None, unifac.DDBST_UNIFAC_assignments._data is None)"
+    )
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                            text=True, check=True).stdout.split()
+    assert output == ['False', '6', 'True', 'True']
+    from thermosteam.equilibrium import unifac
+    assert len(unifac.UFIP) > 0 and unifac.UFIP[1][2] == unifac.UFIP.data[1][2]
+    assert 'LFQSCWFLJHTTHZ-UHFFFAOYSA-N' in unifac.DDBST_UNIFAC_assignments
+    assert isinstance(unifac.DDBST_UNIFAC_assignments['LFQSCWFLJHTTHZ-UHFFFAOYSA-N'],
+                      unifac.UNIFACGroupCounts)
+
+def test_chemical_metadata_index():
+    import os, tempfile, shutil
+    from chemicals.identifiers import folder
+    from thermosteam.chemicals.identifiers import ChemicalMetadataDB, ChemicalMetadataIndex
+    files = [os.path.join(folder, 'Inorganic db.tsv'),
+             os.path.join(folder, 'Anion db.tsv'),
+             os.path.join(folder, 'chemical identifiers pubchem small.tsv')]
+    index_folder = ChemicalMetadataDB.index_folder
+    index_size = ChemicalMetadataDB.index_size
+    ChemicalMetadataDB.index_folder = None
+    try:
+        db = ChemicalMetadataDB(files)
+        ChemicalMetadataDB.index_folder = tempfile.mkdtemp()
+        ChemicalMetadataDB.index_size = 0 # Index all files before loading any
+        indexed_db = ChemicalMetadataDB(files)
+        assert indexed_db.index is None
+        IDs = ['Water', 'C2H6O', '64-17-5', 'InChIKey=LFQSCWFLJHTTHZ-UHFFFAOYSA-N',
+               'SMILES=CCO', 'PubChem=702', 'monatomic oxygen', 'O', 'Cl-', 'Na']
+        for ID in IDs:
+            ChemicalMetadataDB.cache.clear()
+            expected = db.search(ID)
+            ChemicalMetadataDB.cache.clear()
+            assert indexed_db.search(ID) == expected
+            assert indexed_db.level == db.level
+        expected_water = db.search('Water')
+        assert isinstance(indexed_db.index, ChemicalMetadataIndex)
+        assert os.listdir(ChemicalMetadataDB.index_folder) == [os.path.basename(indexed_db.index.file)]
+        reused_db = ChemicalMetadataDB(files)
+        assert reused_db.search_name('sodium') is not None # Opens index
+        assert reused_db.index.file == indexed_db.index.file # Reused
+        with pytest.raises(LookupError):
+            indexed_db.search('not a chemical')
+        indexed_db.index.close()
+        reused_db.index.close()
+        
+        # Indices depend on file contents (not paths) and are replaced when rebuilt
+        copies = []
+        for i in files:
+            copy = os.path.join(tempfile.mkdtemp(), os.path.basename(i))
+            shutil.copyfile(i, copy)
+            copies.append(copy)
+        assert ChemicalMetadataIndex.file_name(copies[::-1]) == os.path.basename(indexed_db.index.file)
+        with open(copies[-1]) as f: line = f.readline()
+        with open(copies[-1], 'a') as f: f.write(line) # Change contents
+        stale_file = os.path.join(ChemicalMetadataDB.index_folder, 'stale.tmp')
+        open(stale_file, 'w').close()
+        rebuilt_db = ChemicalMetadataDB(copies)
+        ChemicalMetadataDB.cache.clear()
+        assert rebuilt_db.search('Water') == expected_water
+        assert rebuilt_db.index.file != indexed_db.index.file
+        assert os.listdir(ChemicalMetadataDB.index_folder) == [os.path.basename(rebuilt_db.index.file)]
+        rebuilt_db.index.close()
+    finally:
+        ChemicalMetadataDB.index_folder = index_folder
+        ChemicalMetadataDB.index_size = index_size
+        ChemicalMetadataDB.cache.clear()
+
+def test_chemical_metadata_index_folder():
+    import os
+    from thermosteam.chemicals.identifiers import default_index_folder
+    environ = os.environ.copy()
+    try:
+        os.environ['THERMOSTEAM_IDENTIFIER_INDEX'] = 'none'
+        assert default_index_folder() is None # Disabled
+        os.environ['THERMOSTEAM_IDENTIFIER_INDEX'] = ''
+        assert default_index_folder() is None # Disabled
+        os.environ['THERMOSTEAM_IDENTIFIER_INDEX'] = folder = os.path.join('some', 'folder')
+        assert default_index_folder() == folder
+        del os.environ['THERMOSTEAM_IDENTIFIER_INDEX']
+        assert default_index_folder() == os.path.join(os.path.expanduser('~'), '.thermosteam', 'identifiers')
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+
+def test_chemical_memory_cache():
+    cache = tmo.Chemical.chemical_cache
+    maxsize = cache.maxsize
+    cache.resize(2)
+    try:
+        Water = tmo.Chemical('Water', cache=True)
+        Ethanol = tmo.Chemical('Ethanol', cache=True)
+        assert tmo.Chemical('Water', cache=True) is Water
+        tmo.Chemical('Methanol', cache=True) # Discards ethanol, the least recently used
+        assert 'Ethanol' not in cache and tmo.Chemical('Water', cache=True) is Water
+    finally:
+        cache.resize(maxsize)
+
 def test_chemical_creation():
     CAS = ['12385-13-6', '7440-59-7', '7439-93-2', '7440-41-7', '7440-42-8',
            '7440-44-0', '17778-88-0', '17778-80-2', '14762-94-8', '7440-01-9',
@@ -33,7 +33,65 @@ def test_chemical_cache():
     assert chemicals_a.Water is chemicals_c.Water
     assert chemicals_b.O2 is chemicals_c.O2
     
+def test_property_arrays():
+    from thermosteam.mixture import PropertyArrays, TDependentArray
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', 'Methanol', 'Glycerol', 'CO2', 'O2', 'Octane', 'Hexane'], cache=True)
+    chemicals.compile()
+    arrays = PropertyArrays(chemicals)
+    for phase, Ts in [('l', (280., 320., 360.)), ('g', (360., 400., 450.))]:
+        for T in Ts:
+            for P in (1e4, 101325., 1e6):
+                for var, values in arrays(phase, T, P).items():
+                    expected = [getattr(i, var)(phase, T, P) for i in chemicals]
+                    assert_allclose(values, expected, rtol=1e-9)
+    Psat = TDependentArray([i.Psat for i in chemicals])
+    index = [0, 1, 2]
+    assert_allclose(Psat(350., index)[index], [i.Psat(350.) for i in chemicals.tuple[:3]], rtol=1e-9)
     
+def test_eos_cache():
+    from thermosteam.mixture import EOSCache
+    mixture = tmo.PRMixture.from_chemicals(['Water', 'Ethanol', 'Methanol'])
+    cache = mixture.cache
+    maxsize, maxmemory = cache.maxsize, cache.maxmemory
+    cache.clear()
+    try:
+        H = mixture.H('l', [0.5, 0.3, 0.2], 350, 101325)
+        assert len(cache) == 1 and cache.memory > 0
+        # Objects at the same state are reused
+        eos = [*cache.values()][0]
+        assert_allclose(mixture.H('l', [0.5, 0.3, 0.2], 350, 101325), H, rtol=1e-12)
+        assert [*cache.values()][0] is eos
+        memory = cache.memory
+        for mol in ([1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 0]):
+            mixture.H('l', mol, 350, 101325)
+        assert len(cache) == 5 and cache.memory > memory
+        cache.resize(maxsize=3)
+        assert len(cache) == 3
+        cache.resize(maxmemory=1)
+        assert len(cache) == 1 and cache.memory == sum(cache.sizes.values())
+        del cache[next(iter(cache))]
+        assert cache.memory == 0
+        # Results do not depend on the cache
+        assert_allclose(mixture.H('l', [0.5, 0.3, 0.2], 350, 101325), H, rtol=1e-12)
+        assert isinstance(cache, EOSCache)
+    finally:
+        cache.clear()
+        cache.resize(maxsize, maxmemory)
+
+def test_eos_departures():
+    mixture = tmo.PRMixture.from_chemicals(['Water', 'Ethanol'])
+    mol = [0.5, 0.5]
+    for phase, T in [('l', 350), ('g', 400)]:
+        H_dep, S_dep, Cn_dep = mixture.departures(phase, mol, T, 101325)
+        assert mixture.departures(phase, mol, T, 101325) is mixture.departures(phase, mol, T, 101325)
+        assert_allclose(mixture.H(phase, mol, T, 101325) - mixture.H_ideal(phase, mol, T, 101325), H_dep)
+        assert_allclose(mixture.S(phase, mol, T, 101325) - mixture.S_ideal(phase, mol, T, 101325), S_dep)
+        # Heat capacity is consistent with enthalpy
+        dT = 1e-3
+        dH = mixture.H(phase, mol, T + dT, 101325) - mixture.H(phase, mol, T - dT, 101325)
+        assert_allclose(mixture.Cn(phase, mol, T, 101325), dH / (2 * dT), rtol=1e-5)
+
 if __name__ == '__main__':
     test_aliases()
-    test_chemical_cache()
\ No newline at end of file
+    test_chemical_cache()
+    test_property_arrays()
\ No newline at end of file
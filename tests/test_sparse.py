@@ -11,7 +11,7 @@ import pytest
 import numpy as np
 from thermosteam.base import (
     SparseVector, SparseLogicalVector, SparseArray, sparse_vector, sparse_array,
-    nonzero_items, sparse
+    nonzero_items, sparse, BitSet, CopyOnWriteDict
 )
 from numpy.testing import assert_allclose
 
@@ -1026,6 +1026,161 @@ def test_sparse_array_methods_vs_numpy():
         with pytest.raises(ValueError):
             sa.max()
 
+def test_sparse_vector_dense_storage():
+    from thermosteam.base.sparse import DenseDict
+    size = SparseVector.dense_min_size
+    arr = np.zeros(size)
+    arr[::2] = np.arange(1, size // 2 + 1)
+    sv = SparseVector.from_array(arr)
+    assert sv.dense and sv.dct.__class__ is DenseDict
+    assert_no_zero_data(sv)
+    assert sv.sparse_equal(arr)
+    assert sv.sum() == arr.sum()
+    
+    # Math operations match the dictionary storage
+    other = arr[::-1].copy()
+    sparse_sv = SparseVector.from_dict(dict(nonzero_items(arr)), size)
+    assert not sparse_sv.dense
+    assert (sv + other == sparse_sv + other).all()
+    assert (sv * other == sparse_sv * other).all()
+    assert (sv - sparse_sv == 0).all()
+    sv += other
+    assert_allclose(sv.to_array(), arr + other)
+    sv[:] = arr
+    assert sv.sparse_equal(arr)
+    
+    # Storage switches back to a dictionary when sparse enough
+    sv[:] = 0.
+    assert not sv.dense
+    sv[1] = 2.
+    assert sv.dct == {1: 2.}
+    
+    # Mixing dense vectors
+    mixed = SparseVector.from_size(size)
+    mixed.mix_from([SparseVector.from_array(arr), SparseVector.from_array(other)])
+    assert mixed.dense
+    assert_allclose(mixed.to_array(), arr + other)
+    
+    # Size is not strict
+    sv = SparseVector.from_array(arr)
+    sv[size + 1] = 1.
+    assert not sv.dense
+    assert sv[size + 1] == 1.
+    
+    # Missing keys default to zero, which is not stored
+    dct = DenseDict(arr.copy())
+    assert dct.setdefault(1, None) == 0. and 1 not in dct
+    assert dct.setdefault(1) == 0. and 1 not in dct
+    assert dct.setdefault(1, 3.) == 3. and dct[1] == 3.
+    assert dct.setdefault(1, None) == 3.
+
+def test_sparse_array_contiguous_buffer():
+    arr = np.array([[1., 2., 0., 4.5],
+                    [0., 0., 1., 1.5]])
+    sa = SparseArray.from_buffer(arr.copy())
+    assert sa.contiguous
+    rows = sa.rows
+    other = sparse_array(arr)
+    assert not other.contiguous
+    for method in ('__add__', '__sub__', '__mul__'):
+        result = getattr(sa, method)(arr[::-1])
+        assert result.contiguous
+        assert_allclose(result.to_array(), getattr(arr, method)(arr[::-1]))
+        assert_allclose(result.to_array(), getattr(other, method)(arr[::-1]).to_array())
+    assert_allclose((sa + 2).to_array(), arr + 2)
+    assert_allclose((sa + sa[1]).to_array(), arr + arr[1])
+    assert_allclose((-sa).to_array(), -arr)
+    assert_allclose(sa.sum(0).to_array(), arr.sum(0))
+    assert_allclose(sa.sum(1).to_array(), arr.sum(1))
+    assert sa.sum() == arr.sum()
+    assert sa.max() == arr.max()
+    assert sa.any(0).sparse_equal(arr.any(0))
+    assert (sa[:, 3] == arr[:, 3]).all()
+    
+    # In-place operations write through to the rows
+    sa *= 2
+    assert sa.rows is rows
+    assert_allclose(rows[0].to_array(), 2 * arr[0])
+    sa[:] = arr
+    assert_allclose(sa.to_array(), arr)
+    sa.from_flat_array(2 * sa.to_flat_array())
+    assert_allclose(sa.to_array(), 2 * arr)
+    new = sa.copy()
+    new.clear()
+    assert new.contiguous and not new.any()
+    assert_allclose(sa.to_array(), 2 * arr)
+    new.copy_like(sa)
+    assert_allclose(new.to_array(), 2 * arr)
+    
+    # Replacing row storage falls back to row by row operations
+    rows[0].to_sparse_storage()
+    assert not sa.contiguous
+    assert_allclose((sa + arr).to_array(), 3 * arr)
+    sa.make_contiguous()
+    assert sa.contiguous and sa.rows is rows
+    assert_allclose((sa + arr).to_array(), 3 * arr)
+
+def test_sparse_logical_vector_bitset():
+    size = 70 # More bits than a machine word
+    a = np.zeros(size, bool)
+    b = a.copy()
+    a[[0, 3, 65, 69]] = True
+    b[[3, 4, 69]] = True
+    sa = SparseLogicalVector(a)
+    sb = SparseLogicalVector(b)
+    assert isinstance(sa.set, BitSet)
+    assert sa.set == {0, 3, 65, 69}
+    for x, y in ((sa & sb, a & b), (sa | sb, a | b), (sa ^ sb, a ^ b), (~sa, ~a)):
+        assert (x.to_array() == y).all()
+        assert x.tolist() == y.tolist()
+    assert sa.any() and not sa.all()
+    assert (~SparseLogicalVector(size=size)).all()
+    assert sa.nonzero_index() == ([0, 3, 65, 69],)
+    sc = sa.copy()
+    sc &= sb
+    assert sc.set == {3, 69} and sa.set == {0, 3, 65, 69}
+    sc[:] = False
+    assert not sc.any() and not sc.set
+    arr = SparseArray([a, b])
+    assert (arr.any(0).to_array() == (a | b)).all()
+    assert (arr.all(0).to_array() == (a & b)).all()
+    assert_allclose(arr.sum(0).to_array(), a.astype(int) + b)
+
+def test_sparse_vector_copy_on_write():
+    size = 200
+    N = max(SparseVector.copy_on_write_min_size, 10)
+    arr = np.zeros(size)
+    arr[:N] = np.arange(1, N + 1)
+    sv = SparseVector.from_dict({i: float(j) for i, j in enumerate(arr) if j}, size)
+    copies = [sv.copy() for i in range(3)]
+    assert all([i.dct.__class__ is CopyOnWriteDict for i in (sv, *copies)])
+    a, b, c = copies
+    a[0] = 10.
+    assert sv[0] == 1. and b[0] == 1. and a[0] == 10.
+    sv += 1
+    assert_allclose(b.to_array(), arr)
+    assert_allclose(sv.to_array()[:N], arr[:N] + 1)
+    b.clear()
+    assert not b.any() and c.sum() == arr.sum()
+    c.mix_from([c, c])
+    assert_allclose(c.to_array(), 2 * arr)
+    b.copy_like(a)
+    assert b.dct.__class__ is CopyOnWriteDict
+    b[1] = 0.
+    assert b[1] == 0. and a[1] == 2.
+    d = a.copy()
+    stale = d.dct
+    arr2d = SparseArray.from_rows([d])
+    arr2d.make_contiguous()
+    arr2d[0, 1] = 0.
+    stale[2] = 0. # Writes to replaced storage must not leak into shared data
+    assert d[1] == 0. and d[2] == 3. and a[1] == 2. and a[2] == 3.
+    small = SparseVector([0., 1.])
+    if SparseVector.copy_on_write_min_size > 1: assert small.copy().dct.__class__ is dict
+    dense = SparseVector.from_array(np.ones(size))
+    assert dense.copy().dct.array is not dense.dct.array
+    assert_no_zero_data(b)
+
 if __name__ == '__main__':
     test_sparse_vector_creation()
     test_sparse_array_creation()
@@ -1045,4 +1200,8 @@ if __name__ == '__main__':
     test_descriptive_methods()
     test_read_only_flag()
     test_sparse_vector_methods_vs_numpy()
-    test_sparse_array_methods_vs_numpy()
\ No newline at end of file
+    test_sparse_array_methods_vs_numpy()
+    test_sparse_vector_dense_storage()
+    test_sparse_array_contiguous_buffer()
+    test_sparse_logical_vector_bitset()
+    test_sparse_vector_copy_on_write()
\ No newline at end of file
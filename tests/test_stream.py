@@ -11,6 +11,7 @@ if __name__ == '__main__':
     import os
     os.environ["NUMBA_DISABLE_JIT"] = "1"
 import pytest
+import numpy as np
 import thermosteam as tmo
 from numpy.testing import assert_allclose
 
@@ -365,6 +366,142 @@ def test_stream_property_cache():
     values = [getprop(i, T, True) for i, T in zip(IDs, Ts)]
     values_cache = [getprop(i, T, False) for i, T in zip(IDs, Ts)]
     assert_allclose(values, values_cache)
+    
+    # Make sure cache is invalidated when flow rates change in place 
+    # (including through shared flow buffers)
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    s = tmo.Stream(None, Water=2, T=299.15)
+    ms = tmo.MultiStream(None, l=[('Water', 2)], g=[('Ethanol', 1)], T=350)
+    for stream in (s, ms):
+        def check(stream):
+            cached = stream.rho, stream.Cn
+            stream._property_cache.clear()
+            assert_allclose(cached, (stream.rho, stream.Cn))
+        key = lambda ID: ('l', ID) if stream is ms else ID
+        check(stream)
+        stream.imol[key('Ethanol')] = 1
+        check(stream)
+        stream.imass[key('Water')] += 10
+        check(stream)
+        with tmo.FlowBuffer([stream]) as buffer:
+            buffer.get_flow(0, 'l')[:] = [1, 3]
+            check(stream)
+
+def test_stream_property_cache_states():
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    PropertyCache = tmo.utils.PropertyCache
+    PropertyCache.counting = True
+    try:
+        # Properties at recent states are retrieved from the cache
+        s = tmo.Stream(None, Water=2, Ethanol=1, T=300)
+        Ts = [300, 350, 300, 350]
+        values = []
+        for T in Ts:
+            s.T = T
+            values.append(s.Cn)
+        cache = s.property_cache
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert_allclose(values[:2], values[2:])
+        assert len(cache) == 2
+        
+        # Least recently used states are discarded
+        cache.resize(1)
+        assert len(cache) == 1
+        
+        # Streams with the same composition may share the cache
+        cache = PropertyCache()
+        s1 = tmo.Stream(None, Water=2, Ethanol=1, T=300)
+        s2 = tmo.Stream(None, Water=4, Ethanol=2, T=300)
+        s1.property_cache = s2.property_cache = cache
+        Cn = s1.Cn
+        assert s2.Cn == Cn and s2.C == 6 * Cn
+        assert (cache.hits, cache.misses) == (2, 1)
+        cache.reset_counters()
+        assert cache.hit_rate == 0.
+        
+        # Phases of multi-phase streams share the cache
+        ms = tmo.MultiStream(None, l=[('Water', 2)], g=[('Ethanol', 1)], T=350)
+        assert ms['l'].property_cache is ms.property_cache
+        H = ms.H
+        ms.T = 360
+        assert ms.H != H
+        ms.T = 350
+        assert ms.H == H
+        assert ms.property_cache.hits == 1
+    finally:
+        PropertyCache.counting = False
+
+
+def test_free_energies_with_missing_data():
+    # Free energies of chemicals that cannot be evaluated at the anchor 
+    # temperature (e.g., gaseous glucose) are not compiled, so that they do 
+    # not affect the free energies of mixtures without these chemicals
+    IDs = ['Water', 'Ethanol', 'Methanol', 'Acetone', 'Hexane', 'Benzene', 'Toluene', 'Octane']
+    tmo.settings.set_thermo([*IDs, 'Glucose'], cache=True)
+    stream = tmo.Stream(None, **{i: 1 for i in IDs}, phase='g', T=400)
+    chemicals = stream.chemicals
+    assert_allclose(stream.H, sum([chemicals[i].H('g', 400) for i in IDs]), rtol=1e-9)
+    assert_allclose(stream.S, tmo.settings.mixture.S('g', stream.mol, 400, 101325), rtol=1e-9)
+
+def test_stream_batch_property():
+    tmo.settings.set_thermo(['Water', 'Ethanol', 'Methanol', 'Glycerol', 'Octane', 'Hexane', 'Toluene', 'Benzene', 'O2'], cache=True)
+    streams = [
+        tmo.Stream(None, Water=20, Ethanol=10, T=340),
+        tmo.Stream(None, Water=5, Methanol=1, Glycerol=2, Octane=3, Hexane=1, Toluene=1, Benzene=2, Ethanol=1, T=310),
+        tmo.Stream(None, O2=5, Ethanol=1, phase='g', T=400),
+        tmo.MultiStream(None, l=[('Water', 10)], g=[('Ethanol', 10)], T=360),
+        tmo.Stream(None),
+    ]
+    for name in tmo.Stream.batch_properties:
+        values = tmo.Stream.batch_property(streams, name)
+        expected = [getattr(i, name) for i in streams]
+        if expected[-1] is None: 
+            assert np.isnan(values[-1])
+            values = values[:-1]
+            expected = expected[:-1]
+        assert_allclose(values, expected, rtol=1e-9)
+    with pytest.raises(ValueError):
+        tmo.Stream.batch_property(streams, 'sigma')
+    
+    # Mixture batches are consistent with state by state evaluation
+    mixture = tmo.settings.mixture
+    mol = np.array([i.mol.to_array() for i in streams[:2]])
+    T = [340, 310]
+    for name in ('H', 'S', 'Cn', 'V', 'mu', 'kappa'):
+        assert_allclose(
+            mixture.batch(name, 'l', mol, T, 101325),
+            tmo.mixture.Mixture.batch(mixture, name, 'l', mol, T, 101325),
+            rtol=1e-9,
+        )
+    assert_allclose(
+        mixture.xH_batch([('l', mol), ('g', mol)], 400, 101325),
+        [mixture.xH([('l', i), ('g', i)], 400, 101325) for i in mol],
+        rtol=1e-9,
+    )
+
+def test_energy_balance_warm_start():
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    mixture = tmo.settings.mixture
+    feed = tmo.Stream(None, Water=20, Ethanol=10, T=300)
+    product = tmo.Stream(None)
+    for T in (350, 350.5, 351):
+        feed.T = T
+        H = feed.H + 1e4
+        product.copy_like(feed)
+        product.H = H
+        assert_allclose(product.H, H, rtol=1e-7)
+    # Last solution is closer than the feed temperature
+    assert mixture.T_iter <= 2
+    gas = tmo.Stream(None, Water=20, Ethanol=10, T=400, phase='g')
+    S = gas.S
+    gas.T = 500
+    gas.S = S
+    assert_allclose(gas.T, 400, atol=1e-6)
+    ms = tmo.MultiStream(None, l=[('Water', 10)], g=[('Ethanol', 10)], T=360)
+    H = ms.H
+    ms.T = 300
+    ms.H = H
+    assert_allclose(ms.T, 360, atol=1e-6)
 
 def test_mixing_balance():
     tmo.settings.set_thermo(['Water'], cache=True)
@@ -393,6 +530,81 @@ def test_mixing_phases():
     assert ms.phases == ('g', 'l') # 'L' phase gets added to 'l' phase
     assert ms.imol['l', 'Water'] == 2
 
+def test_mixing_different_chemicals():
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    s1 = tmo.Stream(None, Water=1, Ethanol=2)
+    tmo.settings.set_thermo(['Ethanol', 'Methanol', 'Water'], cache=True)
+    ms = tmo.MultiStream(None, l=[('Water', 1), ('Ethanol', 1)], g=[('Methanol', 2)])
+    s2 = tmo.Stream(None, Methanol=1, phase='g')
+    s_mix = tmo.MultiStream(None)
+    for i in range(2): # Second time uses the cached mixing plan
+        s_mix.mix_from([s1, ms, s2])
+        assert_allclose(s_mix.imol['l', ('Water', 'Ethanol', 'Methanol')], [2, 3, 0])
+        assert_allclose(s_mix.imol['g', ('Water', 'Ethanol', 'Methanol')], [0, 0, 3])
+    s3 = tmo.Stream(None, Methanol=1)
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    s_mix = tmo.MultiStream(None)
+    with pytest.raises(tmo.exceptions.UndefinedChemicalAlias):
+        s_mix.mix_from([s1, s3])
+
+def test_flow_buffer():
+    import os
+    import pickle
+    import tempfile
+    tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    s1 = tmo.Stream(None, Water=1)
+    s2 = tmo.MultiStream(None, l=[('Water', 2)], g=[('Ethanol', 3)], T=360)
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, 'flows.dat')
+        for kwargs in ({}, {'filename': filename}):
+            buffer = tmo.FlowBuffer([s1, s2], **kwargs)
+            assert_allclose(buffer.get_flow(1, 'g'), [0, 3])
+            s1.imol['Ethanol'] = 4
+            assert_allclose(buffer.get_flow(0, 'l'), [1, 4])
+            attached = pickle.loads(pickle.dumps(buffer))
+            attached.get_flow(1, 'l')[1] = 5
+            assert s2.imol['l', 'Ethanol'] == 5
+            attached.conditions[1] = (350, 2 * 101325)
+            attached.close()
+            buffer.load_conditions()
+            assert s2.T == 350 and s2.P == 2 * 101325
+            buffer.close()
+            s2.imol['l', 'Ethanol'] = 0
+            s1.imol['Ethanol'] = 0
+            s2.T = 360; s2.P = 101325
+            assert_allclose(s1.mol, [1, 0])
+            assert_allclose(s2.imol['g'], [0, 3])
+
+def test_chemical_accessor():
+    chemicals = tmo.Chemicals(['Water', 'Methanol', 'Ethanol'], cache=True)
+    chemicals.compile()
+    chemicals.define_group('Alcohol', ['Methanol', 'Ethanol'], composition=[0.5, 0.5])
+    tmo.settings.set_thermo(chemicals)
+    s = tmo.Stream(None, Water=1, Methanol=1, Ethanol=1)
+    accessor = s.imol.accessor(['Water', 'Alcohol'])
+    assert_allclose(accessor.get(), [1, 2])
+    accessor.set([3, 4])
+    assert_allclose(s.mol, [3, 2, 2])
+    assert s.imol.accessor('Ethanol').get() == 2
+    ms = tmo.MultiStream(None, l=[('Water', 1)], g=[('Ethanol', 2)])
+    accessor = ms.imol.accessor(('Water', 'Ethanol'))
+    assert_allclose(accessor.get(), [1, 2])
+    with pytest.raises(IndexError):
+        accessor.set([1, 1])
+    accessor = ms.imol.accessor(('Water', 'Ethanol'), 'g')
+    accessor.set([1, 1])
+    assert_allclose(ms.imol['g', ('Water', 'Ethanol')], [1, 1])
+    assert_allclose(ms.imol['l', ('Water', 'Ethanol')], [1, 0])
+    chemicals.set_index_cache_size(2)
+    for i in ('Water', 'Methanol', 'Ethanol'): 
+        s.imol[i]
+        ms.imol['l', i]
+    assert len(chemicals._index_cache) == 2
+    assert chemicals._index_cache.maxsize == ms.imol._index_cache.maxsize == 2
+    assert len(ms.imol._index_cache) <= 2
+    new = tmo.MultiStream(None, phases=('l', 's'))
+    assert new.imol._index_cache.maxsize == 2
+
 def test_mixing_pressure():
     P = 111458
     s1 = tmo.Stream(None, Water=1000, P=P)
@@ -437,6 +649,167 @@ def test_vle_critical_pure_component():
     assert s.phase == 'g'
     s.vle(P=N2.Pc, S=s.S + 10)
     assert s.phase == 'g'
+
+def test_bubble_and_dew_point_newton_solver():
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', 'Methanol', 'Propanol'], cache=True)
+    tmo.settings.set_thermo(chemicals)
+    BP = tmo.equilibrium.BubblePoint(chemicals)
+    DP = tmo.equilibrium.DewPoint(chemicals)
+    Gamma = BP.gamma
+    x = np.array([0.4, 0.3, 0.2, 0.1])
+    gamma, dlngamma_dT = Gamma.gamma_and_dlngamma_dT(x, 350.)
+    assert_allclose(gamma, Gamma(x, 350.))
+    assert_allclose(
+        dlngamma_dT, 
+        tmo.equilibrium.ActivityCoefficients.gamma_and_dlngamma_dT(Gamma, x, 350.)[1],
+        rtol=1e-6, 
+    )
+    for P in (2e4, 101325, 5e5):
+        for z in ([0.4, 0.3, 0.2, 0.1], [0.1, 0.2, 0.3, 0.4], [0.7, 0.1, 0.1, 0.1]):
+            z = np.array(z)
+            T, y = BP.solve_Ty(z, P, solver='secant')
+            assert BP.T_iter is None
+            T_newton, y_newton = BP.solve_Ty(z, P, solver='newton')
+            assert 0 < BP.T_iter < BP.maxiter
+            assert_allclose(T_newton, T, rtol=1e-9)
+            assert_allclose(y_newton, y, rtol=1e-6)
+            T, x = DP.solve_Tx(z, P, solver='secant')
+            assert DP.T_iter is None
+            T_newton, x_newton = DP.solve_Tx(z, P, solver='newton')
+            assert 0 < DP.T_iter < DP.maxiter
+            assert_allclose(T_newton, T, rtol=1e-6)
+            assert_allclose(x_newton, x, rtol=1e-4)
+    # Warm start from the last solution
+    BP.solve_Ty(z, P, solver='newton')
+    assert BP.T_iter == 1
+    with pytest.raises(ValueError):
+        BP.solve_Ty(z, P, solver='bisection')
+
+def test_bubble_and_dew_point_batch():
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', 'Methanol', 'Propanol'], cache=True)
+    tmo.settings.set_thermo(chemicals)
+    BP = tmo.equilibrium.BubblePoint(chemicals)
+    DP = tmo.equilibrium.DewPoint(chemicals)
+    Z = np.array([
+        [0.4, 0.3, 0.2, 0.1],
+        [0.1, 0.2, 0.3, 0.4],
+        [0.7, 0.1, 0.1, 0.1],
+        [0.5, 0.5, 0., 0.],
+        [0., 0., 1., 0.],
+    ])
+    Gamma = BP.gamma
+    gamma, dlngamma_dT = Gamma.batch(Z, 350., derivative=True)
+    for x, gamma_x, dlngamma_dT_x in zip(Z, gamma, dlngamma_dT):
+        expected = Gamma.gamma_and_dlngamma_dT(x, 350.)
+        assert_allclose(gamma_x, expected[0])
+        assert_allclose(dlngamma_dT_x, expected[1], atol=1e-12)
+    def assert_rows_equal(batch, solve, Z, V):
+        values, compositions = batch(Z, V)
+        for z, v, value, composition in zip(Z, np.broadcast_to(V, len(Z)), values, compositions):
+            expected_value, expected_composition = solve(z, v)
+            assert_allclose(value, expected_value, rtol=1e-6)
+            assert_allclose(composition, expected_composition, rtol=1e-6, atol=1e-9)
+    
+    for P in (2e4, 101325):
+        assert_rows_equal(BP.solve_Ty_batch, BP.solve_Ty, Z, P)
+        assert_rows_equal(DP.solve_Tx_batch, DP.solve_Tx, Z, P)
+    T = np.linspace(300, 350, len(Z))
+    assert_rows_equal(BP.solve_Py_batch, BP.solve_Py, Z, T)
+    assert_rows_equal(DP.solve_Px_batch, DP.solve_Px, Z, T)
+    with pytest.raises(ValueError):
+        BP.solve_Ty_batch([[0., 0., 0., 0.]], 101325)
+    
+def test_dew_point_batch_at_high_temperatures():
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', 'Methanol', 'Glycerol'], cache=True)
+    tmo.settings.set_thermo(chemicals)
+    DP = tmo.equilibrium.DewPoint(chemicals)
+    Z = np.array([
+        [0.1, 0.1, 0.1, 0.7],
+        [0.05, 0., 0.05, 0.9],
+        [0.3, 0., 0., 0.7],
+        [0.01, 0.01, 0.01, 0.97],
+    ])
+    # Batch and single-point dew points share the same Newton solver but 
+    # start from different guesses and liquid compositions, so temperatures
+    # agree within the tolerance of the liquid composition loop (1e-6 K) 
+    # rather than `T_tol`, also at high temperatures (up to 632 K).
+    for P in (101325, 5e5):
+        T, X = DP.solve_Tx_batch(Z, P)
+        assert (T > 540.).all()
+        for z, T_batch, x_batch in zip(Z, T, X):
+            DP.T_last = None
+            T_single, x_single = DP.solve_Tx(z, P, solver='newton')
+            assert_allclose(T_batch, T_single, rtol=0, atol=1e-6)
+            assert_allclose(x_batch, x_single, rtol=1e-6, atol=1e-9)
+    
+def test_warm_started_dew_points():
+    chemicals = tmo.Chemicals(['Water', 'Ethanol', 'Methanol', 'Glycerol', 'AceticAcid', 'Hexane'], cache=True)
+    tmo.settings.set_thermo(chemicals)
+    DP = tmo.equilibrium.DewPoint(chemicals)
+    Z = np.array([
+        [0.2, 0.2, 0.2, 0.1, 0.1, 0.2],
+        [0.784, 0., 0.02, 0., 0., 0.741],
+        [0.751, 0.269, 0.553, 0., 0., 0.72],
+        [0., 0., 0.483, 0., 0., 0.424],
+        [0.003, 0.05, 0.007, 0., 0., 0.139],
+        [0.33, 0.012, 0., 0., 0.144, 0.862],
+        [0.097, 0.005, 0.255, 0., 0.028, 0.522],
+        [0.194, 0.507, 0.835, 0., 0.001, 0.955],
+        [0.497, 0.294, 0., 0., 0.03, 0.],
+        [0.962, 0.5, 0.523, 0.953, 0.034, 0.],
+    ])
+    for P in (101325, 5e5):
+        # Each dew point is warm started from the last one
+        DP.T_last = None
+        T_newton = [DP.solve_Tx(z, P, solver='newton')[0] for z in Z]
+        T_secant = [DP.solve_Tx(z, P, solver='secant')[0] for z in Z]
+        assert_allclose(T_newton, T_secant, rtol=0, atol=1e-6)
+    
+def test_bounded_equilibrium_caches():
+    from thermosteam.equilibrium import equilibrium_caches
+    chemicals = [*tmo.Chemicals(['Water', 'Ethanol', 'Methanol', 'Propanol'], cache=True)]
+    tmo.settings.set_thermo(chemicals)
+    caches = equilibrium_caches['BubblePoint'], equilibrium_caches['DortmundActivityCoefficients']
+    equilibrium_caches.clear()
+    try:
+        equilibrium_caches.resize(maxsize=2)
+        subsets = [(0, 1), (0, 2), (0, 3), (1, 2)]
+        for i in subsets: tmo.equilibrium.BubblePoint([chemicals[j] for j in i])
+        for cache in caches:
+            assert len(cache) == 2
+            assert cache.memory == sum(cache.sizes.values()) > 0
+        bp = tmo.equilibrium.BubblePoint([chemicals[1], chemicals[2]])
+        assert tmo.equilibrium.BubblePoint([chemicals[1], chemicals[2]]) is bp
+        assert_allclose(bp(z=[0.5, 0.5], P=101325).T, 344.8, atol=1) # Still works after eviction
+        equilibrium_caches.resize(maxmemory=1) # Keeps only the most recently used object
+        assert all([len(i) == 1 for i in caches])
+        tmo.equilibrium.clear_equilibrium_caches()
+        assert equilibrium_caches.memory == 0
+        assert tmo.equilibrium.BubblePoint([chemicals[1], chemicals[2]]) is not bp
+    finally:
+        equilibrium_caches.resize(maxsize=256, maxmemory=2e7)
+    
+def test_vle_K_value_warm_start():
+    tmo.settings.set_thermo(['Water', 'Ethanol', 'Methanol', 'Propanol'], cache=True)
+    K_cache = tmo.equilibrium.VLE.K_cache
+    K_cache.clear()
+    K_cache.reset_counters()
+    s = tmo.Stream(None, Water=50, Ethanol=20, Methanol=10, Propanol=5)
+    s.vle(T=360, P=101325)
+    assert K_cache.misses and not K_cache.hits and len(K_cache) == 1
+    copy = tmo.Stream(None, Water=50, Ethanol=20.001, Methanol=10, Propanol=5)
+    copy.vle(T=360, P=101325) # Nearly identical state warm starts from cached K-values
+    assert K_cache.hits == 1
+    assert_allclose(copy.imol['g'], s.imol['g'], rtol=1e-3)
+    cold = tmo.Stream(None, Water=50, Ethanol=20.001, Methanol=10, Propanol=5)
+    tmo.equilibrium.VLE.K_cache = None
+    try:
+        cold.vle(T=360, P=101325)
+    finally:
+        tmo.equilibrium.VLE.K_cache = K_cache
+    assert_allclose(copy.imol['g'], cold.imol['g'], rtol=1e-5)
+    tmo.equilibrium.clear_equilibrium_caches()
+    assert not K_cache
     
 if __name__ == '__main__':
     test_registration_bypass()
@@ -449,8 +822,21 @@ if __name__ == '__main__':
     test_vlle()
     stream_methods()
     test_stream_property_cache()
+    test_stream_property_cache_states()
+    test_free_energies_with_missing_data()
+    test_stream_batch_property()
+    test_energy_balance_warm_start()
     test_vle_critical_pure_component()
     test_critical()
     test_mixture()
     test_mixing_phases()
-    test_mixing_pressure()
\ No newline at end of file
+    test_mixing_different_chemicals()
+    test_flow_buffer()
+    test_chemical_accessor()
+    test_mixing_pressure()
+    test_bubble_and_dew_point_newton_solver()
+    test_bubble_and_dew_point_batch()
+    test_dew_point_batch_at_high_temperatures()
+    test_warm_started_dew_points()
+    test_bounded_equilibrium_caches()
+    test_vle_K_value_warm_start()
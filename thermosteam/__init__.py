@@ -65,6 +65,7 @@ from . import (
 from ._stream import Stream
 from ._heat_and_power import Heat, Power
 from ._multi_stream import MultiStream
+from ._flow_buffer import FlowBuffer
 from .base import functor
 from .reaction import *
 from .equilibrium import * 
@@ -73,7 +74,7 @@ from ._preferences import preferences
 
 __all__ = ('Chemical', 'ChemicalData', 'Chemicals', 'CompiledChemicals', 
            'ChemicalDraft', 'ChemicalsOutline', 'Thermo', 'IdealThermo', 
-           'Stream', 'MultiStream', 'Heat', 'Power', 'ThermalCondition', 'ProcessSettings',
+           'Stream', 'MultiStream', 'FlowBuffer', 'Heat', 'Power', 'ThermalCondition', 'ProcessSettings',
            'mixture', 'ThermoData', *reaction.__all__, *equilibrium.__all__,  *mixture.__all__,
            *network.__all__, 'preferences',
            'indexer', 'settings', 'functor', 'functors', 'chemicals', 'base', 
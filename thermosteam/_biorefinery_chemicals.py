@@ -6,7 +6,12 @@ from chemicals.identifiers import pubchem_db
 
 biorefinery_chemicals = {}
 
+#: list[tuple[function, tuple[str]]] Chemical creators and aliases to register 
+#: on first search (registration searches the chemical identifier database).
+unregistered = []
+
 def search_biorefinery_chemicals(ID, **kwargs):
+    if unregistered: register_all()
     if ID in biorefinery_chemicals: 
         f = biorefinery_chemicals[ID]
     else:
@@ -50,11 +55,18 @@ def _register(f, aliases):
     for i in keys: biorefinery_chemicals[i] = f
     return f
 
+def register_all():
+    while unregistered: _register(*unregistered.pop(0))
+
+def defer_registration(f, aliases):
+    unregistered.append((f, aliases))
+    return f
+
 def register(*aliases):
     if len(aliases) == 1 and not isinstance(aliases[0], str):
-        return _register(aliases[0], ())
+        return defer_registration(aliases[0], ())
     else:
-        return lambda f: _register(f, aliases)
+        return lambda f: defer_registration(f, aliases)
 
 # %% Non-interacting solids
 
@@ -48,7 +48,8 @@ from .free_energy import (
     Excess_Liquid_Enthalpy_Ref_Liquid,
     Excess_Liquid_Entropy_Ref_Liquid,
     Excess_Gas_Enthalpy_Ref_Gas,
-    Excess_Gas_Entropy_Ref_Gas
+    Excess_Gas_Entropy_Ref_Gas,
+    compile_heat_capacity,
 )
 from .equilibrium.unifac import (
     DDBST_UNIFAC_assignments, 
@@ -64,12 +65,16 @@ from ._biorefinery_chemicals import search_biorefinery_chemicals
 from .base import (PhaseHandle, PhaseTHandle, PhaseTPHandle,
                    display_asfunctor)
 from .units_of_measure import chemical_units_of_measure, Quantity
-from .utils import copy_maybe, check_valid_ID
+from .utils import copy_maybe, check_valid_ID, LRUCache, DiskCache
 from . import functional as fn 
 from ._phase import check_phase, valid_phases
 from . import units_of_measure as thermo_units
 from chemicals.utils import Z
 from thermo.eos import IG, PR, SRK
+import chemicals
+import thermo
+import sys
+import os
 from thermo import (
     TDependentProperty, TPDependentProperty,
     VaporPressure, 
@@ -195,6 +200,29 @@ def reset_energy_constant(chemical, var, value):
         elif hasfield(handle, var):
             setfield(handle, var, value)
 
+def iter_models(chemical, names=None):
+    # Yield keys (e.g., 'Psat' or 'mu.l') and temperature dependent models.
+    getfield = getattr
+    isa = isinstance
+    if names is None: names = _model_and_phase_properties
+    for name in names:
+        if name not in _model_and_phase_properties:
+            raise ValueError(f"{name} is not a valid model name; "
+                              "names must be a subset of "
+                             f"{_model_and_phase_properties}")
+        handle = getfield(chemical, '_' + name)
+        if isa(handle, PhaseHandle):
+            for phase, model in handle:
+                if isa(model, TDependentProperty): yield f'{name}.{phase}', model
+        elif isa(handle, TDependentProperty):
+            yield name, handle
+
+def chemical_cache_version():
+    # Chemicals pickled by other package versions are never loaded
+    python = '.'.join([str(i) for i in sys.version_info[:2]])
+    return (f"thermosteam-{tmo.__version__}_thermo-{thermo.__version__}_"
+            f"chemicals-{chemicals.__version__}_python-{python}")
+
 def raise_helpful_handle_error(var, handle):
     if isinstance(handle, PhaseHandle):
         raise AttributeError(
@@ -505,10 +533,14 @@ class Chemical:
     P_ref = 101325.
     #: [float] Reference enthalpy in J/mol.
     H_ref = 0.
-    #: dict[str, Chemical] Cached chemicals.
-    chemical_cache = {}
+    #: dict[str, Chemical] Cached chemicals (least recently used are discarded).
+    chemical_cache = LRUCache(1000)
     #: [bool] Wheather or not to search cache by default.
     cache = False
+    #: [DiskCache|None] Pickled chemicals on disk (see `Chemical.enable_disk_cache`).
+    disk_cache = None
+    #: [str] Default directory of pickled chemicals.
+    disk_cache_path = os.path.join(os.path.expanduser('~'), '.thermosteam', 'chemicals')
     #: [str] Default database to search chemicals.
     default_db = 'ChEDL'
     
@@ -539,6 +571,17 @@ class Chemical:
             ID = ID[:-2]
         search_ID = search_ID or ID
         if db == 'default': db = cls.default_db
+        disk_cache = cls.disk_cache
+        if (disk_cache is None or cls is not Chemical or not search_db or db is None
+            or any([eos, V, Cn, mu, Cp, rho, sigma, kappa, epsilon, Psat, Hvap, method, data])):
+            disk_key = None
+        else:
+            disk_key = (ID, search_ID, db, CAS, phase, phase_ref, bool(default),
+                        cls.EOS_default.__name__, cls.T_ref, cls.P_ref, cls.H_ref)
+            self = disk_cache.get(disk_key)
+            if self is not None:
+                if cache: chemical_cache[ID] = self
+                return self
         if not search_db or db is None: 
             self = cls.blank(ID, CAS, phase_ref, phase=phase, free_energies=False, **data)
         elif db == 'BioSTEAM':
@@ -580,16 +623,42 @@ class Chemical:
             if Cp: self._Cn.add_method(Cp if MW is None else Cp * MW)
             if rho: self._V.add_method(fn.rho_to_V(rho, 1.) if MW is None else fn.rho_to_V(rho, MW))
         if default: self.default()
-        if cache:
-            chemical_cache[ID] = self
-            if len(chemical_cache) > 1000:
-                for i in chemical_cache:
-                    del chemical_cache[i]
-                    break
+        if cache: chemical_cache[ID] = self
         if method: self.set_method(method)
         self.reset_free_energies()
+        if disk_key is not None: disk_cache[disk_key] = self
         return self
 
+    @classmethod
+    def enable_disk_cache(cls, path=None):
+        """
+        Load chemicals created only by identifier (and optionally phase, 
+        CAS, `phase_ref`, and `default`) from pickle files instead of 
+        rebuilding property models from databases. Pickle files are saved
+        in the `path` directory (defaults to `Chemical.disk_cache_path`) under a 
+        subdirectory named by thermosteam, thermo, chemicals, and Python 
+        versions. Loaded chemicals are independent copies.
+        
+        Examples
+        --------
+        >>> import tempfile
+        >>> from thermosteam import Chemical
+        >>> Chemical.enable_disk_cache(tempfile.mkdtemp())
+        >>> Water = Chemical('Water') # Pickled after creation
+        >>> Water_cached = Chemical('Water') # Loaded from disk
+        >>> Water_cached is Water, Water_cached.Psat(350) == Water.Psat(350)
+        (False, True)
+        >>> Chemical.disable_disk_cache()
+        
+        """
+        cls.disk_cache = DiskCache(cls.disk_cache_path if path is None else path,
+                                   chemical_cache_version())
+    
+    @classmethod
+    def disable_disk_cache(cls):
+        """Stop loading and saving pickled chemicals."""
+        cls.disk_cache = None
+
     def set_method(self, method):
         for name in _model_handles:
             model_handle = getattr(self, name)
@@ -1725,13 +1794,14 @@ class Chemical:
         Tc = self._Tc
         single_phase = self._locked_state
         if isinstance(Cn, PhaseHandle):
-            Cn_s = Cn.s
-            Cn_l = Cn.l
-            Cn_g = Cn.g
+            Cn_s = compile_heat_capacity(Cn.s)
+            Cn_l = compile_heat_capacity(Cn.l)
+            Cn_g = compile_heat_capacity(Cn.g)
             has_Cns = bool(Cn_s)
             has_Cnl = bool(Cn_l)
             has_Cng = bool(Cn_g)
         elif single_phase:
+            Cn = compile_heat_capacity(Cn)
             self._H = Enthalpy.functor(Cn, T_ref, H_ref)
             if single_phase == 'g':
                 self._S = EntropyGas.functor(Cn, T_ref, P_ref, S0)
@@ -2082,6 +2152,69 @@ class Chemical:
                         setfield(handle, i, new_handle)
         if {'_Cn', '_Hvap'}.intersection(names): self.reset_free_energies()
     
+    def tabulate(self, names=None, rtol=1e-5):
+        """
+        Replace expensive methods of temperature dependent models with
+        Chebyshev interpolants (evaluated as polynomial correlations) that meet
+        the relative tolerance over the valid temperature range of each method.
+        Return a dictionary of Tabulation objects by model key (e.g., 'Psat'
+        or 'mu.l'). Models with correlations or without temperature limits
+        are not tabulated.
+        
+        Parameters
+        ----------
+        names : Iterable[str], optional
+            Names of models to tabulate. Defaults to all models.
+        rtol : float, optional
+            Relative tolerance of interpolants.
+        
+        Examples
+        --------
+        >>> from thermosteam import Chemical
+        >>> Water = Chemical('Water')
+        >>> tabulations = Water.tabulate(['Psat'])
+        >>> tabulations
+        {'Psat': Tabulation(method='IAPWS_PSAT', T=(235, 647.1), degree=20, log=True, error=8.2e-06)}
+        >>> Water.Psat.method
+        'TABULATED'
+        >>> Water.untabulate()
+        >>> Water.Psat.method
+        'IAPWS_PSAT'
+        
+        """
+        tabulations = {}
+        for key, model in iter_models(self, names):
+            tabulation = model.tabulate(rtol)
+            if tabulation is not None: tabulations[key] = tabulation
+        return tabulations
+    
+    def untabulate(self, names=None):
+        """Select the original methods of tabulated models."""
+        for key, model in iter_models(self, names): model.untabulate()
+    
+    @property
+    def tabulations(self):
+        """[dict[str, Tabulation]] Tabulation objects of models with tabulated 
+        methods selected by model key (e.g., 'Psat' or 'mu.l')."""
+        return {key: model.tabulation for key, model in iter_models(self)
+                if model.tabulation is not None and model.method == 'TABULATED'}
+    
+    def apply_tabulations(self, tabulations):
+        """
+        Select tabulated methods given a dictionary of Tabulation objects by model key
+        (e.g., 'Psat' or 'mu.l'). Tabulations are only applied to models
+        whose selected method is the original tabulated method. Return the
+        keys of applied tabulations.
+        """
+        applied = []
+        for key, model in iter_models(self):
+            if key not in tabulations: continue
+            tabulation = tabulations[key]
+            if model.method != tabulation.method: continue
+            tabulation.apply(model)
+            applied.append(key)
+        return applied
+    
     @property
     def locked_state(self):
         """[str] Constant phase of chemical."""
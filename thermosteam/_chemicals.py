@@ -8,18 +8,27 @@
 """
 """
 from . import utils
+from .utils import LRUCache
 from .exceptions import UndefinedChemicalAlias
 from ._chemical import Chemical
 from .indexer import ChemicalIndexer, SplitIndexer
+from .base import BitSet
+from .thermo.tabulation import Tabulation
 from collections.abc import Sequence
+from warnings import warn
 import thermosteam as tmo
 import numpy as np
+import thermo
+import json
 
 __all__ = ('Chemicals', 'CompiledChemicals', 'ChemicalDraft', 'ChemicalsOutline')
 setattr = object.__setattr__
     
 # %% Functions
 
+def tabulation_version():
+    return [tmo.__version__, thermo.__version__]
+
 def must_compile(*args, **kwargs): # pragma: no cover
     raise TypeError("method valid only for compiled chemicals; "
                     "run <Chemicals>.compile() to compile")
@@ -307,6 +316,86 @@ class Chemicals:
         else:
             for chemical in chemicals: self.append(chemical)
     
+    def tabulate(self, names=None, rtol=1e-5):
+        """
+        Replace expensive methods of temperature dependent models with
+        Chebyshev interpolants that meet the relative tolerance (see 
+        `Chemical.tabulate`). Return a dictionary of Tabulation objects by
+        chemical ID and model key (e.g., 'Psat' or 'mu.l').
+        
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'])
+        >>> chemicals.tabulate(['Psat'])
+        {'Water': {'Psat': Tabulation(method='IAPWS_PSAT', T=(235, 647.1), degree=20, log=True, error=8.2e-06)}}
+        >>> chemicals.untabulate()
+        
+        """
+        tabulations = {}
+        for chemical in self:
+            dct = chemical.tabulate(names, rtol)
+            if dct: tabulations[chemical.ID] = dct
+        return tabulations
+    
+    def untabulate(self, names=None):
+        """Select the original methods of tabulated models."""
+        for chemical in self: chemical.untabulate(names)
+    
+    def save_tabulations(self, file):
+        """
+        Save tabulated methods of all chemicals as a JSON file. Files are
+        versioned by thermosteam and thermo versions.
+        
+        Examples
+        --------
+        >>> import os, tempfile, thermosteam as tmo
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'])
+        >>> tabulations = chemicals.tabulate(['Psat'])
+        >>> file = os.path.join(tempfile.mkdtemp(), 'tabulations.json')
+        >>> chemicals.save_tabulations(file)
+        >>> chemicals.untabulate()
+        >>> chemicals.load_tabulations(file)
+        {'Water': ['Psat']}
+        >>> chemicals.Water.Psat.method
+        'TABULATED'
+        >>> chemicals.untabulate()
+        
+        """
+        data = {
+            'version': tabulation_version(),
+            'chemicals': {
+                i.ID: {key: j.to_dict() for key, j in i.tabulations.items()}
+                for i in self
+            }
+        }
+        with open(file, 'w') as f: json.dump(data, f)
+    
+    def load_tabulations(self, file):
+        """
+        Select tabulated methods saved in a JSON file (see `save_tabulations`).
+        Tabulations are only applied to models whose selected method is the
+        original tabulated method. Return the applied model keys by chemical ID. 
+        Nothing is loaded from files of other thermosteam or thermo versions.
+        
+        """
+        with open(file) as f: data = json.load(f)
+        if data.get('version') != tabulation_version():
+            warn(f"tabulations in {file!r} were not loaded; file version "
+                 f"{data.get('version')} does not match {tabulation_version()}",
+                 RuntimeWarning, stacklevel=2)
+            return {}
+        tabulations = data['chemicals']
+        applied = {}
+        for chemical in self:
+            ID = chemical.ID
+            if ID not in tabulations: continue
+            keys = chemical.apply_tabulations(
+                {key: Tabulation.from_dict(i) for key, i in tabulations[ID].items()}
+            )
+            if keys: applied[ID] = keys
+        return applied
+    
     def compile(self, skip_checks=False):
         """
         Cast as a CompiledChemicals object.
@@ -462,6 +551,10 @@ class CompiledChemicals(Chemicals):
     """  
     _cache = {}
     
+    #: Maximum number of index keys cached by new CompiledChemicals objects
+    #: (least recently used keys are discarded).
+    index_cache_size = 1000
+    
     def __new__(cls, chemicals, cache=None):
         chemicals = Chemicals(chemicals)
         chemicals_tuple = tuple(chemicals) 
@@ -682,7 +775,7 @@ class CompiledChemicals(Chemicals):
                                       *zip(IDs, index)))
         dct['_group_wt_compositions'] = {}
         dct['_group_mol_compositions'] = {}
-        dct['_index_cache'] = {}
+        dct['_index_cache'] = LRUCache(self.index_cache_size)
         repeated_names = set()
         names = set()
         all_names_list = []
@@ -728,6 +821,8 @@ class CompiledChemicals(Chemicals):
         dct['light_chemicals'] = tuple_(light_chemicals)
         dct['_vle_index'] = [index[i.ID] for i in vle_chemicals]
         dct['_lle_index'] = [index[i.ID] for i in lle_chemicals]
+        dct['_vle_bitset'] = BitSet(dct['_vle_index'])
+        dct['_lle_bitset'] = BitSet(dct['_lle_index'])
         dct['_heavy_solutes'] = chemical_data_array(heavy_chemicals, 'N_solutes')
         dct['_heavy_indices'] = [index[i.ID] for i in heavy_chemicals]
         dct['_light_indices'] = [index[i.ID] for i in light_chemicals]
@@ -1244,6 +1339,16 @@ class CompiledChemicals(Chemicals):
         else: # pragma: no cover
             raise TypeError("only strings, chemicals, sequences, and ellipsis are valid index keys")    
     
+    def set_index_cache_size(self, size):
+        """Set maximum number of cached index keys of these chemicals and of
+        material indexers with these chemicals; least recently used keys are 
+        discarded."""
+        from .indexer import MaterialIndexer
+        self.__dict__['index_cache_size'] = size
+        self._index_cache.resize(size)
+        for (phases, chemicals), cache in MaterialIndexer._index_caches.items():
+            if chemicals is self: cache.resize(size)
+    
     def _get_index_and_kind(self, key):
         index_cache = self._index_cache
         try:
@@ -1273,7 +1378,6 @@ class CompiledChemicals(Chemicals):
             else: # pragma: no cover
                 raise TypeError("only strings, sequences of strings, and ellipsis are valid index keys")
             index_cache[key] = index, kind
-            if len(index_cache) > 100: index_cache.pop(index_cache.__iter__().__next__())
         except TypeError:
             raise TypeError("only strings, sequences of strings, and ellipsis are valid index keys")
         return index, kind
@@ -1306,6 +1410,7 @@ class CompiledChemicals(Chemicals):
         [1, 2]
         
         """
+        if nonzeros.__class__ is BitSet: return [*(self._vle_bitset & nonzeros)]
         return [i for i in self._vle_index if i in nonzeros]
     
     def get_lle_indices(self, nonzeros):
@@ -1322,6 +1427,7 @@ class CompiledChemicals(Chemicals):
         [1, 2]
         
         """
+        if nonzeros.__class__ is BitSet: return [*(self._lle_bitset & nonzeros)]
         return [i for i in self._lle_index if i in nonzeros]
     
     def __repr__(self):
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+from .base import SparseArray
+from .indexer import MaterialIndexer, all_phases
+
+__all__ = ('FlowBuffer',)
+
+class FlowBuffer:
+    """
+    Create a FlowBuffer object that maps the molar flow rates of streams onto
+    one contiguous array backed by shared memory or a memory-mapped file.
+    Linked streams read and write flow rates in place, so processes that
+    attach to the buffer (e.g., by unpickling the FlowBuffer object) share
+    flow rates without pickling stream objects.
+
+    Parameters
+    ----------
+    streams : Iterable[Stream]
+        Streams to link. All streams must share the same chemicals.
+    filename : str, optional
+        Path of memory-mapped file. Defaults to shared memory.
+    name : str, optional
+        Name of shared memory block. Defaults to a unique name.
+
+    Notes
+    -----
+    Molar flow rates [kmol/hr] are stored in an array with shape
+    (streams, phases, chemicals). Chemicals follow the ordering of the
+    stream's `CompiledChemicals` object and phases follow `FlowBuffer.phases`.
+    Temperatures [K] and pressures [Pa] are stored in an array with shape
+    (streams, 2), but are only transferred through `save_conditions` and
+    `load_conditions`.
+
+    Examples
+    --------
+    >>> import pickle
+    >>> import thermosteam as tmo
+    >>> tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+    >>> s1 = tmo.Stream('s1', Water=10)
+    >>> s2 = tmo.Stream('s2', Ethanol=5, T=350)
+    >>> buffer = tmo.FlowBuffer([s1, s2])
+    >>> buffer.get_flow(1, 'l').tolist()
+    [0.0, 5.0]
+
+    Attach to the buffer (normally in a worker process) and set flow rates:
+
+    >>> attached = pickle.loads(pickle.dumps(buffer))
+    >>> attached.get_flow(1, 'l')[0] = 2.
+    >>> s2.imol['Water']
+    2.0
+    >>> attached.close()
+
+    Close buffer and keep flow rates in the streams:
+
+    >>> buffer.close()
+    >>> s2.imol['Water', 'Ethanol'].tolist()
+    [2.0, 5.0]
+
+    """
+    __slots__ = ('IDs', 'shape', 'name', 'filename', 'array', 'conditions',
+                 'streams', '_memory', '_owner', '_linked')
+
+    #: Phases in the order of the second dimension of the flow array.
+    phases = all_phases
+
+    def __init__(self, streams, filename=None, name=None):
+        streams = [*streams]
+        if not streams: raise ValueError('at least one stream is required')
+        chemicals = streams[0].chemicals
+        self.IDs = chemicals.IDs
+        self._open((len(streams), len(all_phases), chemicals.size), name, filename, True)
+        self.link(streams)
+
+    @classmethod
+    def attach(cls, shape, IDs, name=None, filename=None):
+        """Return a FlowBuffer object attached to an existing shared memory block or memory-mapped file."""
+        self = cls.__new__(cls)
+        self.IDs = IDs
+        self._open(tuple(shape), name, filename, False)
+        return self
+
+    def __reduce__(self):
+        return self.attach, (self.shape, self.IDs, self.name, self.filename)
+
+    def _open(self, shape, name, filename, create):
+        N_streams = shape[0]
+        size = N_streams * shape[1] * shape[2] + 2 * N_streams
+        if filename is None:
+            from multiprocessing import shared_memory
+            self._memory = memory = shared_memory.SharedMemory(name, create, 8 * size)
+            data = np.ndarray(size, float, memory.buf)
+            name = memory.name
+        else:
+            self._memory = memory = np.memmap(filename, float, 'w+' if create else 'r+', shape=(size,))
+            data = memory.view(np.ndarray)
+        self.shape = shape
+        self.name = name
+        self.filename = filename
+        self.array = data[:-2 * N_streams].reshape(shape)
+        self.conditions = data[-2 * N_streams:].reshape([N_streams, 2])
+        self.streams = None
+        self._owner = create
+        self._linked = []
+
+    def get_flow(self, index, phase):
+        """Return a view of the molar flow rates [kmol/hr] at the given stream index and phase."""
+        return self.array[index, all_phases.index(phase)]
+
+    def link(self, streams, load=False):
+        """
+        Map molar flow rates of streams onto the buffer. Flow rates are loaded
+        from the buffer if `load` is True; otherwise, current flow rates are
+        stored in the buffer.
+
+        """
+        streams = [*streams]
+        if len(streams) != self.shape[0]:
+            raise ValueError(f'buffer holds {self.shape[0]} streams, not {len(streams)}')
+        for i in streams:
+            if i.chemicals.IDs != self.IDs:
+                raise ValueError(f'chemicals of {i} do not match buffer')
+        self.release()
+        linked = self._linked
+        copy = not load
+        for stream, arr in zip(streams, self.array):
+            imol = stream._imol
+            parent = imol._parent
+            if parent is not None:
+                data = parent.data
+                linked.append((data, data.contiguous))
+                data.make_contiguous(arr, copy)
+            elif isinstance(imol, MaterialIndexer):
+                for phase, row in zip(imol._phases, imol.data.rows):
+                    data = SparseArray.from_rows([row])
+                    index = all_phases.index(phase)
+                    linked.append((data, False))
+                    data.make_contiguous(arr[index:index + 1], copy)
+            else:
+                data = SparseArray.from_rows([imol.data])
+                index = all_phases.index(imol._phase)
+                linked.append((data, False))
+                data.make_contiguous(arr[index:index + 1], copy)
+        self.streams = streams
+
+    def release(self):
+        """Copy flow rates back into linked streams and unlink them from the buffer."""
+        for data, contiguous in self._linked:
+            buffer = data._get_buffer()
+            if buffer is None: continue # Rows were replaced since linking
+            if contiguous:
+                data.make_contiguous(buffer.copy(), False)
+            else:
+                for i in data.rows:
+                    i.to_sparse_storage()
+                    i.update_storage()
+        self._linked.clear()
+        self.streams = None
+
+    def save_conditions(self):
+        """Store temperature and pressure of linked streams in the buffer."""
+        self.conditions[:] = [(i.T, i.P) for i in self.streams]
+
+    def load_conditions(self):
+        """Set temperature and pressure of linked streams from the buffer."""
+        for i, (T, P) in zip(self.streams, self.conditions.tolist()):
+            i.T = T
+            i.P = P
+
+    def close(self, unlink=None):
+        """
+        Release linked streams and close the buffer. The shared memory block
+        is also unlinked (freed) if `unlink` is True, which defaults to whether
+        the buffer was created (not attached) by this object.
+
+        """
+        if self.array is None: return
+        self.release()
+        self.array = self.conditions = None
+        memory = self._memory
+        self._memory = None
+        if self.filename is None:
+            memory.close()
+            if self._owner if unlink is None else unlink: memory.unlink()
+        else:
+            memory.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.close()
+
+    def __repr__(self):
+        location = f"filename={self.filename!r}" if self.name is None else f"name={self.name!r}"
+        return f"{type(self).__name__}({location}, shape={self.shape})"
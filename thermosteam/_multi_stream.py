@@ -328,28 +328,38 @@ class MultiStream(Stream):
         if total == 0.: 
             return 0. if flow else None
         else:
-            composition = data / total
-            composition_key = [i.dct for i in composition.rows]
             if nophase:
                 literal = (thermal_condition._T, thermal_condition._P)
             else:
                 literal = (imol._phases, thermal_condition._T, thermal_condition._P)
-            last_literal, last_composition_key = self._property_cache_key
-            if literal == last_literal and (composition_key == last_composition_key):
-                if name in property_cache:
-                    value = property_cache.get(name)
-                    return value * total if flow else value
-            else:
-                property_cache.clear()
-            self._property_cache_key = (literal, [i.copy() for i in composition_key])
+            states = self._property_states
+            if states is None: states = self.property_cache
+            last_literal, last_composition_key, last_data = self._property_cache_key
+            if (literal == last_literal and name in property_cache 
+                and data.sparse_equal(last_data)): # Flow rates have not changed
+                if states.counting: states.hits += 1
+                value = property_cache[name]
+                return value * total if flow else value
+            composition = data / total
+            composition_key = [i.dct for i in composition.rows]
+            if not (literal == last_literal and (composition_key == last_composition_key)):
+                self._property_cache = property_cache = states.state(
+                    (literal, tuple([frozenset(i.items()) for i in composition_key]))
+                )
+            self._property_cache_key = (literal, [i.copy() for i in composition_key], data.copy())
+            if name in property_cache:
+                if states.counting: states.hits += 1
+                value = property_cache[name]
+                return value * total if flow else value
+            if states.counting: states.misses += 1
             if nophase:
                 calculate = getattr(self.mixture, name)
-                self._property_cache[name] = value = calculate(
+                property_cache[name] = value = calculate(
                     composition.sum(axis=0), *self.thermal_condition
                 )
             else:
                 calculate = getattr(self.mixture, 'x' + name)
-                self._property_cache[name] = value = calculate(
+                property_cache[name] = value = calculate(
                     zip(imol._phases, composition), *self.thermal_condition
                 )
             return value * total if flow else value
@@ -358,7 +368,12 @@ class MultiStream(Stream):
         """Reset cache regarding equilibrium methods."""
         super().reset_cache()
         if hasattr(self, '_streams'): 
-            for i in self._streams.values(): i.reset_cache()
+            streams = self._streams
+            if streams:
+                property_cache = self.property_cache
+                for i in streams.values(): 
+                    i.reset_cache()
+                    i._property_states = property_cache
         else:
             self._streams = {}
         self._vle_cache = eq.VLECache(self._imol,
@@ -385,7 +400,9 @@ class MultiStream(Stream):
             stream._thermo = self._thermo
             stream._property_cache = {}
             stream.characterization_factors = {}
-            stream._property_cache_key = None, None
+            stream._property_cache_key = None, None, None
+            stream._property_states = self.property_cache
+            stream._T_solution = None
             streams[phase] = stream
         return stream
     
@@ -502,8 +519,10 @@ class MultiStream(Stream):
     @H.setter
     def H(self, H):
         if not H and self.isempty(): return
-        self.T = self.mixture.xsolve_T_at_HP(
-            self._imol, H, *self._thermal_condition
+        self._set_T_solution(
+            self.mixture.xsolve_T_at_HP(
+                self._imol, H, self._get_T_guess(), self.P
+            )
         )
 
     @property
@@ -513,8 +532,10 @@ class MultiStream(Stream):
     @h.setter
     def h(self, h: float):
         if not h and self.isempty(): return
-        self.T = self.mixture.xsolve_T_at_HP(
-            self._imol.iter_composition(), h, *self._thermal_condition
+        self._set_T_solution(
+            self.mixture.xsolve_T_at_HP(
+                self._imol.iter_composition(), h, self._get_T_guess(), self.P
+            )
         )
 
     @property
@@ -524,8 +545,10 @@ class MultiStream(Stream):
     @S.setter
     def S(self, S):
         if not S and self.isempty(): return
-        self.T = self.mixture.xsolve_T_at_SP(
-            self._imol, S, *self._thermal_condition
+        self._set_T_solution(
+            self.mixture.xsolve_T_at_SP(
+                self._imol, S, self._get_T_guess(), self.P
+            )
         )
     
     ### Composition properties ###
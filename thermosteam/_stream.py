@@ -309,13 +309,24 @@ class Stream(AbstractStream):
     __slots__ = (
         '_imol', '_thermal_condition', '_streams',
         '_vle_cache', '_lle_cache', '_sle_cache',
-        '_price', '_property_cache_key',
-        '_property_cache', 'characterization_factors',
+        '_price', '_property_cache_key', '_T_solution',
+        '_property_cache', '_property_states', 'characterization_factors',
         'equations',
         '_original',
         # '_velocity', '_height'
     )
     
+    #: Maximum number of thermodynamic states in the property cache of new streams.
+    property_cache_size = 8
+    
+    #: dict[str, tuple[str, bool]] Name of mixture property and whether it is 
+    #: a flow rate by name of stream property with batch evaluation.
+    batch_properties = {
+        'H': ('H', True), 'S': ('S', True), 'C': ('Cn', True),
+        'h': ('H', False), 'Cn': ('Cn', False), 'V': ('V', False),
+        'mu': ('mu', False), 'kappa': ('kappa', False),
+    }
+    
     #: Units of measure for IPython display (class attribute)
     display_units = UofM.DisplayUnits(T='K', P='Pa',
                                               flow=('kmol/hr', 'kg/hr', 'm3/hr'),
@@ -823,8 +834,26 @@ class Stream(AbstractStream):
 
     def reset_cache(self):
         """Reset cache regarding equilibrium methods."""
-        self._property_cache_key = None, None
+        self._property_cache_key = None, None, None
+        self._property_cache = {}
+        self._property_states = None # Created on first use
+        self._T_solution = None
+    
+    @property
+    def property_cache(self) -> utils.PropertyCache:
+        """
+        Cache of property values at recent thermodynamic states. Streams 
+        with the same thermodynamic property package may share the cache.
+        """
+        states = self._property_states
+        if states is None: 
+            self._property_states = states = utils.PropertyCache(self.property_cache_size)
+        return states
+    @property_cache.setter
+    def property_cache(self, property_cache):
+        self._property_cache_key = None, None, None
         self._property_cache = {}
+        self._property_states = property_cache
 
     @classmethod
     def _get_flow_name_and_factor(cls, units):
@@ -1116,8 +1145,10 @@ class Stream(AbstractStream):
     def H(self, H: float):
         if not H and self.isempty(): return
         try: 
-            self.T = self.mixture.solve_T_at_HP(
-                self.phase, self.mol, H, *self._thermal_condition
+            self._set_T_solution(
+                self.mixture.solve_T_at_HP(
+                    self.phase, self.mol, H, self._get_T_guess(), self.P
+                )
             )
         except Exception as error: # pragma: no cover
             phase = self.phase.lower()
@@ -1129,8 +1160,10 @@ class Stream(AbstractStream):
                 self.phase = 'g'
             else:
                 raise error
-            self.T = self.mixture.solve_T_at_HP(
-                self.phase, self.mol, H, *self._thermal_condition
+            self._set_T_solution(
+                self.mixture.solve_T_at_HP(
+                    self.phase, self.mol, H, *self._thermal_condition
+                )
             )
 
     @property
@@ -1142,8 +1175,10 @@ class Stream(AbstractStream):
         if not h and self.isempty(): return
         z_mol = self.z_mol
         try: 
-            self.T = self.mixture.solve_T_at_HP(
-                self.phase, z_mol, h, *self._thermal_condition
+            self._set_T_solution(
+                self.mixture.solve_T_at_HP(
+                    self.phase, z_mol, h, self._get_T_guess(), self.P
+                )
             )
         except Exception as error: # pragma: no cover
             phase = self.phase.lower()
@@ -1155,8 +1190,10 @@ class Stream(AbstractStream):
                 self.phase = 'g'
             else:
                 raise error
-            self.T = self.mixture.solve_T_at_HP(
-                self.phase, z_mol, h, *self._thermal_condition
+            self._set_T_solution(
+                self.mixture.solve_T_at_HP(
+                    self.phase, z_mol, h, *self._thermal_condition
+                )
             )
             
     @property
@@ -1167,8 +1204,10 @@ class Stream(AbstractStream):
     def S(self, S: float):
         if not S and self.isempty(): return
         try: 
-            self.T = self.mixture.solve_T_at_SP(
-                self.phase, self.mol, S, *self._thermal_condition
+            self._set_T_solution(
+                self.mixture.solve_T_at_SP(
+                    self.phase, self.mol, S, self._get_T_guess(), self.P
+                )
             )
         except Exception as error: # pragma: no cover
             phase = self.phase.lower()
@@ -1180,9 +1219,27 @@ class Stream(AbstractStream):
                 self.phase = 'g'
             else:
                 raise error
-            self.S = self.mixture.solve_T_at_SP(
-                self.phase, self.mol, S, *self._thermal_condition
+            self._set_T_solution(
+                self.mixture.solve_T_at_SP(
+                    self.phase, self.mol, S, *self._thermal_condition
+                )
             )
+    
+    def _get_T_guess(self):
+        # Warm start energy balances from the last temperature solved at 
+        # the same phase(s), which is a better guess than the current 
+        # temperature when the temperature was reset (e.g., by copy_like)
+        # between balances.
+        solution = self._T_solution
+        if solution is not None:
+            phase, T = solution
+            if phase == self.phase: return T
+        return self.T
+    
+    def _set_T_solution(self, T):
+        self.T = T
+        self._T_solution = (self.phase, T)
+    
     @property
     def Hnet(self) -> float:
         """Total enthalpy flow rate (including heats of formation) [kJ/hr]."""
@@ -1217,21 +1274,31 @@ class Stream(AbstractStream):
         if total == 0.: 
             return 0. if flow else None
         else:
-            composition = data / total
-            composition_key = composition.dct
             if nophase:
                 literal = (thermal_condition._T, thermal_condition._P)
             else:
                 phase = imol._phase
                 literal = (phase, thermal_condition._T, thermal_condition._P)
-            last_literal, last_composition_key = self._property_cache_key
-            if literal == last_literal and (composition_key == last_composition_key):
-                if name in property_cache: 
-                    value = property_cache[name]
-                    return value * total if flow else value
-            else:
-                property_cache.clear()
-            self._property_cache_key = (literal, composition_key.copy())
+            states = self._property_states
+            if states is None: states = self.property_cache
+            last_literal, last_composition_key, last_data = self._property_cache_key
+            if (literal == last_literal and name in property_cache 
+                and data.sparse_equal(last_data)): # Flow rates have not changed
+                if states.counting: states.hits += 1
+                value = property_cache[name]
+                return value * total if flow else value
+            composition = data / total
+            composition_key = composition.dct
+            if not (literal == last_literal and (composition_key == last_composition_key)):
+                self._property_cache = property_cache = states.state(
+                    (literal, frozenset(composition_key.items()))
+                )
+            self._property_cache_key = (literal, composition_key.copy(), data.copy())
+            if name in property_cache: 
+                if states.counting: states.hits += 1
+                value = property_cache[name]
+                return value * total if flow else value
+            if states.counting: states.misses += 1
             calculate = getattr(self.mixture, name)
             if nophase:
                 property_cache[name] = value = calculate(
@@ -1243,6 +1310,65 @@ class Stream(AbstractStream):
                 )
             return value * total if flow else value
     
+    @classmethod
+    def batch_property(cls, streams, name):
+        """
+        Return an array of a property of each stream, evaluated in one batch
+        per phase and mixture (rather than stream by stream). Valid names
+        are the keys of `Stream.batch_properties` (i.e., 'H', 'S', 'C', 'h', 
+        'Cn', 'V', 'mu', and 'kappa'). Intensive properties of empty streams 
+        are NaN.
+        
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> tmo.settings.set_thermo(['Water', 'Ethanol'], cache=True)
+        >>> s1 = tmo.Stream('s1', Water=20, Ethanol=10, T=340)
+        >>> s2 = tmo.Stream('s2', Water=5, T=300)
+        >>> s3 = tmo.MultiStream('s3', l=[('Water', 10)], g=[('Ethanol', 10)], T=360)
+        >>> tmo.Stream.batch_property([s1, s2, s3], 'H').round()
+        array([113477.,    697., 510029.])
+        >>> round(s1.H), round(s2.H), round(s3.H)
+        (113477, 697, 510029)
+        
+        """
+        try:
+            name, flow = cls.batch_properties[name]
+        except KeyError:
+            raise ValueError(f"batch evaluation of stream property {name!r} is not available") from None
+        streams = [*streams]
+        values = np.zeros(len(streams))
+        groups = {}
+        for n, stream in enumerate(streams):
+            imol = stream._imol
+            data = imol.data
+            total = data.sum()
+            if total == 0.:
+                if not flow: values[n] = np.nan
+                continue
+            if hasattr(imol, '_phases'):
+                phase_mol = zip(imol._phases, data.rows)
+            else:
+                phase_mol = [(imol._phase, data)]
+            thermal_condition = stream._thermal_condition
+            mixture = stream.mixture
+            for phase, mol in phase_mol:
+                if not mol.dct: continue
+                key = (mixture, phase)
+                if key in groups: 
+                    group = groups[key]
+                else:
+                    groups[key] = group = ([], [], [], [], [])
+                index, composition, T, P, scale = group
+                index.append(n)
+                composition.append(mol.to_array() / total)
+                T.append(thermal_condition._T)
+                P.append(thermal_condition._P)
+                scale.append(total if flow else 1.)
+        for (mixture, phase), (index, composition, T, P, scale) in groups.items():
+            np.add.at(values, index, scale * mixture.batch(name, phase, composition, T, P))
+        return values
+    
     @property
     def C(self) -> float:
         """Isobaric heat capacity flow rate [kJ/K/hr]."""
@@ -2001,6 +2127,8 @@ class Stream(AbstractStream):
         new._thermal_condition = self._thermal_condition
         new._property_cache = self._property_cache
         new._property_cache_key = self._property_cache_key
+        new._property_states = self.property_cache
+        new._T_solution = None
         new.equations = self.equations
         new.characterization_factors = self.characterization_factors
         return new
@@ -10,8 +10,12 @@ __all__ = (
     'VolumetricFlowDict',
 )
 
-class DictionaryView: # Abstract class for wrapping a dictionary's get and set methods
-    __slots__ = ('dct',)
+class DictionaryView: # Abstract class for wrapping a sparse vector's dictionary get and set methods
+    __slots__ = ('vector',)
+    
+    @property
+    def dct(self): # Storage may be swapped by the sparse vector (e.g., dict <-> DenseDict)
+        return self.vector.dct
     
     def __iter__(self):
         return self.dct.__iter__()
@@ -75,11 +79,11 @@ class DictionaryView: # Abstract class for wrapping a dictionary's get and set m
         for i, j in dct.items(): self[i] = j
 
 
-class MassFlowDict(DictionaryView): # Wraps a dict of molar flows
+class MassFlowDict(DictionaryView): # Wraps a sparse vector of molar flows
     __slots__ = ('MW',)
     
-    def __init__(self, dct, MW):
-        self.dct = dct
+    def __init__(self, vector, MW):
+        self.vector = vector
         self.MW = MW
     
     def output(self, index, value):
@@ -90,11 +94,11 @@ class MassFlowDict(DictionaryView): # Wraps a dict of molar flows
 
 
 TP_V = (mock_thermal_condition, None) # Initial cache for molar volume
-class VolumetricFlowDict(DictionaryView): # Wraps a dict of molar flows
+class VolumetricFlowDict(DictionaryView): # Wraps a sparse vector of molar flows
     __slots__ = ('TP', 'V', 'phase', 'phase_container', 'cache')
     
-    def __init__(self, dct, TP, V, phase, phase_container, cache):
-        self.dct = dct
+    def __init__(self, vector, TP, V, phase, phase_container, cache):
+        self.vector = vector
         self.TP = TP
         self.V = V
         self.phase = phase
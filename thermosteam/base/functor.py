@@ -10,8 +10,8 @@
 from ..units_of_measure import chemical_units_of_measure, definitions, format_plot_units, convert
 from .. import utils
 from .. import functors
+from ..utils.plots import plt
 from inspect import signature
-import matplotlib.pyplot as plt
 import numpy as np
 
 __all__ = ("functor", "Functor",  "TFunctor", 
@@ -7,6 +7,9 @@ __all__ = (
     'sparse_vector',
     'sparse_array',
     'sum_sparse_vectors',
+    'DenseDict',
+    'CopyOnWriteDict',
+    'BitSet',
     'SparseVector',
     'SparseLogicalVector',
     'SparseArray',
@@ -20,8 +23,19 @@ bools = frozenset([bool, np.bool_, np.dtype('bool')])
 ndim_max = 3
 
 # TODO: With python 3.10, use strict=True zip kwarg
+sparse_array_dense_imath = """
+    buffer = self._get_buffer()
+    if buffer is not None and (other_values:=dense_operand(other)) is not None:
+        buffer.__i{name}__(other_values)
+        return self
+"""
+sparse_array_dense_math = """
+    buffer = self._get_buffer()
+    if buffer is not None and (other_values:=dense_operand(other)) is not None:
+        return SparseArray.from_buffer(buffer.__{name}__(other_values))
+"""
 sparse_array_imath = """
-def __i{name}__(self, other):
+def __i{name}__(self, other):{dense}
     if other.__class__ is SparseArray:
         rows = self.rows
         other_rows = other.rows
@@ -60,7 +74,7 @@ def __i{name}__(self, other):
     return self
 """
 sparse_array_math = """
-def __{name}__(self, other):
+def __{name}__(self, other):{dense}
     rows = self.rows
     if other.__class__ is SparseArray:
         other_rows = other.rows
@@ -504,13 +518,465 @@ def get_array_properties(index):
             raise ValueError(f'index dimensions exceed {ndim_max}')
     return ndim, index.__class__ in bools
 
+class DenseDict:
+    """
+    Create a DenseDict object that implements the dictionary interface
+    of a SparseVector on top of a dense NumPy buffer. Zero entries are
+    treated as missing keys so that the sparse invariant (no stored zeros)
+    holds regardless of the storage mode.
+
+    Parameters
+    ----------
+    array : 1d array[float]
+        Buffer of values; it is not copied.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from thermosteam.base.sparse import DenseDict
+    >>> dct = DenseDict(np.array([0., 2., 0., 1.]))
+    >>> dct
+    DenseDict({1: 2.0, 3: 1.0})
+    >>> 0 in dct, 1 in dct
+    (False, True)
+    >>> dct[0] = 5.; dct[1] = 0.
+    >>> dct
+    DenseDict({0: 5.0, 3: 1.0})
+    >>> dct.setdefault(2), dct.setdefault(3) # Missing keys default to zero
+    (0.0, 1.0)
+
+    """
+    __slots__ = ('array',)
+
+    def __init__(self, array):
+        self.array = array
+
+    @classmethod
+    def from_dict(cls, dct, size):
+        array = np.zeros(size)
+        if dct.__class__ is DenseDict:
+            array[:] = dct.array
+        elif dct:
+            array[[*dct.keys()]] = [*dct.values()]
+        return cls(array)
+
+    def __iter__(self):
+        return self.array.nonzero()[0].tolist().__iter__()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.array))
+
+    def __bool__(self):
+        return bool(self.array.any())
+
+    def __contains__(self, key):
+        try: return self.array.item(key) != 0.
+        except: return False
+
+    def __getitem__(self, key):
+        value = self.array.item(key)
+        if value: return value
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.array[key] = value
+
+    def __delitem__(self, key):
+        array = self.array
+        if array.item(key): array[key] = 0.
+        else: raise KeyError(key)
+
+    def __eq__(self, other):
+        if other.__class__ is DenseDict and other.array.size == self.array.size:
+            return bool((self.array == other.array).all())
+        elif hasattr(other, 'items'):
+            return dict(self.items()) == dict(other.items())
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())})"
+
+    def keys(self):
+        return dict.fromkeys(self.array.nonzero()[0].tolist()).keys()
+
+    def values(self):
+        array = self.array
+        return array[array != 0.].tolist()
+
+    def items(self):
+        array = self.array
+        index, = array.nonzero()
+        return zip(index.tolist(), array[index].tolist())
+
+    def get(self, key, default=None):
+        try: value = self.array.item(key)
+        except: return default
+        return value if value else default
+
+    def pop(self, key, *default):
+        array = self.array
+        try: value = array.item(key)
+        except: value = 0.
+        if value:
+            array[key] = 0.
+            return value
+        elif default:
+            return default[0]
+        else:
+            raise KeyError(key)
+
+    def popitem(self):
+        array = self.array
+        index, = array.nonzero()
+        if not index.size: raise KeyError('popitem(): dictionary is empty')
+        key = index.item(-1)
+        value = array.item(key)
+        array[key] = 0.
+        return key, value
+
+    def setdefault(self, key, default=0.):
+        array = self.array
+        value = array.item(key)
+        if value: return value
+        if default is None: return 0. # Zeros are missing keys, nothing to store
+        array[key] = default
+        return default
+
+    def clear(self):
+        self.array[:] = 0.
+
+    def copy(self):
+        return DenseDict(self.array.copy())
+
+    def update(self, other):
+        if other.__class__ is DenseDict:
+            other = other.array
+            index, = other.nonzero()
+            self.array[index] = other[index]
+        elif other:
+            self.array[[*other.keys()]] = [*other.values()]
+
+
+class CopyOnWriteDict:
+    """
+    Create a CopyOnWriteDict object that implements the dictionary interface
+    of a SparseVector on top of a dictionary shared with other sparse 
+    vectors. The first modification copies the shared dictionary and
+    stores the copy in the sparse vector, so that copies of sparse vectors
+    are cheap until either side is modified.
+
+    Parameters
+    ----------
+    vector : SparseVector
+        Owner of this storage.
+    dct : dict
+        Shared dictionary of nonzero values; it is not copied.
+
+    Examples
+    --------
+    >>> from thermosteam.base import SparseVector
+    >>> sv = SparseVector.from_dict({1: 2., 2: 1.}, size=3)
+    >>> sv_copy = SparseVector.from_size(3)
+    >>> CopyOnWriteDict.share(sv_copy, sv) # Data is shared
+    CopyOnWriteDict({1: 2.0, 2: 1.0})
+    >>> sv_copy[0] = 3. # Data is copied before modification
+    >>> sv_copy.dct, sv.dct
+    ({1: 2.0, 2: 1.0, 0: 3.0}, CopyOnWriteDict({1: 2.0, 2: 1.0}))
+
+    Copies of sparse vectors share data if they have at least
+    `SparseVector.copy_on_write_min_size` nonzero values.
+
+    """
+    __slots__ = ('vector', 'dct')
+
+    def __init__(self, vector, dct):
+        self.vector = vector
+        self.dct = dct
+
+    @classmethod
+    def share(cls, vector, other):
+        # Share the dictionary of another sparse vector; return None if storage cannot be shared
+        dct = other.dct
+        if dct.__class__ is dict:
+            other.dct = cls(other, dct)
+        elif dct.__class__ is cls:
+            dct = dct.dct
+        else:
+            return None
+        vector.dct = new = cls(vector, dct)
+        return new
+
+    def own(self, clear=False):
+        # Return dictionary owned by the sparse vector
+        vector = self.vector
+        if vector is not None: # Still shared
+            self.vector = None
+            self.dct = dct = {} if clear else self.dct.copy()
+            if vector.dct is self: vector.dct = dct
+        return self.dct
+
+    def __iter__(self):
+        return self.dct.__iter__()
+
+    def __len__(self):
+        return self.dct.__len__()
+
+    def __bool__(self):
+        return bool(self.dct)
+
+    def __contains__(self, key):
+        return key in self.dct
+
+    def __getitem__(self, key):
+        return self.dct[key]
+
+    def __setitem__(self, key, value):
+        self.own()[key] = value
+
+    def __delitem__(self, key):
+        del self.own()[key]
+
+    def __eq__(self, other):
+        if other.__class__ is CopyOnWriteDict: other = other.dct
+        return self.dct is other or self.dct == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.dct})"
+
+    def keys(self):
+        return self.dct.keys()
+
+    def values(self):
+        return self.dct.values()
+
+    def items(self):
+        return self.dct.items()
+
+    def get(self, key, default=None):
+        return self.dct.get(key, default)
+
+    def pop(self, key, *default):
+        return self.own().pop(key, *default)
+
+    def popitem(self):
+        return self.own().popitem()
+
+    def setdefault(self, key, default=None):
+        return self.own().setdefault(key, default)
+
+    def clear(self):
+        self.own(True)
+
+    def copy(self):
+        return self.dct.copy()
+
+    def update(self, other):
+        self.own().update(other)
+
+
+def bitmask(obj):
+    # Integer bit mask of the indices in an iterable
+    cls = obj.__class__
+    if cls is BitSet: 
+        return obj.bits
+    elif cls is range and obj.step == 1:
+        start = obj.start
+        stop = obj.stop
+        return ((1 << stop) - (1 << start)) if stop > start else 0
+    elif cls is DenseDict:
+        return bitmask_from_array(obj.array)
+    elif cls is np.ndarray and obj.dtype.kind in 'iu':
+        bits = 0
+        for i in obj.tolist(): bits |= 1 << i
+        return bits
+    else:
+        bits = 0
+        for i in obj: bits |= 1 << i
+        return bits
+
+def bitmask_from_array(arr):
+    # Integer bit mask of the nonzero entries of a 1d array
+    return int.from_bytes(np.packbits(arr != 0, bitorder='little').tobytes(), 'little')
+
+class BitSet:
+    """
+    Create a BitSet object that implements the set interface for
+    nonnegative integers on top of a Python integer bit mask. Set
+    operations between BitSet objects (e.g., intersection, union, symmetric
+    difference and equality) are bitwise operations on integers.
+
+    Parameters
+    ----------
+    iterable : Iterable[int], optional
+        Nonnegative integers in the set.
+
+    Examples
+    --------
+    >>> from thermosteam.base.sparse import BitSet
+    >>> bitset = BitSet([0, 3])
+    >>> bitset
+    BitSet({0, 3})
+    >>> bitset.bits
+    9
+    >>> bitset.intersection_update(BitSet([1, 3]))
+    >>> bitset, 3 in bitset
+    (BitSet({3}), True)
+
+    """
+    __slots__ = ('bits',)
+
+    def __init__(self, iterable=()):
+        self.bits = bitmask(iterable)
+
+    @classmethod
+    def from_bits(cls, bits):
+        new = cls.__new__(cls)
+        new.bits = bits
+        return new
+
+    @classmethod
+    def from_array(cls, arr):
+        new = cls.__new__(cls)
+        new.bits = bitmask_from_array(arr)
+        return new
+
+    def to_array(self, size, dtype=None):
+        bits = self.bits
+        if bits >> size: raise IndexError('bit set has indices out of bounds')
+        arr = np.unpackbits(
+            np.frombuffer(bits.to_bytes((size + 7) >> 3, 'little'), np.uint8),
+            count=size, bitorder='little',
+        ).view(bool)
+        return arr if dtype is None or dtype is bool else arr.astype(dtype)
+
+    def __iter__(self):
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def __len__(self):
+        return bin(self.bits).count('1')
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __contains__(self, index):
+        try: return index >= 0 and (self.bits >> index) & 1 == 1
+        except: return False
+
+    def __eq__(self, other):
+        if other.__class__ is BitSet:
+            return self.bits == other.bits
+        elif isinstance(other, (set, frozenset)):
+            return set(self) == other
+        else:
+            return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __and__(self, other):
+        return BitSet.from_bits(self.bits & bitmask(other))
+
+    def __or__(self, other):
+        return BitSet.from_bits(self.bits | bitmask(other))
+
+    def __xor__(self, other):
+        return BitSet.from_bits(self.bits ^ bitmask(other))
+
+    def __sub__(self, other):
+        return BitSet.from_bits(self.bits & ~bitmask(other))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({{{', '.join([str(i) for i in self])}}})"
+
+    def add(self, index):
+        self.bits |= 1 << index
+
+    def discard(self, index):
+        self.bits &= ~(1 << index)
+
+    def remove(self, index):
+        if index not in self: raise KeyError(index)
+        self.bits ^= 1 << index
+
+    def clear(self):
+        self.bits = 0
+
+    def copy(self):
+        return BitSet.from_bits(self.bits)
+
+    def update(self, *others):
+        for i in others: self.bits |= bitmask(i)
+
+    def intersection_update(self, *others):
+        for i in others: self.bits &= bitmask(i)
+
+    def difference_update(self, *others):
+        for i in others: self.bits &= ~bitmask(i)
+
+    def symmetric_difference_update(self, other):
+        self.bits ^= bitmask(other)
+
+    intersection = __and__
+    union = __or__
+    symmetric_difference = __xor__
+    difference = __sub__
+
+    def issubset(self, other):
+        return self.bits & ~bitmask(other) == 0
+
+    def isdisjoint(self, other):
+        return self.bits & bitmask(other) == 0
+
+def storage_from_array(arr):
+    # Pick a dictionary-like storage for the nonzero values of a 1d array by fill ratio
+    size = arr.size
+    if size >= SparseVector.dense_min_size and np.count_nonzero(arr) >= SparseVector.dense_fill_ratio * size:
+        return DenseDict(arr)
+    else:
+        index, = arr.nonzero()
+        return dict(zip(index.tolist(), arr[index].tolist()))
+
+def dense_array(dct, size):
+    # Dense values of a dictionary-like storage; a view if storage is dense
+    if dct.__class__ is DenseDict: return dct.array
+    arr = np.zeros(size)
+    if dct: arr[[*dct]] = [*dct.values()]
+    return arr
+
+def dense_operand(other):
+    # Dense values of a math operand or None if the operand is not backed by an array
+    cls = other.__class__
+    if cls is SparseArray:
+        return other._get_buffer()
+    elif cls is SparseVector:
+        dct = other.dct
+        if dct.__class__ is DenseDict: return dct.array
+    elif cls is np.ndarray:
+        if other.ndim < 3 and other.dtype.kind in 'fiu': return other
+    elif cls is float or cls is int or cls is np.float64:
+        return other
+
 def sum_sparse_vectors(svs):
     if svs: dtype = svs[0].dtype
     else: return {}
     if dtype is bool:
-        sets = [i.set for i in svs]
-        keys = {i for set in sets for i in set}
-        dct = {i: sum([1. for j in sets if i in j]) for i in keys}
+        bits = [i.set.bits for i in svs]
+        keys = BitSet.from_bits(0)
+        for i in bits: keys.bits |= i
+        dct = {i: float(sum([(j >> i) & 1 for j in bits])) for i in keys}
     elif dtype is float:
         dcts = [i.dct for i in svs]
         keys = {i for dct in dcts for i in dct}
@@ -521,10 +987,11 @@ def sum_sparse_vectors(svs):
 
 class SparseArray:
     __doc__ = sparse.__doc__
-    __slots__ = ('rows',)
+    __slots__ = ('rows', '_buffer')
     ndim = 2
     
     def __init__(self, obj=None, vector_size=None):
+        self._buffer = None
         if obj is None:
             self.rows = []
         elif hasattr(obj, '__iter__'):
@@ -545,13 +1012,70 @@ class SparseArray:
     def from_rows(cls, rows):
         new = cls.__new__(cls)
         new.rows = rows
+        new._buffer = None
         return new
     
+    @classmethod
+    def from_buffer(cls, arr):
+        """Return a SparseArray with rows that are views of a contiguous 2d float array (takes ownership of arr)."""
+        new = cls.__new__(cls)
+        size = arr.shape[1]
+        new.rows = rows = [SparseVector.from_dict(DenseDict(i), size) for i in arr]
+        new._buffer = (arr, [i.dct for i in rows])
+        return new
+    
+    def _get_buffer(self):
+        # Contiguous 2d array of row values, or None if rows are no longer views of the buffer
+        buffer = self._buffer
+        if buffer is None: return
+        arr, dcts = buffer
+        rows = self.rows
+        if len(rows) == len(dcts) and all([i.dct is j for i, j in zip(rows, dcts)]): return arr
+        self._buffer = None
+    
+    @property
+    def contiguous(self):
+        """Whether row values are views of a single contiguous 2d buffer."""
+        return self._get_buffer() is not None
+    
+    def make_contiguous(self, buffer=None, copy=True):
+        """
+        Move row values into a contiguous 2d float array, keeping the row objects. 
+        A new array is allocated unless a `buffer` is given (e.g., a view of shared 
+        memory). If `copy` is False, rows take the values already in the buffer.
+        """
+        rows = self.rows
+        if buffer is None:
+            if self._get_buffer() is not None: return
+            buffer = np.zeros([len(rows), self.vector_size])
+        elif buffer.shape != (len(rows), self.vector_size):
+            raise ValueError('buffer shape does not match sparse array')
+        if not all([i.__class__ is SparseVector and i.dct.__class__ in (dict, DenseDict, CopyOnWriteDict) for i in rows]):
+            raise RuntimeError('only sparse vectors with dictionary or dense storage can share a buffer')
+        for i, row in zip(buffer, rows):
+            if copy:
+                dct = row.dct
+                if dct.__class__ is DenseDict: 
+                    i[:] = dct.array
+                else:
+                    i[:] = 0.
+                    if dct: i[[*dct]] = [*dct.values()]
+            row.dct = DenseDict(i)
+        self._buffer = (buffer, [i.dct for i in rows])
+    
     def clear(self):
-        for i in self.rows: i.set.clear()
+        buffer = self._get_buffer()
+        if buffer is None:
+            for i in self.rows: i.set.clear()
+        else:
+            buffer[:] = 0.
     
     def copy(self):
-        return SparseArray.from_rows([i.copy() for i in self.rows])
+        buffer = self._get_buffer()
+        if buffer is None:
+            return SparseArray.from_rows([i.copy() for i in self.rows])
+        else:
+            return SparseArray.from_buffer(buffer.copy())
     
     def __int__(self):
         value, ndim, _ = reduce_ndim(self)
@@ -597,6 +1121,12 @@ class SparseArray:
         return SparseArray(rows)
     
     def copy_like(self, other):
+        buffer = self._get_buffer()
+        if buffer is not None:
+            other_buffer = other._get_buffer()
+            if other_buffer is not None and buffer.shape == other_buffer.shape:
+                buffer[:] = other_buffer
+                return
         rows = self.rows
         for i, j in zip(rows, other.rows):
             i.copy_like(j)
@@ -693,6 +1223,11 @@ class SparseArray:
     to_list = tolist
     
     def to_flat_array(self, arr=None):
+        buffer = self._get_buffer()
+        if buffer is not None:
+            if arr is None: return buffer.flatten()
+            arr[:] = buffer.ravel()
+            return arr
         vector_size = self.vector_size
         rows = self.rows
         N = rows.__len__()
@@ -705,6 +1240,10 @@ class SparseArray:
         return arr
         
     def from_flat_array(self, arr):
+        buffer = self._get_buffer()
+        if buffer is not None:
+            buffer[:] = np.reshape(arr, buffer.shape)
+            return
         rows = self.rows
         vector_size = self.vector_size
         dtype = self.dtype
@@ -728,7 +1267,11 @@ class SparseArray:
             raise RuntimeError('unexpected dtype')
     
     def sparse_equal(self, other):
-        return all([i.set == j.set for i, j in zip(self.rows, sparse_array(other).rows)])
+        other = sparse_array(other)
+        buffer = self._get_buffer()
+        if buffer is not None and (other_buffer:=other._get_buffer()) is not None:
+            return buffer.shape == other_buffer.shape and bool((buffer == other_buffer).all())
+        return all([i.set == j.set for i, j in zip(self.rows, other.rows)])
     
     def __getitem__(self, index):
         rows = self.rows
@@ -738,6 +1281,9 @@ class SparseArray:
                 if m == open_slice:
                     if n == open_slice:
                         return self
+                    elif (buffer:=self._get_buffer()) is not None:
+                        value = buffer[:, n]
+                        if value.base is not None: value = value.copy()
                     else:
                         value = np.array([i[n] for i in rows])
                 else:
@@ -820,7 +1366,10 @@ class SparseArray:
                 if m == open_slice:
                     if n.__class__ is slice:
                         if n == open_slice:
-                            if vd in (0, 1):
+                            buffer = self._get_buffer()
+                            if buffer is not None and (values:=dense_operand(value)) is not None:
+                                buffer[:] = values
+                            elif vd in (0, 1):
                                 for i in rows: i[:] = value
                             elif vd == 2:
                                 for i, j in zip(rows, value): i[:] = j # TODO: With python 3.10, use strict=True zip kwarg
@@ -956,7 +1505,11 @@ class SparseArray:
             elif ndim == 1:
                 rows = [rows[i] for i in index]
             elif index.__class__ is slice:
-                if index != open_slice: rows = [rows[i] for i in default_range(index, len(rows))]
+                if index != open_slice: 
+                    rows = [rows[i] for i in default_range(index, len(rows))]
+                elif (buffer:=self._get_buffer()) is not None and (values:=dense_operand(value)) is not None:
+                    buffer[:] = values
+                    return
             elif ndim == 0:
                 rows[index][:] = value
                 return
@@ -997,6 +1550,8 @@ class SparseArray:
         else: raise NotImplementedError(f'flag {flag} not yet implemented')
     
     def to_array(self, dtype=None):
+        buffer = self._get_buffer()
+        if buffer is not None: return buffer.astype(dtype or float)
         rows = self.rows
         N = rows.__len__()
         arr = np.zeros([N, self.vector_size], dtype=dtype or self.dtype)
@@ -1030,7 +1585,7 @@ class SparseArray:
             if keepdims: arr = SparseArray.from_rows([SparseLogicalVector.from_set({0} if arr else set(), 1)])
         elif axis == 0:
             if rows: 
-                keys = set(rows[0].set)
+                keys = BitSet(rows[0].set)
                 for i in rows[1:]: keys.intersection_update(i.set)
                 arr = SparseLogicalVector.from_set(keys, self.vector_size)
             else:
@@ -1048,12 +1603,17 @@ class SparseArray:
         return arr
     
     def any(self, axis=None, keepdims=False):
+        buffer = self._get_buffer()
+        if buffer is not None and axis in (0, 1) and not keepdims:
+            index, = buffer.any(axis).nonzero()
+            return SparseLogicalVector.from_set(set(index.tolist()), buffer.shape[1 - axis])
         rows = self.rows
         if axis is None:
             arr = any([i.any() for i in rows])
             if keepdims: arr = SparseArray.from_rows([SparseLogicalVector.from_set({0} if arr else set(), 1)])
         elif axis == 0:
-            keys = {j for i in rows for j in i.set}
+            keys = BitSet()
+            keys.update(*[i.set for i in rows])
             arr = SparseLogicalVector.from_set(keys, self.vector_size)
             if keepdims: arr = SparseArray.from_rows([arr])
         elif axis == 1:
@@ -1068,6 +1628,10 @@ class SparseArray:
         return arr
             
     def sum(self, axis=None, keepdims=False):
+        buffer = self._get_buffer()
+        if buffer is not None and not keepdims:
+            if axis is None: return buffer.sum().item()
+            elif axis == 0 or axis == 1: return SparseVector._from_buffer(buffer.sum(axis))
         rows = self.rows
         if axis is None:
             arr = sum([i.sum() for i in rows])
@@ -1121,6 +1685,10 @@ class SparseArray:
         return arr
     
     def max(self, axis=None, keepdims=False):
+        buffer = self._get_buffer()
+        if buffer is not None and buffer.size and not keepdims:
+            if axis is None: return buffer.max().item()
+            elif axis == 0 or axis == 1: return SparseVector._from_buffer(buffer.max(axis))
         rows = self.rows
         if axis is None:
             arr = max([i.max() for i in rows])
@@ -1164,6 +1732,10 @@ class SparseArray:
         return arr
     
     def min(self, axis=None, keepdims=False):
+        buffer = self._get_buffer()
+        if buffer is not None and buffer.size and not keepdims:
+            if axis is None: return buffer.min().item()
+            elif axis == 0 or axis == 1: return SparseVector._from_buffer(buffer.min(axis))
         rows = self.rows
         if axis is None:
             arr = min([i.min() for i in rows])
@@ -1207,29 +1779,33 @@ class SparseArray:
             raise ValueError('axis is out of bounds for 2-d sparse array')
         return arr
     
-    exec(sparse_array_math.format(name='add'))
-    exec(sparse_array_math.format(name='sub'))
-    exec(sparse_array_math.format(name='mul'))
-    exec(sparse_array_math.format(name='truediv'))
-    exec(sparse_array_math.format(name='and'))
-    exec(sparse_array_math.format(name='xor'))
-    exec(sparse_array_math.format(name='or'))
-    exec(sparse_array_math.format(name='eq'))
-    exec(sparse_array_math.format(name='ne'))
-    exec(sparse_array_math.format(name='gt'))
-    exec(sparse_array_math.format(name='lt'))
-    exec(sparse_array_math.format(name='ge'))
-    exec(sparse_array_math.format(name='le'))
-    exec(sparse_array_imath.format(name='add'))
-    exec(sparse_array_imath.format(name='sub'))
-    exec(sparse_array_imath.format(name='mul'))
-    exec(sparse_array_imath.format(name='truediv'))
-    exec(sparse_array_imath.format(name='and'))
-    exec(sparse_array_imath.format(name='xor'))
-    exec(sparse_array_imath.format(name='or'))
+    exec(sparse_array_math.format(name='add', dense=sparse_array_dense_math.format(name='add')))
+    exec(sparse_array_math.format(name='sub', dense=sparse_array_dense_math.format(name='sub')))
+    exec(sparse_array_math.format(name='mul', dense=sparse_array_dense_math.format(name='mul')))
+    exec(sparse_array_math.format(name='truediv', dense=''))
+    exec(sparse_array_math.format(name='and', dense=''))
+    exec(sparse_array_math.format(name='xor', dense=''))
+    exec(sparse_array_math.format(name='or', dense=''))
+    exec(sparse_array_math.format(name='eq', dense=''))
+    exec(sparse_array_math.format(name='ne', dense=''))
+    exec(sparse_array_math.format(name='gt', dense=''))
+    exec(sparse_array_math.format(name='lt', dense=''))
+    exec(sparse_array_math.format(name='ge', dense=''))
+    exec(sparse_array_math.format(name='le', dense=''))
+    exec(sparse_array_imath.format(name='add', dense=sparse_array_dense_imath.format(name='add')))
+    exec(sparse_array_imath.format(name='sub', dense=sparse_array_dense_imath.format(name='sub')))
+    exec(sparse_array_imath.format(name='mul', dense=sparse_array_dense_imath.format(name='mul')))
+    exec(sparse_array_imath.format(name='truediv', dense=''))
+    exec(sparse_array_imath.format(name='and', dense=''))
+    exec(sparse_array_imath.format(name='xor', dense=''))
+    exec(sparse_array_imath.format(name='or', dense=''))
     
     def __neg__(self):
-        return SparseArray.from_rows([-i for i in self.rows])
+        buffer = self._get_buffer()
+        if buffer is None:
+            return SparseArray.from_rows([-i for i in self.rows])
+        else:
+            return SparseArray.from_buffer(-buffer)
     
     def __invert__(self):
         return SparseArray.from_rows([~i for i in self.rows])
@@ -1394,6 +1970,19 @@ class SparseVector:
     ndim = 1
     dtype = float
     
+    #: Fill ratio (nonzeros / size) at which storage switches to a dense buffer.
+    dense_fill_ratio = 0.3
+    
+    #: Fill ratio below which a dense buffer switches back to a dictionary.
+    sparse_fill_ratio = 0.1
+    
+    #: Minimum vector size for dense storage.
+    dense_min_size = 64
+    
+    #: Minimum number of nonzero values for copies to share dictionary storage
+    #: until modified (smaller dictionaries are faster to copy).
+    copy_on_write_min_size = 48
+    
     def __init__(self, obj=None, size=None):
         self.read_only = False
         if obj is None:
@@ -1407,6 +1996,10 @@ class SparseVector:
         elif isinstance(obj, SparseVector):
             self.dct = obj.dct.copy()
             self.size = obj.size if size is None else size
+        elif obj.__class__ is np.ndarray and obj.ndim == 1 and (size is None or size == obj.size):
+            arr = np.array(obj, dtype=float)
+            self.dct = storage_from_array(arr)
+            self.size = arr.size
         elif hasattr(obj, '__iter__'):
             self.dct = dct = {}
             for i, j in enumerate(obj):
@@ -1415,10 +2008,81 @@ class SparseVector:
         else:
             raise TypeError(f'cannot convert {type(obj).__name__} object to a sparse array')
     
+    @classmethod
+    def from_array(cls, arr):
+        """Return a SparseVector from a 1d array with storage chosen by fill ratio."""
+        new = cls.__new__(cls)
+        arr = np.array(arr, dtype=float)
+        new.dct = storage_from_array(arr)
+        new.size = arr.size
+        new.read_only = False
+        return new
+    
+    @classmethod
+    def _from_buffer(cls, arr): # Takes ownership of arr
+        new = cls.__new__(cls)
+        new.dct = storage_from_array(arr)
+        new.size = arr.size
+        new.read_only = False
+        return new
+    
+    @property
+    def dense(self):
+        """Whether nonzero values are stored in a dense NumPy buffer."""
+        return self.dct.__class__ is DenseDict
+    
+    def to_dense_storage(self):
+        """Store values in a dense NumPy buffer."""
+        dct = self.dct
+        if dct.__class__ is not DenseDict: self.dct = DenseDict.from_dict(dct, self.size)
+    
+    def to_sparse_storage(self):
+        """Store nonzero values in a dictionary."""
+        dct = self.dct
+        if dct.__class__ is DenseDict: self.dct = dict(dct.items())
+    
+    def update_storage(self):
+        """Switch between dictionary and dense storage based on the fill ratio."""
+        dct = self.dct
+        cls = dct.__class__
+        size = self.size
+        if cls is dict:
+            if (size >= SparseVector.dense_min_size and len(dct) >= SparseVector.dense_fill_ratio * size
+                and max(dct, default=0) < size):
+                self.dct = DenseDict.from_dict(dct, size)
+        elif cls is DenseDict:
+            if dct.array.base is not None: return # Views of shared buffers remain dense
+            if size < SparseVector.dense_min_size or len(dct) < SparseVector.sparse_fill_ratio * size:
+                self.dct = dict(dct.items())
+    
+    def _reset_from_array(self, arr): # Takes ownership of arr
+        dct = self.dct
+        cls = dct.__class__
+        if cls is DenseDict:
+            dct.array[:] = arr
+            self.update_storage()
+        elif cls is dict or cls is CopyOnWriteDict:
+            self.dct = storage_from_array(arr)
+        else:
+            dct.clear()
+            index, = arr.nonzero()
+            for i, j in zip(index.tolist(), arr[index].tolist()): dct[i] = j
+    
     def mix_from(self, others):
-        if others: 
+        dct = self.dct
+        size = self.size
+        if others and (dct.__class__ is DenseDict or any([i.dct.__class__ is DenseDict for i in others])):
+            arr = np.zeros(size)
+            for i in others:
+                if i.size != size: raise ValueError('shape mismatch between arrays')
+                other_dct = i.dct
+                if other_dct.__class__ is DenseDict: 
+                    arr += other_dct.array
+                elif other_dct:
+                    arr[[*other_dct]] += [*other_dct.values()]
+            self._reset_from_array(arr)
+        elif others: 
             other_dcts = [i.dct for i in others]
-            dct = self.dct
             repeated = 0
             dcts = []
             for i in other_dcts:
@@ -1435,8 +2099,9 @@ class SparseVector:
                 x = sum([j[i] for j in dcts if i in j])
                 if x: dct[i] = x
                 elif i in dct: del dct[i]
+            self.update_storage()
         else:
-            self.dct.clear()
+            dct.clear()
     
     def shares_data_with(self, other):
         if other.__class__ is SparseArray:
@@ -1564,7 +2229,8 @@ class SparseVector:
     
     def sum(self, axis=None, keepdims=False):
         if axis: raise ValueError('axis is out of bounds for 1-d sparse array')
-        arr = sum(self.dct.values())
+        dct = self.dct
+        arr = dct.array.sum().item() if dct.__class__ is DenseDict else sum(dct.values())
         if keepdims: arr = SparseVector.from_dict({0: arr} if arr else {}, size=1)
         return arr
     
@@ -1601,19 +2267,40 @@ class SparseVector:
         return arr
     
     def to_array(self, dtype=None):
+        dct = self.dct
+        if dct.__class__ is DenseDict: return dct.array.astype(dtype or self.dtype)
         arr = np.zeros(self.size, dtype=dtype or self.dtype)
-        for i, j in self.dct.items(): arr[i] = j
+        for i, j in dct.items(): arr[i] = j
         return arr
     astype = to_array
     
     def copy(self):
-        return SparseVector.from_dict(self.dct.copy(), self.size)
+        dct = self.dct
+        cls = dct.__class__
+        if not (cls is CopyOnWriteDict or cls is dict and len(dct) >= SparseVector.copy_on_write_min_size):
+            return SparseVector.from_dict(dct.copy(), self.size)
+        new = SparseVector.__new__(SparseVector)
+        new.size = self.size
+        new.read_only = False
+        CopyOnWriteDict.share(new, self)
+        return new
     
     def copy_like(self, other):
         dct = self.dct
-        if dct is other.dct: return
-        dct.clear()
-        dct.update(other.dct)
+        other_dct = other.dct
+        if dct is other_dct: return
+        cls = dct.__class__
+        if ((cls is dict or cls is CopyOnWriteDict) and self.size == other.size
+            and (other_dct.__class__ is CopyOnWriteDict
+                 or other_dct.__class__ is dict and len(other_dct) >= SparseVector.copy_on_write_min_size)):
+            CopyOnWriteDict.share(self, other)
+            return
+        if dct.__class__ is DenseDict and other_dct.__class__ is DenseDict:
+            dct.array[:] = other_dct.array
+        else:
+            dct.clear()
+            dct.update(other_dct)
+        self.update_storage()
     
     def clear(self):
         if self.read_only: raise ValueError('assignment destination is read-only')
@@ -1627,6 +2314,9 @@ class SparseVector:
         if has_bool:
             return self[index.nonzero() if hasattr(index, 'nonzero') else np.nonzero(index)]
         if ndim == 1:
+            if dct.__class__ is DenseDict:
+                try: return dct.array[index]
+                except IndexError: pass # Empty or out of bound indices
             arr = np.zeros(len(index))
             for n, i in enumerate(index):
                 if i in dct: arr[n] = dct[i]
@@ -1656,6 +2346,11 @@ class SparseVector:
                     f'boolean index is {ndim}-d but sparse array is 1-d '
                 )
             index, = index.nonzero() if hasattr(index, 'nonzero') else np.nonzero(index)
+        if (dct.__class__ is DenseDict and index.__class__ is not slice and ndim < 2
+            and (max(index, default=0) if ndim else index) >= self.size):
+            # Size is not strict; indices beyond the buffer require dictionary storage
+            self.to_sparse_storage()
+            dct = self.dct
         if ndim == 1:
             if vd == 1:
                 for i, j in zip(index, value): 
@@ -1675,14 +2370,22 @@ class SparseVector:
         elif index.__class__ is slice:
             if index == open_slice:
                 if value is self: return
-                dct.clear()
                 if value.__class__ is SparseVector:
-                    dct.update(value.dct)
+                    self.copy_like(value)
+                    return
+                elif vd == 1 and value.__class__ is np.ndarray:
+                    if dct.__class__ is DenseDict:
+                        dct.array[:] = value
+                    else:
+                        self._reset_from_array(np.array(value, dtype=float))
+                        return
                 elif vd == 1:
+                    dct.clear()
                     for i, j in enumerate(value):
                         if j: dct[i] = float(j)
                         elif i in dct: del dct[i]  
                 elif vd == 0:
+                    dct.clear()
                     if value:
                         value = float(value)
                         for i in range(self.size): dct[i] = value
@@ -1690,6 +2393,7 @@ class SparseVector:
                     raise IndexError(
                         f'cannot broadcast {vd}-d array on to 1-d sparse array'
                     )
+                self.update_storage()
             else:
                 self[default_range(index, self.size)] = value
         elif ndim:
@@ -1755,7 +2459,9 @@ class SparseVector:
         size = self.size
         other_size = other.size
         other_dct = other.dct
-        if size == other_size:
+        if size == other_size and (dct.__class__ is DenseDict or other_dct.__class__ is DenseDict):
+            return SparseVector._from_buffer(dense_array(dct, size) + dense_array(other_dct, size))
+        elif size == other_size:
             new = dct.copy()
             for i, j in other_dct.items():
                 if i in dct:
@@ -1797,7 +2503,9 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            return SparseVector._from_buffer(dct.array + np.asarray(other, dtype=float))
+        elif size == other_size:
             new = dct.copy()
             for i, j in enumerate(other):
                 if not j: continue
@@ -1837,7 +2545,12 @@ class SparseVector:
         size = self.size
         other_size = other.size
         other_dct = other.dct
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            if other_dct.__class__ is DenseDict:
+                dct.array += other_dct.array
+            elif other_dct:
+                dct.array[[*other_dct]] += [*other_dct.values()]
+        elif size == other_size:
             for i, j in other_dct.items():
                 if i in dct:
                     j += dct[i]
@@ -1875,7 +2588,9 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            dct.array += np.asarray(other, dtype=float)
+        elif size == other_size:
             for i, j in enumerate(other):
                 if not j: continue
                 if i in dct:
@@ -1920,7 +2635,9 @@ class SparseVector:
         size = self.size
         other_size = other.size
         other_dct = other.dct
-        if size == other_size:
+        if size == other_size and (dct.__class__ is DenseDict or other_dct.__class__ is DenseDict):
+            return SparseVector._from_buffer(dense_array(dct, size) - dense_array(other_dct, size))
+        elif size == other_size:
             new = dct.copy()
             for i, j in other_dct.items():
                 if i in dct:
@@ -1962,7 +2679,9 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            return SparseVector._from_buffer(dct.array - np.asarray(other, dtype=float))
+        elif size == other_size:
             new = dct.copy()
             for i, j in enumerate(other):
                 if not j: continue
@@ -2002,7 +2721,12 @@ class SparseVector:
         size = self.size
         other_size = other.size
         other_dct = other.dct
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            if other_dct.__class__ is DenseDict:
+                dct.array -= other_dct.array
+            elif other_dct:
+                dct.array[[*other_dct]] -= [*other_dct.values()]
+        elif size == other_size:
             for i, j in other_dct.items():
                 if i in dct:
                     j = dct[i] - j
@@ -2040,7 +2764,9 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            dct.array -= np.asarray(other, dtype=float)
+        elif size == other_size:
             for i, j in enumerate(other):
                 if not j: continue
                 if i in dct:
@@ -2066,7 +2792,9 @@ class SparseVector:
     
     def _mul_scalar(self, other):
         dct = self.dct
-        if other:
+        if dct.__class__ is DenseDict:
+            return SparseVector._from_buffer(dct.array * float(other))
+        elif other:
             other = float(other)
             new= {i: j * other for i, j in dct.items()}
         else:
@@ -2078,7 +2806,9 @@ class SparseVector:
         size = self.size
         other_size = other.size
         other_dct = other.dct
-        if size == other_size:
+        if size == other_size and (dct.__class__ is DenseDict or other_dct.__class__ is DenseDict):
+            return SparseVector._from_buffer(dense_array(dct, size) * dense_array(other_dct, size))
+        elif size == other_size:
             new = {i: dct[i] * other_dct[i] for i in dct if i in other_dct}
         elif size == 1 and other_size: 
             size = other_size
@@ -2101,7 +2831,9 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            return SparseVector._from_buffer(dct.array * np.asarray(other, dtype=float))
+        elif size == other_size:
             new = {i: dct[i] * float(j) for i in dct if (j:=other[i])}
         elif size == 1 and other_size: 
             size = other_size
@@ -2116,7 +2848,9 @@ class SparseVector:
     
     def _imul_scalar(self, other):
         dct = self.dct
-        if other:
+        if dct.__class__ is DenseDict:
+            dct.array *= float(other)
+        elif other:
             other = float(other)
             for i in dct: dct[i] *= other
         else:
@@ -2128,7 +2862,9 @@ class SparseVector:
         size = self.size
         other_size = other.size
         other_dct = other.dct
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            dct.array *= dense_array(other_dct, size)
+        elif size == other_size:
             for i in tuple(dct):
                 if i in other_dct:
                     dct[i] *= other_dct[i]
@@ -2153,7 +2889,9 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            dct.array *= np.asarray(other, dtype=float)
+        elif size == other_size:
             for i in tuple(dct):
                 j = other[i]
                 if j: dct[i] *= float(j)
@@ -2172,6 +2910,11 @@ class SparseVector:
     def _truediv_scalar(self, other):
         dct = self.dct
         other = float(other)
+        if dct.__class__ is DenseDict: 
+            if not other:
+                if dct: raise ZeroDivisionError('float division by zero')
+                return SparseVector._from_buffer(np.zeros(dct.array.size))
+            return SparseVector._from_buffer(dct.array / other)
         new = {i: j / other for i, j in dct.items()}
         return SparseVector.from_dict(new, self.size)
     
@@ -2208,7 +2951,12 @@ class SparseVector:
         dct = self.dct
         size = self.size
         other_size = len(other)
-        if size == other_size:
+        if size == other_size and dct.__class__ is DenseDict:
+            arr = dct.array
+            return SparseVector._from_buffer(
+                np.divide(arr, np.asarray(other, dtype=float), out=np.zeros(size), where=arr != 0.)
+            )
+        elif size == other_size:
             new = {i: j / other[i] for i, j in dct.items()}
         elif size == 1 and other_size: 
             size = other_size
@@ -2226,7 +2974,13 @@ class SparseVector:
     def _itruediv_scalar(self, other):
         dct = self.dct
         other = float(other)
-        for i in dct: dct[i] /= other
+        if dct.__class__ is DenseDict: 
+            if not other:
+                if dct: raise ZeroDivisionError('float division by zero')
+            else:
+                dct.array /= other
+        else:
+            for i in dct: dct[i] /= other
         return self
     
     def _itruediv_sparse(self, other):
@@ -2275,7 +3029,9 @@ class SparseVector:
         return self
     
     def __neg__(self):
-        return SparseVector.from_dict({i: -j for i, j in self.dct.items()}, self.size)
+        dct = self.dct
+        if dct.__class__ is DenseDict: return SparseVector.from_dict(DenseDict(-dct.array), self.size)
+        return SparseVector.from_dict({i: -j for i, j in dct.items()}, self.size)
     
     def __rtruediv__(self, other):
         if hasattr(other, '__len__'):
@@ -2498,23 +3254,24 @@ class SparseLogicalVector:
     
     def __init__(self, obj=None, size=None):
         if obj is None:
-            self.set = set()
+            self.set = BitSet()
             if size is None: raise ValueError('must pass size if no object given')
             self.size = size
-        elif isinstance(obj, set):
-            self.set = obj
+        elif isinstance(obj, (set, BitSet)):
+            self.set = obj if obj.__class__ is BitSet else BitSet(obj)
             self.size = size
             if size is None: raise ValueError('must pass size if object is a set')
         elif isinstance(obj, SparseLogicalVector):
             self.set = obj.set.copy()
             self.size = obj.size if size is None else size
         elif isinstance(obj, SparseVector):
-            self.set = set(obj.dct)
+            self.set = BitSet(obj.dct)
+            self.size = obj.size if size is None else size
+        elif obj.__class__ is np.ndarray and obj.ndim == 1:
+            self.set = BitSet.from_array(obj)
             self.size = obj.size if size is None else size
         elif hasattr(obj, '__iter__'):
-            self.set = set()
-            for i, j in enumerate(obj):
-                if j: self.set.add(i)
+            self.set = BitSet([i for i, j in enumerate(obj) if j])
             self.size = len(obj) if size is None else size
         else:
             raise TypeError(f'cannot convert {type(obj).__name__} object to a sparse array')
@@ -2535,16 +3292,14 @@ class SparseLogicalVector:
         return self.size
     
     def tolist(self):
-        set = self.set
-        return [i in set for i in range(self.size)]
+        return self.set.to_array(self.size).tolist()
     to_list = tolist
     
     def to_flat_array(self, arr=None):
         if arr is None:
             return self.to_array()
         else:
-            arr[:] = False
-            for i in self.set: arr[i] = True
+            arr[:] = self.set.to_array(self.size)
             return arr
     
     def from_flat_array(self, arr=None):
@@ -2552,7 +3307,7 @@ class SparseLogicalVector:
     
     @classmethod
     def from_size(cls, size):
-        return cls.from_set(set(), size)
+        return cls.from_set(BitSet(), size)
     
     @property
     def vector_size(self):
@@ -2565,7 +3320,7 @@ class SparseLogicalVector:
     @classmethod
     def from_set(cls, set, size):
         new = cls.__new__(cls)
-        new.set = set
+        new.set = set if set.__class__ is BitSet else BitSet(set)
         new.size = size
         return new
     
@@ -2610,7 +3365,7 @@ class SparseLogicalVector:
     
     def all(self, axis=None, keepdims=False):
         if axis: raise ValueError('axis is out of bounds for 1-d sparse array')
-        arr = len(self.set) == self.size
+        arr = self.set.bits == (1 << self.size) - 1
         if keepdims: arr = SparseLogicalVector({0} if arr else set(), size=1)
         return arr
     
@@ -2651,13 +3406,14 @@ class SparseLogicalVector:
         return arr
     
     def to_array(self, dtype=None):
-        arr = np.zeros(self.size, dtype=dtype or bool)
-        for i in self.set: arr[i] = True
-        return arr
+        return self.set.to_array(self.size, dtype)
     astype = to_array
     
     def copy(self):
-        return SparseLogicalVector.from_set(self.set.copy(), self.size)
+        new = SparseLogicalVector.__new__(SparseLogicalVector)
+        new.set = self.set.copy()
+        new.size = self.size
+        return new
     
     def __getitem__(self, index):
         set = self.set
@@ -2911,8 +3667,8 @@ class SparseLogicalVector:
         return SparseVector.from_dict({i: -1. for i in self.set}, self.size)
     
     def __invert__(self):
-        set = self.set
-        return SparseLogicalVector.from_set({i for i in range(self.size) if i not in set}, self.size)
+        size = self.size
+        return SparseLogicalVector.from_set(BitSet.from_bits(~self.set.bits & ((1 << size) - 1)), size)
     
     def __rtruediv__(self, other):
         if hasattr(other, '__len__'):
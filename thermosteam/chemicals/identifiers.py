@@ -15,7 +15,10 @@
 # https://github.com/CalebBell/chemicals/blob/master/LICENSE.txt for details.
 import re
 import os
+import sqlite3
+import tempfile
 import chemicals
+from hashlib import sha1
 from chemicals.elements import (
     periodic_table, 
     homonuclear_elemental_gases,  
@@ -26,7 +29,7 @@ from chemicals.identifiers import (
     ChemicalMetadata,
     check_CAS,
 )
-from ..utils import forward
+from ..utils import forward, LRUCache
 from chemicals import identifiers
 folder = identifiers.folder
 searchable_format = re.compile(r"\B([A-Z])")
@@ -43,8 +46,245 @@ def to_searchable_format(ID):
 def CAS_from_any(ID):
     return pubchem_db.search(ID).CASs
 
+
+# %% Indexed database
+
+#: tuple[str] Kinds of identifiers indexed.
+kinds = ('CAS', 'name', 'pubchem', 'smiles', 'InChI', 'InChI_key', 'formula')
+
+#: tuple[str] Kinds of identifiers where the first file to define it takes 
+#: precedence (later files take precedence for all other kinds).
+first_come_kinds = ('CAS', 'name')
+
+def element_metadata():
+    for ele in periodic_table:
+        name = ele.name.lower()
+        CAS = int(ele.CAS.replace('-', '')) # Store as int for easier lookup
+        obj = ChemicalMetadata(pubchemid=ele.PubChem, CAS=CAS, 
+                               formula=ele.symbol, MW=ele.MW, smiles=ele.smiles,
+                               InChI=ele.InChI, InChI_key=ele.InChI_key,
+                               iupac_name=name, 
+                               common_name=name,
+                               synonyms=())
+        if ele.number in homonuclear_elemental_gases:
+            name = 'monatomic ' + name
+        yield obj, name
+
+#: dict[tuple, str] Content digests by file path, size, and modification time.
+file_digests = {}
+
+def file_digest(file_name):
+    stat = os.stat(file_name)
+    key = (os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns)
+    if key in file_digests: return file_digests[key]
+    digest = sha1()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(2**20), b''): digest.update(chunk)
+    file_digests[key] = digest = digest.hexdigest()
+    return digest
+
+def default_index_folder():
+    # Folder of SQLite indices given by the THERMOSTEAM_IDENTIFIER_INDEX 
+    # environment variable (indices are disabled if empty or "none").
+    index_folder = os.environ.get('THERMOSTEAM_IDENTIFIER_INDEX')
+    if index_folder is None:
+        return os.path.join(os.path.expanduser('~'), '.thermosteam', 'identifiers')
+    elif index_folder.strip().lower() in ('', 'none'):
+        return None
+    else:
+        return os.path.expanduser(index_folder)
+
+def file_metadata(file_name):
+    with open(file_name) as f:
+        for line in f:
+            # This is effectively the documentation for the file format of the file
+            values = line.rstrip('\n').split('\t')
+            (pubchemid, CAS, formula, MW, smiles, InChI, InChI_key, iupac_name, common_name) = values[0:9]
+            CAS = int(CAS.replace('-', '')) # Store as int for easier lookup
+            synonyms = values[7:]
+            pubchemid = int(pubchemid)
+            flat_synonyms = []
+            for name in synonyms:
+                for name in name.split(';'):
+                    if name: flat_synonyms.append(name.lower())
+            yield (pubchemid, CAS, formula, float(MW), smiles, InChI, InChI_key,
+                   iupac_name, common_name, synonyms), flat_synonyms
+
+class ChemicalMetadataIndex:
+    """
+    Create a ChemicalMetadataIndex object, an SQLite database of chemical 
+    metadata indexed by identifier (e.g., CAS, name, InChI key, SMILES and 
+    formula). Lookups are O(log n) B-tree searches of a memory-mapped file, 
+    so that searching a chemical does not require parsing (or holding in 
+    memory) the identifier files of the chemicals library.
+    
+    Each identifier entry is recorded with the level at which it becomes 
+    available (0 for elements, 1 for the first file loaded, and so on). 
+    This allows the index to reproduce the results of loading files 
+    one at a time.
+    
+    Parameters
+    ----------
+    file : str
+        SQLite database file (see `ChemicalMetadataIndex.build`).
+    
+    """
+    __slots__ = ('file', 'connection', 'pid', 'metadata')
+    
+    #: [int] Version of database schema.
+    version = 1
+    
+    #: [int] Maximum number of bytes memory-mapped.
+    mmap_size = 2**28
+    
+    def __init__(self, file):
+        self.file = file
+        self.connection = self.pid = None
+        self.metadata = {}
+    
+    @classmethod
+    def file_name(cls, files):
+        """Return the name of the database file of the identifier `files` 
+        (in the order loaded), which depends only on their contents and the 
+        versions of the schema and the chemicals library."""
+        key = [cls.version, chemicals.__version__]
+        for i in files: key.append((os.path.basename(i), file_digest(i)))
+        return sha1(repr(key).encode()).hexdigest() + '.sqlite'
+    
+    @classmethod
+    def remove_stale_files(cls, file):
+        """Remove all SQLite indices and temporary files in the folder of 
+        database `file` other than `file`. Files in use (e.g., by other 
+        processes on Windows) are skipped."""
+        folder, name = os.path.split(file)
+        for i in os.listdir(folder):
+            if i == name or not i.endswith(('.sqlite', '.tmp')): continue
+            try: os.remove(os.path.join(folder, i))
+            except OSError: pass
+    
+    @classmethod
+    def build(cls, files, file):
+        """Create an SQLite database `file` of the elements and the identifier 
+        `files` (in the order loaded) and return a ChemicalMetadataIndex object."""
+        folder = os.path.dirname(file)
+        os.makedirs(folder, exist_ok=True)
+        fd, temporary_file = tempfile.mkstemp(suffix='.tmp', dir=folder)
+        os.close(fd)
+        connection = sqlite3.connect(temporary_file)
+        try:
+            connection.executescript(
+                "CREATE TABLE metadata (row INTEGER PRIMARY KEY, pubchemid, CAS, formula, MW, "
+                "smiles, InChI, InChI_key, iupac_name, common_name, synonyms);"
+                "CREATE TABLE entries (kind INTEGER, key, level INTEGER, row INTEGER, "
+                "PRIMARY KEY (kind, key, level)) WITHOUT ROWID;"
+            )
+            CAS_rows = {}
+            names = set()
+            metadata = []
+            entries = {}
+            CAS, name, *last_come_kinds = range(len(kinds))
+            def add(row, level, values, flat_synonyms):
+                pubchemid, CAS_number, formula, MW, smiles, InChI, InChI_key, *_ = values
+                if CAS_number in CAS_rows:
+                    row = CAS_rows[CAS_number]
+                else:
+                    CAS_rows[CAS_number] = row
+                    metadata.append((row, *values))
+                    entries[CAS, CAS_number, level] = row
+                    for kind, key in zip(last_come_kinds, (pubchemid, smiles, InChI, InChI_key, formula)):
+                        if key is not None: entries[kind, key, level] = row
+                for i in flat_synonyms:
+                    if i in names: continue
+                    names.add(i)
+                    entries[name, i, level] = row
+                return row
+            row = 0
+            for obj, element_name in element_metadata():
+                values = (obj.pubchemid, obj.CAS, obj.formula, obj.MW, obj.smiles, 
+                          obj.InChI, obj.InChI_key, obj.iupac_name, obj.common_name, None)
+                if add(row, 0, values, (element_name,)) == row: row += 1
+            for level, file_name in enumerate(files, 1):
+                for values, flat_synonyms in file_metadata(file_name):
+                    *values, synonyms = values
+                    values.append('\t'.join(synonyms))
+                    if add(row, level, values, flat_synonyms) == row: row += 1
+            connection.executemany("INSERT INTO metadata VALUES (?,?,?,?,?,?,?,?,?,?,?)", metadata)
+            connection.executemany("INSERT INTO entries VALUES (?,?,?,?)", 
+                                   [(*i, j) for i, j in entries.items()])
+            connection.commit()
+            connection.close()
+            os.replace(temporary_file, file)
+        except:
+            connection.close()
+            if os.path.exists(temporary_file): os.remove(temporary_file)
+            raise
+        cls.remove_stale_files(file)
+        return cls(file)
+    
+    def connect(self):
+        pid = os.getpid()
+        if self.pid != pid: # Connections cannot be shared by forked processes
+            file = 'file:' + self.file.replace('?', '%3f').replace('#', '%23') + '?mode=ro'
+            self.connection = connection = sqlite3.connect(file, uri=True, check_same_thread=False)
+            connection.execute(f'PRAGMA mmap_size={self.mmap_size}')
+            self.pid = pid
+        return self.connection
+    
+    def search(self, kind, key, level):
+        """Return ChemicalMetadata object of identifier `key` of given `kind` 
+        available at `level`, or None if not found."""
+        result = self.connect().execute(
+            "SELECT row FROM entries WHERE kind=? AND key=? AND level<=? ORDER BY level DESC LIMIT 1",
+            (kinds.index(kind), key, level)
+        ).fetchone()
+        if result is None: return
+        row, = result
+        metadata = self.metadata
+        if row in metadata: return metadata[row]
+        (pubchemid, CAS, formula, MW, smiles, InChI, InChI_key,
+         iupac_name, common_name, synonyms) = self.connection.execute(
+            "SELECT pubchemid, CAS, formula, MW, smiles, InChI, InChI_key, "
+            "iupac_name, common_name, synonyms FROM metadata WHERE row=?", (row,)
+        ).fetchone()
+        synonyms = () if synonyms is None else synonyms.split('\t')
+        metadata[row] = obj = ChemicalMetadata(
+            pubchemid, CAS, formula, MW, smiles, InChI, InChI_key, 
+            iupac_name, common_name, synonyms
+        )
+        return obj
+    
+    def close(self):
+        """Close connection to database."""
+        if self.pid == os.getpid(): self.connection.close()
+        self.connection = self.pid = None
+    
+
+# %% Chemical metadata database
+
 @forward(identifiers)
 class ChemicalMetadataDB:
+    """
+    Create a ChemicalMetadataDB object that searches chemical metadata by 
+    identifier. Identifier files are loaded one at a time (smallest first) 
+    until a chemical is found. Before loading files larger than 
+    `ChemicalMetadataDB.index_size`, an SQLite index of all files is built 
+    in `ChemicalMetadataDB.index_folder` and used instead of loading files 
+    into memory (also by other processes, until the contents of the files 
+    or library versions change). Once a new index is built, other indices 
+    in the folder are removed.
+    
+    The index folder defaults to "~/.thermosteam/identifiers" and can be 
+    set with the THERMOSTEAM_IDENTIFIER_INDEX environment variable (set it 
+    to an empty string or "none" to disable indices) or by setting 
+    `ChemicalMetadataDB.index_folder` (None disables indices).
+    
+    Examples
+    --------
+    >>> from thermosteam.chemicals.identifiers import pubchem_db
+    >>> pubchem_db.search('Water').CASs
+    '7732-18-5'
+    
+    """
     __slots__ = (
         'pubchem_index',
         'smiles_index',
@@ -53,10 +293,20 @@ class ChemicalMetadataDB:
         'name_index',
         'CAS_index',
         'formula_index',
+        'files',
         'unloaded_files',
+        'index',
+        'index_opened',
     )
     
-    cache = {}
+    #: [LRUCache] Search results by ID.
+    cache = LRUCache(1000)
+    
+    #: [str|None] Folder of SQLite indices (no index is used if None).
+    index_folder = default_index_folder()
+    
+    #: [int] Minimum file size [bytes] to build an index instead of loading the file.
+    index_size = 10**7
     
     def __init__(self, 
                  files=[os.path.join(folder, 'chemical identifiers pubchem large.tsv'),
@@ -72,9 +322,38 @@ class ChemicalMetadataDB:
         self.name_index = {}
         self.CAS_index = {}
         self.formula_index = {}
-        self.unloaded_files = files
+        self.files = files[::-1] # In the order loaded
+        self.unloaded_files = list(files)
+        self.index = None
+        self.index_opened = False # Opened on first search
         self.load_elements()
-        
+    
+    @property
+    def level(self):
+        """[int] Number of files loaded."""
+        return len(self.files) - len(self.unloaded_files)
+    
+    def index_file(self):
+        """Return the SQLite index file, or None if indices are disabled."""
+        index_folder = self.index_folder
+        if index_folder is None: return
+        try: name = ChemicalMetadataIndex.file_name(self.files)
+        except OSError: return
+        return os.path.join(index_folder, name)
+    
+    def open_index(self, build=False):
+        """Use SQLite index if available (or built if `build` is True) 
+        and return it."""
+        self.index_opened = True
+        file = self.index_file()
+        if file is None: return
+        if os.path.exists(file):
+            self.index = ChemicalMetadataIndex(file)
+        elif build:
+            try: self.index = ChemicalMetadataIndex.build(self.files, file)
+            except (OSError, sqlite3.Error): pass
+        return self.index
+    
     def load_elements(self):
         InChI_key_index = self.InChI_key_index
         CAS_index = self.CAS_index
@@ -83,27 +362,19 @@ class ChemicalMetadataDB:
         InChI_index = self.InChI_index
         formula_index = self.formula_index
         name_index = self.name_index
-        for ele in periodic_table:
-            name = ele.name.lower()
-            CAS = int(ele.CAS.replace('-', '')) # Store as int for easier lookup
-            obj = ChemicalMetadata(pubchemid=ele.PubChem, CAS=CAS, 
-                                   formula=ele.symbol, MW=ele.MW, smiles=ele.smiles,
-                                   InChI=ele.InChI, InChI_key=ele.InChI_key,
-                                   iupac_name=name, 
-                                   common_name=name,
-                                   synonyms=())
-            InChI_key_index[ele.InChI_key] = obj
-            CAS_index[CAS] = obj
-            pubchem_index[ele.PubChem] = obj
-            smiles_index[ele.smiles] = obj
-            InChI_index[ele.InChI] = obj
+        for obj, name in element_metadata():
+            InChI_key_index[obj.InChI_key] = obj
+            CAS_index[obj.CAS] = obj
+            pubchem_index[obj.pubchemid] = obj
+            smiles_index[obj.smiles] = obj
+            InChI_index[obj.InChI] = obj
             formula_index[obj.formula] = obj
-            if ele.number in homonuclear_elemental_gases:
-                name_index['monatomic ' + name] = obj    
-            else:
-                name_index[name] = obj    
+            name_index[name] = obj    
 
     def load(self, file_name):
+        if self.index is not None: return # All files are indexed
+        if (os.path.getsize(file_name) >= self.index_size
+            and self.open_index(build=True) is not None): return
         CAS_index = self.CAS_index
         name_index = self.name_index
         pubchem_index = self.pubchem_index
@@ -111,73 +382,63 @@ class ChemicalMetadataDB:
         InChI_index = self.InChI_index
         InChI_key_index = self.InChI_key_index
         formula_index = self.formula_index
-        f = open(file_name)
-        for line in f:
-            # This is effectively the documentation for the file format of the file
-            values = line.rstrip('\n').split('\t')
-            (pubchemid, CAS, formula, MW, smiles, InChI, InChI_key, iupac_name, common_name) = values[0:9]
-            CAS = int(CAS.replace('-', '')) # Store as int for easier lookup
-            synonyms = values[7:]
-            pubchemid = int(pubchemid)
+        for values, flat_synonyms in file_metadata(file_name):
+            CAS = values[1]
             if CAS in CAS_index:
                 obj = CAS_index[CAS]
             else:
-                obj = ChemicalMetadata(pubchemid, CAS, formula, float(MW), smiles,
-                                       InChI, InChI_key, iupac_name, common_name, synonyms)
+                obj = ChemicalMetadata(*values)
                 CAS_index[CAS] = obj
-                pubchem_index[pubchemid] = obj
-                smiles_index[smiles] = obj
-                InChI_index[InChI] = obj
-                InChI_key_index[InChI_key] = obj
-                formula_index[formula] = obj
-            flat_synonyms = []
-            for name in synonyms:
-                for name in name.split(';'):
-                    if name: flat_synonyms.append(name)
+                pubchem_index[obj.pubchemid] = obj
+                smiles_index[obj.smiles] = obj
+                InChI_index[obj.InChI] = obj
+                InChI_key_index[obj.InChI_key] = obj
+                formula_index[obj.formula] = obj
             for name in flat_synonyms:
-                if not name: continue
-                name = name.lower()
                 if name not in name_index:
                     name_index[name] = obj
-        f.close()
-    
     
-    def search_index(self, index, key, autoload=None):
-        if key in index:
-            return index[key]
-        elif autoload: 
+    def search_index(self, kind, key, autoload=None):
+        if not self.index_opened: self.open_index()
+        index = self.index
+        if index is not None: 
+            obj = index.search(kind, key, self.level)
+            if obj is not None or not autoload: return obj
+        else:
+            index = getattr(self, kind + '_index')
+            if key in index: return index[key]
+        if autoload: 
             files = self.unloaded_files
             if files:
                 self.load(files.pop())
-                return self.search_index(index, key)
+                return self.search_index(kind, key)
             
     def search_pubchem(self, pubchem, autoload=None):
-        return self.search_index(self.pubchem_index, int(pubchem))
+        return self.search_index('pubchem', int(pubchem))
         
     def search_CAS(self, CAS, autoload=None):
-        return self.search_index(self.CAS_index, CAS_to_int(CAS))
+        return self.search_index('CAS', CAS_to_int(CAS))
 
     def search_smiles(self, smiles, autoload=None):
-        return self.search_index(self.smiles_index, smiles)
+        return self.search_index('smiles', smiles)
 
     def search_InChI(self, InChI, autoload=None):
-        return self.search_index(self.InChI_index, InChI)
+        return self.search_index('InChI', InChI)
 
     def search_InChI_key(self, InChI_key, autoload=None):
-        return self.search_index(self.InChI_key_index, InChI_key)
+        return self.search_index('InChI_key', InChI_key)
 
     def search_name(self, name, autoload=None):
-        return self.search_index(self.name_index, name)
+        return self.search_index('name', name)
     
     def search_formula(self, formula, autoload=None):
-        return self.search_index(self.formula_index, formula)
+        return self.search_index('formula', formula)
 
     def search(self, ID):
         cache = self.cache
         if ID in cache:
             return cache[ID]
         else:
-            if len(cache) > 100: cache.clear()
             try:
                 cache[ID] = obj = self._search(ID)
             except Exception as e:
@@ -16,6 +16,7 @@ __all__ = []
 
 from . import ideal
 from . import domain
+from . import caches
 from . import activity_coefficients
 from . import fugacity_coefficients
 from . import dew_point
@@ -32,6 +33,7 @@ from . import flash_package
 
 __all__ = (*ideal.__all__,
            *domain.__all__,
+           *caches.__all__,
            *activity_coefficients.__all__,
            *vle.__all__,
            *lle.__all__,
@@ -48,6 +50,7 @@ __all__ = (*ideal.__all__,
 
 from .ideal import *
 from .domain import *
+from .caches import *
 from .vle import *
 from .lle import *
 from .sle import *
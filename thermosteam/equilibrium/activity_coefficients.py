@@ -20,8 +20,9 @@ from warnings import warn
 from .unifac import DOUFSG, DOUFIP2016, UFIP, UFSG, NISTUFSG, NISTUFIP
 from numba import njit, prange
 from .ideal import ideal
+from .caches import equilibrium_caches
 import thermosteam as tmo
-from thermo.interaction_parameters import IPDB
+from thermo import interaction_parameters
 from fluids.constants import R_inv
 from thermo import eos_mix
 import numpy as np
@@ -62,6 +63,36 @@ def group_activity_coefficients(x, chemgroups, loggammacs,
     loggammars = ((loggamma_groups - chem_loggamma_groups) * chemgroups).sum(1)
     return np.exp(loggammacs + loggammars)
 
+@njit(cache=True)
+def group_activity_coefficients_and_T_derivatives(x, chemgroups, loggammacs, Qs, 
+                                                  psis, dpsis, cQfs, gpsis, dgpsis):
+    # Same as `group_activity_coefficients`, but also return the temperature
+    # derivative of the logarithm of activity coefficients given the 
+    # temperature derivatives of psis.
+    weighted_counts = chemgroups.transpose() @ x
+    Q_fractions = Qs * weighted_counts 
+    Q_fractions /= Q_fractions.sum()
+    sum1 = psis @ Q_fractions
+    dsum1 = dpsis @ Q_fractions
+    ratios = Q_fractions / sum1
+    sum2 = -(psis.transpose() @ ratios)
+    dsum2 = psis.transpose() @ (ratios * dsum1 / sum1) - dpsis.transpose() @ ratios
+    loggamma_groups = Qs * (1. - np.log(sum1) + sum2)
+    dloggamma_groups = Qs * (dsum2 - dsum1 / sum1)
+    sum1 = cQfs @ gpsis.transpose()
+    dsum1 = cQfs @ dgpsis.transpose()
+    empty = sum1 == 0
+    sum1 = np.where(empty, 1., sum1)
+    dsum1 = np.where(empty, 0., dsum1)
+    fracs = - cQfs / sum1
+    sum2 = fracs @ gpsis
+    dsum2 = fracs @ dgpsis - (fracs * dsum1 / sum1) @ gpsis
+    chem_loggamma_groups = Qs*(1. - np.log(sum1) + sum2)
+    dchem_loggamma_groups = Qs * (dsum2 - dsum1 / sum1)
+    loggammars = ((loggamma_groups - chem_loggamma_groups) * chemgroups).sum(1)
+    dloggammars = ((dloggamma_groups - dchem_loggamma_groups) * chemgroups).sum(1)
+    return np.exp(loggammacs + loggammars), dloggammars
+
 def get_interaction(all_interactions, i, j, no_interaction):
     if i==j:
         return no_interaction
@@ -113,10 +144,18 @@ def psi_modified_UNIFAC(T, abc):
     abc[:, :, 2] *= T
     return np.exp(-abc.sum(2)) 
 
+@njit(cache=True)
+def dpsi_modified_UNIFAC(T, abc, psis):
+    return psis * (abc[:, :, 0] / (T * T) - abc[:, :, 2])
+
 @njit(cache=True)
 def psi_UNIFAC(T, a):
     return np.exp(-a/T)
 
+@njit(cache=True)
+def dpsi_UNIFAC(T, a, psis):
+    return psis * a / (T * T)
+
 @njit(cache=True)
 def fill_group_psis(group_psis, psis, group_mask):
     M = psis.shape[0]
@@ -181,6 +220,67 @@ def gamma_modified_UNIFAC(x, T, interactions,
     return gamma
     
     
+@njit(cache=True)
+def fill_group_activity_coefficients(gamma, dlngamma_dT, x_sub, index, 
+                                     loggammacs, Qs, psis, dpsis, 
+                                     group_mask, chemgroups, chem_Qfractions):
+    gamma_sub, dlngamma_dT_sub = group_activity_coefficients_and_T_derivatives(
+        x_sub, chemgroups, loggammacs, Qs, psis, dpsis, chem_Qfractions, 
+        np.where(group_mask, psis, 0.), np.where(group_mask, dpsis, 0.),
+    )
+    for i, j in enumerate(index):
+        value = gamma_sub[i]
+        if np.isnan(value): continue
+        gamma[j] = value
+        dlngamma_dT[j] = dlngamma_dT_sub[i]
+
+@njit(cache=True)
+def gamma_UNIFAC_batch(X, T, interactions, group_mask, qs, rs, Qs,
+                       chemgroups, chem_Qfractions, index):
+    M, N = X.shape
+    gamma = np.ones((M, N))
+    dlngamma_dT = np.zeros((M, N))
+    N_chemicals = index.size
+    if N_chemicals > 1:
+        x_sub = np.zeros(N_chemicals)
+        for k in range(M):
+            for i, j in enumerate(index): x_sub[i] = X[k, j]
+            xsum = x_sub.sum()
+            if xsum == 0.: continue
+            x_sub /= xsum
+            psis = psi_UNIFAC(T[k], interactions.copy())
+            fill_group_activity_coefficients(
+                gamma[k], dlngamma_dT[k], x_sub, index, 
+                loggammacs_UNIFAC(qs, rs, x_sub), Qs, psis, 
+                dpsi_UNIFAC(T[k], interactions, psis),
+                group_mask, chemgroups, chem_Qfractions
+            )
+    return gamma, dlngamma_dT
+
+@njit(cache=True)
+def gamma_modified_UNIFAC_batch(X, T, interactions, group_mask, qs, rs, Qs,
+                                chemgroups, chem_Qfractions, index):
+    M, N = X.shape
+    gamma = np.ones((M, N))
+    dlngamma_dT = np.zeros((M, N))
+    N_chemicals = index.size
+    if N_chemicals > 1:
+        x_sub = np.zeros(N_chemicals)
+        for k in range(M):
+            for i, j in enumerate(index): x_sub[i] = X[k, j]
+            xsum = x_sub.sum()
+            if xsum == 0.: continue
+            x_sub /= xsum
+            psis = psi_modified_UNIFAC(T[k], interactions.copy())
+            fill_group_activity_coefficients(
+                gamma[k], dlngamma_dT[k], x_sub, index, 
+                loggammacs_modified_UNIFAC(qs, rs, x_sub), Qs, psis, 
+                dpsi_modified_UNIFAC(T[k], interactions, psis),
+                group_mask, chemgroups, chem_Qfractions
+            )
+    return gamma, dlngamma_dT
+    
+    
 # %% Activity Coefficients
 
 class ActivityCoefficients:
@@ -207,6 +307,44 @@ class ActivityCoefficients:
         """tuple[Chemical] All chemicals involved in the calculation of activity coefficients."""
         return self._chemicals
     
+    def gamma_and_dlngamma_dT(self, x, T, dT=1e-3):
+        """
+        Return activity coefficients and the temperature derivatives of 
+        their logarithm (by central differences unless implemented 
+        analytically by subclasses).
+        
+        """
+        gamma = self(x, T)
+        dlngamma_dT = (np.log(self(x, T + dT)) - np.log(self(x, T - dT))) / (2. * dT)
+        return gamma, dlngamma_dT
+    
+    def batch(self, X, T, derivative=False):
+        """
+        Return a 2-d array of activity coefficients (and an array of the
+        temperature derivatives of their logarithm if `derivative` is True)
+        with a row for each composition in `X` and temperature in `T`.
+        
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'], cache=True)
+        >>> Gamma = tmo.equilibrium.DortmundActivityCoefficients(chemicals)
+        >>> Gamma.batch([[0.5, 0.5], [0.9, 0.1]], 350.)
+        array([[1.475, 1.242],
+               [1.029, 3.258]])
+        
+        """
+        X = np.asarray(X, float)
+        T = np.broadcast_to(T, X.shape[:1])
+        if derivative:
+            gamma = np.empty_like(X)
+            dlngamma_dT = np.empty_like(X)
+            for i, (x, t) in enumerate(zip(X, T)):
+                gamma[i], dlngamma_dT[i] = self.gamma_and_dlngamma_dT(x, t)
+            return gamma, dlngamma_dT
+        else:
+            return np.array([self(x, t) for x, t in zip(X, T)], float).reshape(X.shape)
+    
     def __repr__(self):
         chemicals = ", ".join([i.ID for i in self.chemicals])
         return f"{type(self).__name__}([{chemicals}])"
@@ -230,6 +368,14 @@ class IdealActivityCoefficients(ActivityCoefficients):
     def __call__(self, xs, T):
         return np.ones(len(xs))
     
+    def gamma_and_dlngamma_dT(self, xs, T):
+        N = len(xs)
+        return np.ones(N), np.zeros(N)
+    
+    def batch(self, X, T, derivative=False):
+        shape = np.shape(X)
+        return (np.ones(shape), np.zeros(shape)) if derivative else np.ones(shape)
+    
 
 class GroupActivityCoefficients(ActivityCoefficients):
     """
@@ -341,6 +487,65 @@ class GroupActivityCoefficients(ActivityCoefficients):
         x = np.asarray(x, float)
         return self.f(x, T, *self.args)
     
+    def gamma_and_dlngamma_dT(self, x, T):
+        """
+        Return activity coefficients and the temperature derivatives of 
+        their logarithm.
+        
+        Parameters
+        ----------
+        x : array_like
+            Molar fractions
+        T : float
+            Temperature [K]
+        
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'], cache=True)
+        >>> Gamma = tmo.equilibrium.DortmundActivityCoefficients(chemicals)
+        >>> gamma, dlngamma_dT = Gamma.gamma_and_dlngamma_dT([0.5, 0.5], 350.)
+        >>> gamma
+        array([1.475, 1.242])
+        >>> dlngamma_dT
+        array([ 3.645e-05, -4.855e-04])
+        
+        """
+        x = np.asarray(x, float)
+        N = x.size
+        gamma = np.ones(N)
+        dlngamma_dT = np.zeros(N)
+        index = self._index
+        if index.size < 2: return gamma, dlngamma_dT
+        x_sub = x[index]
+        xsum = x_sub.sum()
+        if not xsum: return gamma, dlngamma_dT
+        x_sub /= xsum
+        interactions = self._interactions
+        psis = self.psi(T, interactions.copy())
+        dpsis = self.dpsi(T, interactions, psis)
+        group_mask = self._group_mask
+        gamma_sub, dlngamma_dT_sub = group_activity_coefficients_and_T_derivatives(
+            x_sub, self._chemgroups, self.loggammacs(self._qs, self._rs, x_sub),
+            self._Qs, psis, dpsis, self._chem_Qfractions,
+            np.where(group_mask, psis, 0.), np.where(group_mask, dpsis, 0.),
+        )
+        defined = ~np.isnan(gamma_sub)
+        index = index[defined]
+        gamma[index] = gamma_sub[defined]
+        dlngamma_dT[index] = dlngamma_dT_sub[defined]
+        return gamma, dlngamma_dT
+    
+    def batch(self, X, T, derivative=False):
+        X = np.asarray(X, float)
+        T = np.array(np.broadcast_to(T, X.shape[:1]), float)
+        gamma, dlngamma_dT = self.f_batch(
+            X, T, self._interactions, self._group_mask,
+            self._qs, self._rs, self._Qs, self._chemgroups, 
+            self._chem_Qfractions, self._index,
+        )
+        return (gamma, dlngamma_dT) if derivative else gamma
+    
     
 class UNIFACActivityCoefficients(GroupActivityCoefficients):
     """
@@ -358,12 +563,16 @@ class UNIFACActivityCoefficients(GroupActivityCoefficients):
     all_interactions = UFIP
     group_name = 'UNIFAC'
     _no_interaction = 0.
-    _cached = {}
+    _cached = equilibrium_caches.new('UNIFACActivityCoefficients')
     
     @property
     def f(self):
         return gamma_UNIFAC
     
+    @property
+    def f_batch(self):
+        return gamma_UNIFAC_batch
+    
     @property
     def loggammacs(self):
         return loggammacs_UNIFAC
@@ -371,6 +580,10 @@ class UNIFACActivityCoefficients(GroupActivityCoefficients):
     @property
     def psi(self):
         return psi_UNIFAC
+    
+    @property
+    def dpsi(self):
+        return dpsi_UNIFAC
 
 
 class DortmundActivityCoefficients(GroupActivityCoefficients):
@@ -415,12 +628,16 @@ class DortmundActivityCoefficients(GroupActivityCoefficients):
     all_interactions = DOUFIP2016
     group_name = 'Dortmund'
     _no_interaction = np.array([0., 0., 0.])
-    _cached = {}
+    _cached = equilibrium_caches.new('DortmundActivityCoefficients')
     
     @property
     def f(self):
         return gamma_modified_UNIFAC
     
+    @property
+    def f_batch(self):
+        return gamma_modified_UNIFAC_batch
+    
     @property
     def loggammacs(self):
         return loggammacs_modified_UNIFAC
@@ -429,6 +646,10 @@ class DortmundActivityCoefficients(GroupActivityCoefficients):
     def psi(self):
         return psi_modified_UNIFAC
     
+    @property
+    def dpsi(self):
+        return dpsi_modified_UNIFAC
+    
     
 class NISTActivityCoefficients(GroupActivityCoefficients):
     """
@@ -459,9 +680,10 @@ class NISTActivityCoefficients(GroupActivityCoefficients):
     all_interactions = NISTUFIP
     group_name = 'NIST'
     _no_interaction = np.array([0., 0., 0.])
-    _cached = {}
+    _cached = equilibrium_caches.new('NISTActivityCoefficients')
     
     f = DortmundActivityCoefficients.f
+    f_batch = DortmundActivityCoefficients.f_batch
     
     @property
     def loggammacs(self):
@@ -470,6 +692,10 @@ class NISTActivityCoefficients(GroupActivityCoefficients):
     @property
     def psi(self):
         return psi_modified_UNIFAC
+    
+    @property
+    def dpsi(self):
+        return dpsi_modified_UNIFAC
 
 
 class GCEOSActivityCoefficients(ActivityCoefficients):
@@ -485,7 +711,7 @@ class GCEOSActivityCoefficients(ActivityCoefficients):
     __slots__ = ('_chemicals', '_eos')
     EOS = None # type[GCEOSMIX] Subclasses must implement this attribute.
     chemsep_db = None # Optional[str] Name of chemsep data base for interaction parameters.
-    cache = None # [dict] Subclasses must implement this attribute.
+    cache = None # [EquilibriumCache] Subclasses must implement this attribute.
     
     def __new__(cls, chemicals):
         chemicals = tuple(chemicals)
@@ -501,7 +727,7 @@ class GCEOSActivityCoefficients(ActivityCoefficients):
     @classmethod
     def subclass(cls, EOS, name=None):
         if name is None: name = EOS.__name__[:-3] + 'ActivityCoefficients'
-        return type(name, (cls,), dict(EOS=EOS, cache={}))
+        return type(name, (cls,), dict(EOS=EOS, cache=equilibrium_caches.new(name)))
     
     @property
     def chemicals(self):
@@ -518,7 +744,7 @@ class GCEOSActivityCoefficients(ActivityCoefficients):
                 kijs = None
             else:
                 try:
-                    kijs = IPDB.get_ip_asymmetric_matrix(self.chemsep_db, data.CASs, 'kij')
+                    kijs = interaction_parameters.IPDB.get_ip_asymmetric_matrix(self.chemsep_db, data.CASs, 'kij')
                 except:
                     kijs = None
             self._eos = eos = self.EOS(
@@ -10,10 +10,13 @@
 import numpy as np
 import flexsolve as flx
 from .fugacity_coefficients import IdealFugacityCoefficients
+from .poyinting_correction_factors import MockPoyintingCorrectionFactors
 from .domain import vle_domain
+from .caches import equilibrium_caches
 from ..exceptions import InfeasibleRegion
 from .. import functional as fn
 from .._settings import settings
+from ..mixture.property_array import VaporPressureArray
 
 __all__ = (
     'BubblePoint', 'BubblePointValues',
@@ -34,6 +37,21 @@ def solve_y(y_phi, phi, T, P, y_guess):
                         convergenceiter=5,
                         maxiter=BubblePoint.maxiter)
 
+def batch_arguments(Z, V):
+    # Return compositions as a 2-d array, temperatures or pressures as a 
+    # 1-d array (one for each composition), and the number of positive 
+    # components in each composition.
+    Z = np.array(Z, float, ndmin=2)
+    M = Z.shape[0]
+    V = np.array(np.broadcast_to(np.asarray(V, float), (M,)))
+    N = (Z > 0.).sum(1)
+    if not N.all(): raise ValueError('no components present')
+    return Z, V, N
+
+def dlog(values, derivatives):
+    # Derivatives of the logarithm of positive values (zero otherwise).
+    return np.divide(derivatives, values, out=np.zeros_like(values), where=values > 0.)
+
 
 # %% Bubble point values container
 
@@ -99,14 +117,27 @@ class BubblePoint:
     >>> # Solve bubble point at constant pressure
     >>> BP(z=molar_composition, P=101325)
     BubblePointValues(T=353.03, P=101325, IDs=('Water', 'Ethanol'), z=[0.5 0.5], y=[0.343 0.657])
+    >>> # Solve bubble point by Newton's method (warm started from the last solution)
+    >>> BP(z=(0.6, 0.4), P=101325, solver='newton')
+    BubblePointValues(T=353.83, P=101325, IDs=('Water', 'Ethanol'), z=[0.6 0.4], y=[0.383 0.617])
+    >>> BP.T_iter # Number of Newton iterations
+    4
     
     """
     __slots__ = ('chemicals', 'IDs', 'gamma', 'phi', 'pcf',
-                 'Psats', 'Tmin', 'Tmax', 'Pmin', 'Pmax')
-    _cached = {}
+                 'Psats', 'Psat', 'Tmin', 'Tmax', 'Pmin', 'Pmax',
+                 'T_last', 'T_iter')
+    _cached = equilibrium_caches.new('BubblePoint')
     maxiter = 50
     T_tol = 1e-9
     P_tol = 1e-3
+    
+    #: [str] Default solver for bubble point temperatures; either 'secant' 
+    #: (Aitken-secant with inverse quadratic interpolation as a fallback) or 
+    #: 'newton' (analytic temperature derivatives of vapor pressures and 
+    #: activity coefficients, warm started from the last solution).
+    T_solver = 'secant'
+    
     def __new__(cls, chemicals=(), thermo=None):
         thermo = settings.get_default_thermo(thermo)
         chemicals = tuple(chemicals)
@@ -120,19 +151,21 @@ class BubblePoint:
             self.gamma = thermo.Gamma(chemicals)
             self.phi = thermo.Phi(chemicals)
             self.pcf = thermo.PCF(chemicals)
-            self.Psats = Psats = [i.Psat for i in chemicals]
+            self.Psats = [i.Psat for i in chemicals]
+            self.Psat = Psat = VaporPressureArray(chemicals)
             Tmin, Tmax = vle_domain(chemicals)
             self.Tmin = Tmin
             self.Tmax = Tmax
-            self.Pmin = min([i(Tmin) for i in Psats])
-            self.Pmax = max([i(Tmax) for i in Psats])
+            self.Pmin = float(Psat(Tmin).min())
+            self.Pmax = float(Psat(Tmax).max())
+            self.T_last = self.T_iter = None
             self.chemicals = chemicals
             cached[key] = self
             return self
     
     def _T_error(self, T, P, z_over_P, z_norm, y):
         if T <= 0: raise InfeasibleRegion('negative temperature')
-        Psats = np.array([i(T) for i in self.Psats], dtype=float)
+        Psats = self.Psat(T)
         y_phi =  (z_over_P
                   * Psats
                   * self.gamma(z_norm, T) 
@@ -140,6 +173,45 @@ class BubblePoint:
         y[:] = solve_y(y_phi, self.phi, T, P, y)
         return 1. - y.sum()
     
+    def _T_error_and_derivative(self, T, P, z_over_P, z_norm, y):
+        # Logarithm of the sum of vapor molar fractions and its derivative 
+        # with respect to temperature (neglecting derivatives of fugacity and 
+        # Poynting correction factors).
+        Psats, dPsats = self.Psat(T, derivative=True)
+        gamma, dlngamma = self.gamma.gamma_and_dlngamma_dT(z_norm, T)
+        y_phi =  (z_over_P
+                  * Psats
+                  * gamma
+                  * self.pcf(T, P, Psats))
+        y[:] = solve_y(y_phi, self.phi, T, P, y)
+        y_sum = y.sum()
+        return np.log(y_sum), (y * (dlog(Psats, dPsats) + dlngamma)).sum() / y_sum
+    
+    def _T_error_and_derivative_batch(self, T, index, P, Z_over_P, Z_norm, Y, ideal):
+        # Vectorized `_T_error_and_derivative` for the compositions at `index`;
+        # activity coefficients are neglected if `ideal` is True.
+        Psats, dPsats = self.Psat.batch(T, derivative=True)
+        Z_over_P = Z_over_P[index]
+        if ideal:
+            Yi = Z_over_P * Psats
+            dlngamma = 0.
+        else:
+            gamma, dlngamma = self.gamma.batch(Z_norm[index], T, derivative=True)
+            Yi = Z_over_P * Psats * gamma
+            if not self._ideal_vapor():
+                phi = self.phi; pcf = self.pcf; P = P[index]
+                for k, y_phi in enumerate(Yi):
+                    y_phi *= pcf(T[k], P[k], Psats[k])
+                    Yi[k] = solve_y(y_phi, phi, T[k], P[k], y_phi)
+        Y[index] = Yi
+        Y_sum = Yi.sum(1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log(Y_sum), (Yi * (dlog(Psats, dPsats) + dlngamma)).sum(1) / Y_sum
+    
+    def _ideal_vapor(self):
+        return (isinstance(self.phi, IdealFugacityCoefficients)
+                and isinstance(self.pcf, MockPoyintingCorrectionFactors))
+    
     def _P_error(self, P, T, z_Psat_gamma, Psats, y):
         if P <= 0: raise InfeasibleRegion('negative pressure')
         y_phi = z_Psat_gamma * self.pcf(T, P, Psats) / P
@@ -151,7 +223,7 @@ class BubblePoint:
         dz[:] = liquid_conversion(z, T, P, 'l')
         x[:] = z + dz
         x /= x.sum()
-        Psats = np.array([i(T) for i in self.Psats], dtype=float)
+        Psats = self.Psat(T)
         y_phi =  (x / P
                   * Psats
                   * self.gamma(x, T) 
@@ -170,7 +242,7 @@ class BubblePoint:
         return 1. - y.sum()
     
     def _T_error_ideal(self, T, z_over_P, y):
-        y[:] = z_over_P * np.array([i(T) for i in self.Psats], dtype=float)
+        y[:] = z_over_P * self.Psat(T)
         return 1 - y.sum()
     
     def _Ty_ideal(self, z_over_P):
@@ -195,13 +267,13 @@ class BubblePoint:
         y = z_Psat_gamma_pcf / P
         return P, y
     
-    def __call__(self, z, *, T=None, P=None, liquid_conversion=None):
+    def __call__(self, z, *, T=None, P=None, liquid_conversion=None, solver=None):
         z = np.asarray(z, float)
         if T:
             if P: raise ValueError("may specify either T or P, not both")
             P, *args = self.solve_Py(z, T, liquid_conversion)
         elif P:
-            T, *args = self.solve_Ty(z, P, liquid_conversion)
+            T, *args = self.solve_Ty(z, P, liquid_conversion, solver)
         else:
             raise ValueError("must specify either T or P")
         if liquid_conversion:
@@ -209,7 +281,7 @@ class BubblePoint:
         else:
             return BubblePointValues(T, P, self.IDs, z, *args)
     
-    def solve_Ty(self, z, P, liquid_conversion=None):
+    def solve_Ty(self, z, P, liquid_conversion=None, solver=None):
         """
         Bubble point at given composition and pressure.
 
@@ -219,6 +291,12 @@ class BubblePoint:
             Molar composition.
         P : float
             Pressure [Pa].
+        solver : str, optional
+            Either 'secant' or 'newton'. Defaults to `T_solver`. Newton's 
+            method is warm started from the last solution (`T_last`) and 
+            the number of iterations is stored in `T_iter`. If Newton's 
+            method fails, the secant method is used instead. Reactive 
+            bubble points are always solved by the secant method.
         
         Returns
         -------
@@ -236,8 +314,15 @@ class BubblePoint:
         >>> BP = tmo.equilibrium.BubblePoint(chemicals)
         >>> tmo.docround(BP.solve_Ty(z=np.array([0.6, 0.4]), P=101325))
         (353.8284, array([0.383, 0.617]))
+        >>> tmo.docround(BP.solve_Ty(z=np.array([0.6, 0.4]), P=101325, solver='newton'))
+        (353.8284, array([0.383, 0.617]))
         
         """
+        if solver is None: 
+            solver = self.T_solver
+        elif solver not in ('secant', 'newton'):
+            raise ValueError(f"solver must be either 'secant' or 'newton', not {solver!r}")
+        self.T_iter = None
         positives = z > 0.
         N = positives.sum()
         if N == 0:
@@ -248,9 +333,25 @@ class BubblePoint:
             y = z.copy()
             return T, fn.normalize(y)
         elif liquid_conversion is None:
-            f = self._T_error
             z_norm = z / z.sum()
             z_over_P = z/P
+            if solver == 'newton':
+                Tmin = self.Tmin; Tmax = self.Tmax
+                T_guess = self.T_last
+                if T_guess is None or not Tmin < T_guess < Tmax:
+                    T_guess, y = self._Ty_ideal(z_over_P)
+                else: # Ideal vapor composition at the last bubble point
+                    y = z_norm.copy()
+                    self._T_error_ideal(T_guess, z_over_P, y)
+                result = fn.solve_T_newton(
+                    self._T_error_and_derivative, T_guess, self.T_tol, 
+                    self.maxiter, Tmin, Tmax, (P, z_over_P, z_norm, y),
+                )
+                if result is not None:
+                    T, self.T_iter = result
+                    self.T_last = T
+                    return T, fn.normalize(y)
+            f = self._T_error
             T_guess, y = self._Ty_ideal(z_over_P)
             args = (P, z_over_P, z_norm, y)
             try:
@@ -265,6 +366,7 @@ class BubblePoint:
                                          T_guess, self.T_tol, 5e-12, args, 
                                          checkiter=False, checkbounds=False, 
                                          maxiter=self.maxiter)
+            self.T_last = T
             return T, fn.normalize(y)
         else:
             f = self._T_error_reactive
@@ -287,6 +389,132 @@ class BubblePoint:
                                          maxiter=self.maxiter)
             return T, dz, fn.normalize(y), x
     
+    def solve_Ty_batch(self, Z, P):
+        """
+        Bubble points at given compositions and pressures. Newton's method
+        is vectorized across compositions (activity coefficients are 
+        computed one composition at a time) and compositions that fail to 
+        converge are solved one at a time by `solve_Ty`.
+
+        Parameters
+        ----------
+        Z : array_like
+            Molar compositions (a row for each bubble point).
+        P : float or array_like
+            Pressure(s) [Pa].
+        
+        Returns
+        -------
+        T : ndarray
+            Bubble point temperatures [K].
+        Y : ndarray
+            Vapor phase molar compositions.
+
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> import numpy as np
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'], cache=True)
+        >>> tmo.settings.set_thermo(chemicals)
+        >>> BP = tmo.equilibrium.BubblePoint(chemicals)
+        >>> T, Y = BP.solve_Ty_batch(Z=[[0.6, 0.4], [0.9, 0.1], [1., 0.]], P=101325)
+        >>> tmo.docround(T)
+        array([353.828, 359.53 , 373.124])
+        >>> Y
+        array([[0.383, 0.617],
+               [0.558, 0.442],
+               [1.   , 0.   ]])
+        
+        """
+        Z, P, N = batch_arguments(Z, P)
+        T = np.empty(P.size)
+        Y = np.empty_like(Z)
+        mixtures = N > 1
+        index = np.flatnonzero(mixtures)
+        if index.size:
+            Zm = Z[index]
+            Z_norm = Zm / Zm.sum(1, keepdims=True)
+            Z_over_P = Zm / P[index, None]
+            Ym = Z_norm.copy()
+            Pm = P[index]
+            Tmin = self.Tmin; Tmax = self.Tmax
+            args = (Pm, Z_over_P, Z_norm, Ym)
+            f = self._T_error_and_derivative_batch
+            Tm, iterations = fn.solve_T_newton_batch(
+                lambda T, index: f(T, index, *args, True), 
+                np.full(index.size, 0.5 * (Tmin + Tmax)), 
+                self.T_tol, self.maxiter, Tmin, Tmax,
+            )
+            Tm, iterations = fn.solve_T_newton_batch(
+                lambda T, index: f(T, index, *args, False), 
+                Tm, self.T_tol, self.maxiter, Tmin, Tmax,
+            )
+            T[index] = Tm
+            converged = iterations > 0
+            Ym = Ym[converged]
+            Y[index[converged]] = Ym / Ym.sum(1, keepdims=True)
+            mixtures[index[~converged]] = False
+        for i in np.flatnonzero(~mixtures):
+            T[i], Y[i] = self.solve_Ty(Z[i], P[i], solver='secant')
+        return T, Y
+    
+    def solve_Py_batch(self, Z, T):
+        """
+        Bubble points at given compositions and temperatures. Pressures 
+        are vectorized across compositions (activity coefficients are 
+        computed one composition at a time) if fugacity and Poyinting 
+        correction factors are ideal; otherwise bubble points are solved one 
+        at a time by `solve_Py`.
+
+        Parameters
+        ----------
+        Z : array_like
+            Molar compositions (a row for each bubble point).
+        T : float or array_like
+            Temperature(s) [K].
+        
+        Returns
+        -------
+        P : ndarray
+            Bubble point pressures [Pa].
+        Y : ndarray
+            Vapor phase molar compositions.
+
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> import numpy as np
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'], cache=True)
+        >>> tmo.settings.set_thermo(chemicals)
+        >>> BP = tmo.equilibrium.BubblePoint(chemicals)
+        >>> P, Y = BP.solve_Py_batch(Z=[[0.703, 0.297], [0.9, 0.1], [1., 0.]], T=352.28)
+        >>> tmo.docround(P)
+        array([91592.781, 76321.517, 45768.699])
+        >>> Y
+        array([[0.42 , 0.58 ],
+               [0.555, 0.445],
+               [1.   , 0.   ]])
+        
+        """
+        Z, T, N = batch_arguments(Z, T)
+        P = np.empty(T.size)
+        Y = np.empty_like(Z)
+        mixtures = N > 1
+        if self._ideal_vapor():
+            index = np.flatnonzero(mixtures)
+            Zm = Z[index]
+            Tm = np.clip(T[index], self.Tmin, self.Tmax)
+            Z_norm = Zm / Zm.sum(1, keepdims=True)
+            Z_Psat_gamma = Z_norm * self.Psat.batch(Tm) * self.gamma.batch(Z_norm, Tm)
+            Pm = Z_Psat_gamma.sum(1)
+            P[index] = Pm
+            Y[index] = Z_Psat_gamma / Pm[:, None]
+        else:
+            mixtures[:] = False
+        for i in np.flatnonzero(~mixtures):
+            P[i], Y[i] = self.solve_Py(Z[i], T[i])
+        return P, Y
+    
     def solve_Py(self, z, T, liquid_conversion=None):
         """
         Bubble point at given composition and temperature.
@@ -328,7 +556,7 @@ class BubblePoint:
         elif liquid_conversion is None:
             if T > self.Tmax: T = self.Tmax
             elif T < self.Tmin: T = self.Tmin
-            Psats = np.array([i(T) for i in self.Psats])
+            Psats = self.Psat(T)
             z_norm = z / z.sum()
             z_Psat_gamma = z_norm * Psats * self.gamma(z_norm, T)
             f = self._P_error
@@ -348,7 +576,7 @@ class BubblePoint:
         else:
             f = self._P_error_reactive
             z_norm = z / z.sum()
-            Psats = np.array([i(T) for i in self.Psats])
+            Psats = self.Psat(T)
             x = z_norm.copy()
             dz = z_norm.copy()
             z_Psat_gamma = z * Psats * self.gamma(z_norm, T)
@@ -409,7 +637,7 @@ class BubblePointBeta:
     
     __call__ = BubblePoint.__call__
     
-    def solve_Ty(self, z, P, liquid_conversion=None):
+    def solve_Ty(self, z, P, liquid_conversion=None, solver=None):
         """
         Bubble point at given composition and pressure.
 
@@ -419,6 +647,8 @@ class BubblePointBeta:
             Molar composition.
         P : float
             Pressure [Pa].
+        solver : str, optional
+            Not used; the flasher solves for the bubble point.
         
         Returns
         -------
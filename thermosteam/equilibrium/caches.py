@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+"""
+import numpy as np
+from sys import getsizeof
+from math import log
+from ..utils import MemoryLRUCache
+from ..mixture.mixture import eos_memory
+from .._chemical import Chemical
+from .._chemicals import Chemicals
+
+__all__ = (
+    'EquilibriumCache',
+    'KValueCache',
+    'EquilibriumCaches',
+    'equilibrium_caches',
+    'clear_equilibrium_caches',
+)
+
+# %% Memory estimation
+
+def value_memory(value, depth):
+    # Estimated memory of an attribute of an equilibrium object [bytes].
+    if value is None:
+        return 0
+    elif isinstance(value, np.ndarray):
+        return getsizeof(value) if value.base is None else getsizeof(value) + value.nbytes
+    elif isinstance(value, (list, tuple)):
+        size = getsizeof(value)
+        if value and isinstance(value[0], (np.ndarray, list, tuple)):
+            size += sum([value_memory(i, depth) for i in value])
+        return size
+    elif isinstance(value, (Chemical, Chemicals)) or equilibrium_caches.holds(value):
+        return 0 # Shared, not owned
+    module = type(value).__module__
+    if module.startswith('thermo.eos'):
+        return eos_memory(value)
+    elif module.startswith('thermosteam') and depth:
+        return equilibrium_memory(value, depth - 1)
+    else: # Shared models (e.g., vapor pressure) are not owned
+        return getsizeof(value)
+
+def equilibrium_memory(obj, depth=2):
+    # Estimated memory of an equilibrium object [bytes] including arrays,
+    # containers, and equations of state it holds, but not chemicals,
+    # thermodynamic models, or objects in other equilibrium caches.
+    size = getsizeof(obj)
+    for cls in type(obj).__mro__:
+        names = cls.__dict__.get('__slots__', ())
+        if isinstance(names, str): names = (names,)
+        for name in names: size += value_memory(getattr(obj, name, None), depth)
+    if hasattr(obj, '__dict__'):
+        size += sum([value_memory(i, depth) for i in obj.__dict__.values()])
+    return size
+
+
+# %% Equilibrium caches
+
+class EquilibriumCache(MemoryLRUCache):
+    """
+    Create an EquilibriumCache object, an LRUCache of equilibrium objects
+    (e.g., bubble points or activity coefficients) by chemicals that also
+    discards the least recently used objects when their estimated memory
+    exceeds `maxmemory`. Equilibrium caches are created by the
+    :obj:`~thermosteam.equilibrium.equilibrium_caches` registry.
+
+    Parameters
+    ----------
+    name : str
+        Name of cache (e.g., the name of the class of cached objects).
+    maxsize : int, optional
+        Maximum number of objects. Defaults to 256.
+    maxmemory : float, optional
+        Maximum estimated memory [bytes]. Defaults to 20 MB.
+
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name, maxsize=256, maxmemory=2e7):
+        super().__init__(maxsize, maxmemory, equilibrium_memory)
+        self.name = name
+
+    def __reduce__(self):
+        return self.__class__, (self.name, self.maxsize, self.maxmemory)
+
+    def measure(self):
+        """Estimate the memory of all objects again (e.g., after equations
+        of state are created), discarding least recently used objects if
+        needed. Return the estimated memory [bytes]."""
+        sizes = self.sizes
+        for key, value in self.items(): sizes[key] = equilibrium_memory(value)
+        self.memory = sum(sizes.values())
+        self._trim()
+        return self.memory
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.name}, {len(self)}/{self.maxsize} objects, {self.memory / 1e6:.3g}/{self.maxmemory / 1e6:.3g} MB>"
+
+
+class KValueCache(EquilibriumCache):
+    """
+    Create a KValueCache object, an EquilibriumCache of converged partition
+    coefficients (K-values) and vapor fractions by chemicals, composition
+    rounded to `z_tol`, temperature rounded to `T_tol`, and pressure
+    rounded to a relative tolerance of `P_rtol`. VLE objects share a
+    KValueCache object to warm start vapor-liquid equilibrium at nearly
+    identical states (e.g., in recycle loops or of stream copies).
+
+    Parameters
+    ----------
+    name : str
+        Name of cache.
+    maxsize : int, optional
+        Maximum number of states. Defaults to 256.
+    maxmemory : float, optional
+        Maximum estimated memory [bytes]. Defaults to 20 MB.
+    z_tol : float, optional
+        Composition tolerance. Defaults to 1e-3.
+    T_tol : float, optional
+        Temperature tolerance [K]. Defaults to 1.
+    P_rtol : float, optional
+        Relative pressure tolerance. Defaults to 0.01.
+
+    Examples
+    --------
+    >>> from thermosteam.equilibrium import KValueCache
+    >>> cache = KValueCache('K-values')
+    >>> key = cache.key(('Water', 'Ethanol'), [0.5, 0.5], 350., 101325.)
+    >>> cache.store(key, [0.7, 1.6], 0.4)
+    >>> key == cache.key(('Water', 'Ethanol'), [0.5002, 0.4998], 350.2, 101500.)
+    True
+    >>> cache.retrieve(key)
+    (array([0.7, 1.6]), 0.4)
+    >>> cache.hits, cache.misses
+    (1, 0)
+
+    """
+    __slots__ = ('z_tol', 'T_tol', 'P_rtol', 'hits', 'misses')
+
+    def __init__(self, name, maxsize=256, maxmemory=2e7, z_tol=1e-3, T_tol=1., P_rtol=1e-2):
+        super().__init__(name, maxsize, maxmemory)
+        #: [float] Composition tolerance.
+        self.z_tol = z_tol
+
+        #: [float] Temperature tolerance [K].
+        self.T_tol = T_tol
+
+        #: [float] Relative pressure tolerance.
+        self.P_rtol = P_rtol
+
+        self.hits = self.misses = 0
+
+    def __reduce__(self):
+        return self.__class__, (self.name, self.maxsize, self.maxmemory, self.z_tol, self.T_tol, self.P_rtol)
+
+    def key(self, IDs, z, T, P, z_light=0., z_heavy=0.):
+        """Return the key of a state by chemical identifiers, composition,
+        temperature [K], pressure [Pa], and the compositions of light and
+        heavy chemicals not in equilibrium."""
+        z_tol = self.z_tol
+        return (
+            IDs, (np.asarray(z) / z_tol + 0.5).astype(np.int64).tobytes(),
+            int(z_light / z_tol + 0.5), int(z_heavy / z_tol + 0.5),
+            round(T / self.T_tol), round(log(P) / self.P_rtol),
+        )
+
+    def store(self, key, K, V):
+        """Store partition coefficients and vapor fraction by state key."""
+        self[key] = np.append(K, V)
+
+    def retrieve(self, key):
+        """Return a copy of the partition coefficients and the vapor
+        fraction by state key, or None if not cached."""
+        KV = self.get(key)
+        if KV is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            return KV[:-1].copy(), float(KV[-1])
+
+    def reset_counters(self):
+        """Reset hit and miss counters."""
+        self.hits = self.misses = 0
+
+
+class EquilibriumCaches:
+    """
+    Create an EquilibriumCaches object, a registry of size-bounded caches of
+    equilibrium objects by chemicals. Bubble points, dew points, and activity
+    and fugacity coefficients are cached in caches created by the
+    :obj:`~thermosteam.equilibrium.equilibrium_caches` registry, so that
+    the memory held by equilibrium objects of many subsets of chemicals
+    (e.g., in long-lived simulations) is bounded.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of objects in each cache. Defaults to 256.
+    maxmemory : float, optional
+        Maximum estimated memory of each cache [bytes]. Defaults to 20 MB.
+
+    Examples
+    --------
+    >>> import thermosteam as tmo
+    >>> from thermosteam.equilibrium import equilibrium_caches
+    >>> tmo.settings.set_thermo(['Water', 'Ethanol', 'Methanol'], cache=True)
+    >>> equilibrium_caches.clear()
+    >>> chemicals = tmo.settings.chemicals
+    >>> for IDs in (['Water', 'Ethanol'], ['Water', 'Methanol'], ['Water', 'Ethanol']):
+    ...     bp = tmo.equilibrium.BubblePoint([chemicals[i] for i in IDs])
+    >>> caches = equilibrium_caches.info()
+    >>> caches.loc[['BubblePoint', 'DortmundActivityCoefficients'], ['Objects']]
+                                  Objects
+    Cache
+    BubblePoint                         2
+    DortmundActivityCoefficients        2
+    >>> equilibrium_caches.memory > 0
+    True
+    >>> equilibrium_caches.resize(maxsize=1) # Discards least recently used objects
+    >>> len(equilibrium_caches['BubblePoint'])
+    1
+    >>> equilibrium_caches.resize(maxsize=256)
+    >>> tmo.equilibrium.clear_equilibrium_caches()
+    >>> equilibrium_caches.memory
+    0
+
+    """
+    __slots__ = ('caches', 'maxsize', 'maxmemory')
+
+    def __init__(self, maxsize=256, maxmemory=2e7):
+        #: list[EquilibriumCache] All registered caches.
+        self.caches = []
+
+        #: [int] Maximum number of objects in each cache.
+        self.maxsize = maxsize
+
+        #: [float] Maximum estimated memory of each cache [bytes].
+        self.maxmemory = maxmemory
+
+    def new(self, name, cls=EquilibriumCache):
+        """Create, register, and return a new EquilibriumCache object."""
+        cache = cls(name, self.maxsize, self.maxmemory)
+        self.caches.append(cache)
+        return cache
+
+    def __getitem__(self, name):
+        for cache in self.caches:
+            if cache.name == name: return cache
+        raise KeyError(f'no equilibrium cache named {name!r}')
+
+    def __iter__(self):
+        return iter(self.caches)
+
+    def holds(self, obj):
+        """Return whether the object is held by an equilibrium cache."""
+        cache = getattr(type(obj), '_cached', None) or getattr(type(obj), 'cache', None)
+        return cache.__class__ is EquilibriumCache and any([i is obj for i in cache.values()])
+
+    def clear(self):
+        """Discard all cached equilibrium objects."""
+        for cache in self.caches: cache.clear()
+
+    def resize(self, maxsize=None, maxmemory=None):
+        """Set the maximum number of objects and/or estimated memory [bytes]
+        of each cache (including caches created later), discarding least
+        recently used objects if needed."""
+        if maxsize is not None: self.maxsize = maxsize
+        if maxmemory is not None: self.maxmemory = maxmemory
+        for cache in self.caches: cache.resize(maxsize, maxmemory)
+
+    @property
+    def memory(self):
+        """[float] Estimated memory of all cached objects [bytes]."""
+        return sum([cache.measure() for cache in self.caches])
+
+    def info(self):
+        """Return a DataFrame of the number of objects and estimated memory
+        [MB] of nonempty caches."""
+        import pandas as pd
+        data = [(cache.name, len(cache), cache.maxsize, cache.measure() / 1e6, cache.maxmemory / 1e6)
+                for cache in self.caches if cache]
+        return pd.DataFrame(
+            [i[1:] for i in data],
+            index=pd.Index([i[0] for i in data], name='Cache'),
+            columns=['Objects', 'Max objects', 'Memory [MB]', 'Max memory [MB]'],
+        )
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {len(self.caches)} caches, {self.memory / 1e6:.3g} MB>"
+
+
+#: [EquilibriumCaches] Registry of caches of bubble points, dew points,
+#: activity and fugacity coefficients, and partition coefficients.
+equilibrium_caches = EquilibriumCaches()
+
+def clear_equilibrium_caches():
+    """Discard all cached bubble points, dew points, activity and fugacity
+    coefficients, and partition coefficients (e.g., to release memory in
+    long-lived simulations)."""
+    equilibrium_caches.clear()
@@ -13,7 +13,13 @@ from numba import njit
 from .. import functional as fn
 from ..exceptions import InfeasibleRegion
 from .._settings import settings
+from ..mixture.property_array import VaporPressureArray
 from .domain import vle_domain
+from .caches import equilibrium_caches
+from .bubble_point import batch_arguments, dlog
+from .activity_coefficients import IdealActivityCoefficients
+from .fugacity_coefficients import IdealFugacityCoefficients
+from .poyinting_correction_factors import MockPoyintingCorrectionFactors
 
 __all__ = ('DewPoint',)
 
@@ -108,14 +114,27 @@ class DewPoint:
     >>> # Solve for dew point at constant pressure
     >>> DP(z=molar_composition, P=2*101324)
     DewPointValues(T=376.25, P=202648, IDs=('Water', 'Ethanol'), z=[0.5 0.5], x=[0.83 0.17])
+    >>> # Solve for dew point by Newton's method (warm started from the last solution)
+    >>> DP(z=(0.6, 0.4), P=2*101324, solver='newton')
+    DewPointValues(T=380.17, P=202648, IDs=('Water', 'Ethanol'), z=[0.6 0.4], x=[0.919 0.081])
+    >>> DP.T_iter # Number of Newton iterations
+    4
 
     """
     __slots__ = ('chemicals', 'phi', 'gamma', 'IDs', 
-                 'pcf', 'Psats', 'Tmin', 'Tmax', 'Pmin', 'Pmax')
-    _cached = {}
+                 'pcf', 'Psats', 'Psat', 'Tmin', 'Tmax', 'Pmin', 'Pmax',
+                 'T_last', 'T_iter')
+    _cached = equilibrium_caches.new('DewPoint')
     maxiter = 50
     T_tol = 1e-9
     P_tol = 1e-3
+    
+    #: [str] Default solver for dew point temperatures; either 'secant' 
+    #: (Aitken-secant with inverse quadratic interpolation as a fallback) or 
+    #: 'newton' (analytic temperature derivatives of vapor pressures and 
+    #: activity coefficients, warm started from the last solution).
+    T_solver = 'secant'
+    
     def __new__(cls, chemicals=(), thermo=None):
         thermo = settings.get_default_thermo(thermo)
         chemicals = tuple(chemicals)
@@ -129,12 +148,14 @@ class DewPoint:
             self.gamma = thermo.Gamma(chemicals)
             self.phi = thermo.Phi(chemicals)
             self.pcf = thermo.PCF(chemicals)
-            self.Psats = Psats = [i.Psat for i in chemicals]
+            self.Psats = [i.Psat for i in chemicals]
+            self.Psat = Psat = VaporPressureArray(chemicals)
             Tmin, Tmax = vle_domain(chemicals)
             self.Tmin = Tmin
             self.Tmax = Tmax
-            self.Pmin = min([i(Tmin) for i in Psats])
-            self.Pmax = max([i(Tmax) for i in Psats])
+            self.Pmin = float(Psat(Tmin).min())
+            self.Pmax = float(Psat(Tmax).max())
+            self.T_last = self.T_iter = None
             self.chemicals = chemicals
             cached[key] = self
             return self
@@ -145,7 +166,7 @@ class DewPoint:
     
     def _T_error(self, T, P, z_norm, zP, x):
         if T <= 0: raise InfeasibleRegion('negative temperature')
-        Psats = np.array([i(T) for i in self.Psats])
+        Psats = self.Psat(T)
         Psats[Psats < 1e-16] = 1e-16 # Prevent floating point error
         phi = self.phi(z_norm, T, P)
         pcf = self.pcf(T, P, Psats)
@@ -153,12 +174,63 @@ class DewPoint:
         x[:] = self._solve_x(x_gamma, T, P, x)
         return 1 - x.sum()
     
+    def _T_error_and_derivative(self, T, P, z_norm, zP, x):
+        # Negative logarithm of the sum of liquid molar fractions and its 
+        # derivative with respect to temperature (neglecting derivatives of 
+        # fugacity and Poynting correction factors and the effect of 
+        # composition on activity coefficients).
+        Psats, dPsats = self.Psat(T, derivative=True)
+        Psats[Psats < 1e-16] = 1e-16 # Prevent floating point error
+        phi = self.phi(z_norm, T, P)
+        pcf = self.pcf(T, P, Psats)
+        x_gamma = phi * zP / Psats / pcf
+        x[:] = self._solve_x(x_gamma, T, P, x)
+        x_sum = x.sum()
+        if not x_sum > 0.: return np.nan, np.nan
+        gamma, dlngamma = self.gamma.gamma_and_dlngamma_dT(x / x_sum, T)
+        return -np.log(x_sum), (x * (dlog(Psats, dPsats) + dlngamma)).sum() / x_sum
+    
+    def _T_error_and_derivative_batch(self, T, index, P, Z_norm, ZP, X, ideal):
+        # Vectorized `_T_error_and_derivative` for the compositions at `index`;
+        # activity and fugacity coefficients and Poyinting correction factors
+        # are neglected if `ideal` is True.
+        Psats, dPsats = self.Psat.batch(T, derivative=True)
+        Psats[Psats < 1e-16] = 1e-16 # Prevent floating point error
+        ZP = ZP[index]
+        if ideal or self._ideal():
+            Xi = ZP / Psats
+            X[index] = Xi
+            dlngamma = 0.
+            X_sum = Xi.sum(1)
+        else:
+            Z_norm = Z_norm[index]
+            P = P[index]
+            Xi = X[index]
+            phi = self.phi; pcf = self.pcf
+            for k, x in enumerate(Xi):
+                x_gamma = phi(Z_norm[k], T[k], P[k]) * ZP[k] / Psats[k] / pcf(T[k], P[k], Psats[k])
+                Xi[k] = self._solve_x(x_gamma, T[k], P[k], x)
+            X[index] = Xi
+            X_sum = Xi.sum(1)
+            positive = X_sum > 0.
+            X_norm = Xi / np.where(positive, X_sum, 1.)[:, None]
+            X_norm[~positive] = Z_norm[~positive]
+            gamma, dlngamma = self.gamma.batch(X_norm, T, derivative=True)
+            X_sum[~positive] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return -np.log(X_sum), (Xi * (dlog(Psats, dPsats) + dlngamma)).sum(1) / X_sum
+    
+    def _ideal(self):
+        return (isinstance(self.gamma, IdealActivityCoefficients)
+                and isinstance(self.phi, IdealFugacityCoefficients)
+                and isinstance(self.pcf, MockPoyintingCorrectionFactors))
+    
     def _T_error_reactive(self, T, P, z, dz, y, x, gas_conversion):
         if T <= 0: raise InfeasibleRegion('negative temperature')
         dz[:] = gas_conversion(z, T, P, 'g')
         y[:] = z + dz
         y /= y.sum()
-        Psats = np.array([i(T) for i in self.Psats])
+        Psats = self.Psat(T)
         Psats[Psats < 1e-16] = 1e-16 # Prevent floating point error
         phi = self.phi(y, T, P)
         pcf = self.pcf(T, P, Psats)
@@ -167,7 +239,7 @@ class DewPoint:
         return 1 - x.sum()
     
     def _T_error_ideal(self, T, zP, x):
-        Psats = np.array([i(T) for i in self.Psats])
+        Psats = self.Psat(T)
         Psats[Psats < 1e-16] = 1e-16 # Prevent floating point error
         x[:] = zP / Psats
         return 1 - x.sum()
@@ -208,13 +280,13 @@ class DewPoint:
         x = z_over_Psats * P
         return P, x
     
-    def __call__(self, z, *, T=None, P=None, gas_conversion=None):
+    def __call__(self, z, *, T=None, P=None, gas_conversion=None, solver=None):
         z = np.asarray(z, float)
         if T:
             if P: raise ValueError("may specify either T or P, not both")
             P, *args = self.solve_Px(z, T, gas_conversion)
         elif P:
-            T, *args = self.solve_Tx(z, P, gas_conversion)
+            T, *args = self.solve_Tx(z, P, gas_conversion, solver)
         else:
             raise ValueError("must specify either T or P")
         if gas_conversion:
@@ -222,7 +294,7 @@ class DewPoint:
         else:
             return DewPointValues(T, P, self.IDs, z, *args)
     
-    def solve_Tx(self, z, P, gas_conversion=None):
+    def solve_Tx(self, z, P, gas_conversion=None, solver=None):
         """
         Dew point given composition and pressure.
 
@@ -232,6 +304,12 @@ class DewPoint:
             Molar composition.
         P : float
             Pressure [Pa].
+        solver : str, optional
+            Either 'secant' or 'newton'. Defaults to `T_solver`. Newton's 
+            method is warm started from the last solution (`T_last`) and 
+            the number of iterations is stored in `T_iter`. If Newton's 
+            method fails, the secant method is used instead. Reactive 
+            dew points are always solved by the secant method.
 
         Returns
         -------
@@ -249,8 +327,15 @@ class DewPoint:
         >>> DP = tmo.equilibrium.DewPoint(chemicals)
         >>> tmo.docround(DP.solve_Tx(z=np.array([0.5, 0.5]), P=101325))
         (357.4419, array([0.847, 0.153]))
+        >>> tmo.docround(DP.solve_Tx(z=np.array([0.5, 0.5]), P=101325, solver='newton'))
+        (357.4419, array([0.847, 0.153]))
         
         """
+        if solver is None: 
+            solver = self.T_solver
+        elif solver not in ('secant', 'newton'):
+            raise ValueError(f"solver must be either 'secant' or 'newton', not {solver!r}")
+        self.T_iter = None
         positives = z > 0.
         N = positives.sum()
         if N == 0:
@@ -261,9 +346,25 @@ class DewPoint:
             x = z.copy()
             return T, fn.normalize(x)
         elif gas_conversion is None:
-            f = self._T_error
             z_norm = z/z.sum()
             zP = z * P
+            if solver == 'newton':
+                Tmin = self.Tmin; Tmax = self.Tmax
+                T_guess = self.T_last
+                if T_guess is None or not Tmin < T_guess < Tmax:
+                    T_guess, x = self._Tx_ideal(zP)
+                else: # Ideal liquid composition at the last dew point
+                    x = z_norm.copy()
+                    self._T_error_ideal(T_guess, zP, x)
+                result = fn.solve_T_newton(
+                    self._T_error_and_derivative, T_guess, self.T_tol, 
+                    self.maxiter, Tmin, Tmax, (P, z_norm, zP, x),
+                )
+                if result is not None:
+                    T, self.T_iter = result
+                    self.T_last = T
+                    return T, fn.normalize(x)
+            f = self._T_error
             T_guess, x = self._Tx_ideal(zP) 
             args = (P, z_norm, zP, x)
             try:
@@ -279,6 +380,7 @@ class DewPoint:
                                          T_guess, self.T_tol, 5e-12, args,
                                          checkiter=False, checkbounds=False,
                                          maxiter=self.maxiter)
+            self.T_last = T
             return T, fn.normalize(x)
         else:
             f = self._T_error_reactive
@@ -300,6 +402,129 @@ class DewPoint:
                                          checkiter=False, checkbounds=False)
             return T, dz, fn.normalize(y), x
     
+    def solve_Tx_batch(self, Z, P):
+        """
+        Dew points at given compositions and pressures. Newton's method is 
+        vectorized across compositions (liquid compositions are solved one 
+        composition at a time) and compositions that fail to converge are 
+        solved one at a time by `solve_Tx`.
+
+        Parameters
+        ----------
+        Z : array_like
+            Molar compositions (a row for each dew point).
+        P : float or array_like
+            Pressure(s) [Pa].
+
+        Returns
+        -------
+        T : ndarray
+            Dew point temperatures [K].
+        X : ndarray
+            Liquid phase molar compositions.
+
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> import numpy as np
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'], cache=True)
+        >>> tmo.settings.set_thermo(chemicals)
+        >>> DP = tmo.equilibrium.DewPoint(chemicals)
+        >>> T, X = DP.solve_Tx_batch(Z=[[0.5, 0.5], [0.9, 0.1], [1., 0.]], P=101325)
+        >>> tmo.docround(T)
+        array([357.442, 370.439, 373.124])
+        >>> X
+        array([[0.847, 0.153],
+               [0.991, 0.009],
+               [1.   , 0.   ]])
+        
+        """
+        Z, P, N = batch_arguments(Z, P)
+        T = np.empty(P.size)
+        X = np.empty_like(Z)
+        mixtures = N > 1
+        index = np.flatnonzero(mixtures)
+        if index.size:
+            Zm = Z[index]
+            Pm = P[index]
+            Z_norm = Zm / Zm.sum(1, keepdims=True)
+            ZP = Zm * Pm[:, None]
+            Xm = Z_norm.copy()
+            Tmin = self.Tmin; Tmax = self.Tmax
+            args = (Pm, Z_norm, ZP, Xm)
+            f = self._T_error_and_derivative_batch
+            Tm, iterations = fn.solve_T_newton_batch(
+                lambda T, index: f(T, index, *args, True), 
+                np.full(index.size, 0.5 * (Tmin + Tmax)), 
+                self.T_tol, self.maxiter, Tmin, Tmax,
+            )
+            Tm, iterations = fn.solve_T_newton_batch(
+                lambda T, index: f(T, index, *args, False), 
+                Tm, self.T_tol, self.maxiter, Tmin, Tmax,
+            )
+            T[index] = Tm
+            converged = iterations > 0
+            Xm = Xm[converged]
+            X[index[converged]] = Xm / Xm.sum(1, keepdims=True)
+            mixtures[index[~converged]] = False
+        for i in np.flatnonzero(~mixtures):
+            T[i], X[i] = self.solve_Tx(Z[i], P[i], solver='secant')
+        return T, X
+    
+    def solve_Px_batch(self, Z, T):
+        """
+        Dew points at given compositions and temperatures. Pressures are 
+        vectorized across compositions if activity and fugacity coefficients
+        and Poyinting correction factors are ideal; otherwise dew points are
+        solved one at a time by `solve_Px`.
+
+        Parameters
+        ----------
+        Z : array_like
+            Molar compositions (a row for each dew point).
+        T : float or array_like
+            Temperature(s) [K].
+
+        Returns
+        -------
+        P : ndarray
+            Dew point pressures [Pa].
+        X : ndarray
+            Liquid phase molar compositions.
+
+        Examples
+        --------
+        >>> import thermosteam as tmo
+        >>> import numpy as np
+        >>> chemicals = tmo.Chemicals(['Water', 'Ethanol'], cache=True)
+        >>> tmo.settings.set_thermo(chemicals)
+        >>> DP = tmo.equilibrium.DewPoint(chemicals)
+        >>> P, X = DP.solve_Px_batch(Z=[[0.5, 0.5], [0.9, 0.1], [1., 0.]], T=352.28)
+        >>> tmo.docround(P)
+        array([82480.731, 50413.443, 45768.699])
+        >>> X
+        array([[0.851, 0.149],
+               [0.991, 0.009],
+               [1.   , 0.   ]])
+ 
+        """
+        Z, T, N = batch_arguments(Z, T)
+        P = np.empty(T.size)
+        X = np.empty_like(Z)
+        mixtures = N > 1
+        if self._ideal():
+            index = np.flatnonzero(mixtures)
+            Zm = Z[index]
+            Z_over_Psats = Zm / Zm.sum(1, keepdims=True) / self.Psat.batch(T[index])
+            Pm = 1. / Z_over_Psats.sum(1)
+            P[index] = Pm
+            X[index] = Z_over_Psats * Pm[:, None]
+        else:
+            mixtures[:] = False
+        for i in np.flatnonzero(~mixtures):
+            P[i], X[i] = self.solve_Px(Z[i], T[i])
+        return P, X
+    
     def solve_Px(self, z, T, gas_conversion=None):
         """
         Dew point given composition and temperature.
@@ -340,7 +565,7 @@ class DewPoint:
             return P, fn.normalize(x)
         elif gas_conversion is None:
             z_norm = z / z.sum()
-            Psats = np.array([i(T) for i in self.Psats], dtype=float)
+            Psats = self.Psat(T)
             z_over_Psats = z / Psats
             P_guess, x = self._Px_ideal(z_over_Psats)
             args = (T, z_norm, z_over_Psats, Psats, x)
@@ -362,7 +587,7 @@ class DewPoint:
             z_norm = z / z.sum()
             y = z_norm.copy()
             dz = z_norm.copy()
-            Psats = np.array([i(T) for i in self.Psats], dtype=float)
+            Psats = self.Psat(T)
             z_over_Psats = z / Psats
             P_guess, x = self._Px_ideal(z_over_Psats)
             args = (T, Psats, z_norm, dz, y, x, gas_conversion)
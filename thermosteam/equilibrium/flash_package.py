@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 """
 """
-from thermo.interaction_parameters import IPDB
+from thermo import interaction_parameters
 import thermosteam as tmo
 from thermo.bulk import default_settings
 import thermo as tm
@@ -229,7 +229,7 @@ def from_data(cls, data, eos_class=None):
                       Pcs=data.Pcs,
                       omegas=data.omegas)
     try:
-        eos_kwargs['kijs'] = IPDB.get_ip_asymmetric_matrix('ChemSep PR', data.CASs, 'kij')
+        eos_kwargs['kijs'] = interaction_parameters.IPDB.get_ip_asymmetric_matrix('ChemSep PR', data.CASs, 'kij')
     except:
         pass        
     return cls(eos_class, eos_kwargs, data.HeatCapacityGases)
@@ -241,7 +241,7 @@ def from_data(cls, data, eos_class=None):
                       Pcs=data.Pcs,
                       omegas=data.omegas)
     try:
-        eos_kwargs['kijs'] = IPDB.get_ip_asymmetric_matrix('ChemSep PR', data.CASs, 'kij')
+        eos_kwargs['kijs'] = interaction_parameters.IPDB.get_ip_asymmetric_matrix('ChemSep PR', data.CASs, 'kij')
     except:
         pass        
     return cls(eos_class, eos_kwargs, data.HeatCapacityGases)
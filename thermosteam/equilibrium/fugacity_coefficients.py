@@ -8,8 +8,9 @@
 """
 """
 from .ideal import ideal
+from .caches import equilibrium_caches
 import thermosteam as tmo
-from thermo.interaction_parameters import IPDB
+from thermo import interaction_parameters
 from thermo import eos_mix
 from fluids.constants import R_inv
 import numpy as np
@@ -75,7 +76,7 @@ class GCEOSFugacityCoefficients(FugacityCoefficients):
     """
     __slots__ = ('_chemicals', '_eos')
     EOS = None # type[GCEOSMIX] Subclasses must implement this attribute.
-    cache = None # [dict] Subclasses must implement this attribute.
+    cache = None # [EquilibriumCache] Subclasses must implement this attribute.
     chemsep_db = None # Optional[str] Name of chemsep data base for interaction parameters.
     
     def __new__(cls, chemicals):
@@ -92,7 +93,7 @@ class GCEOSFugacityCoefficients(FugacityCoefficients):
     @classmethod
     def subclass(cls, EOS, name=None):
         if name is None: name = EOS.__name__.replace('MIX', '') + 'FugacityCoefficients'
-        return type(name, (cls,), dict(EOS=EOS, cache={}))
+        return type(name, (cls,), dict(EOS=EOS, cache=equilibrium_caches.new(name)))
     
     @property
     def chemicals(self):
@@ -109,7 +110,7 @@ class GCEOSFugacityCoefficients(FugacityCoefficients):
                 kijs = None
             else:
                 try:
-                    kijs = IPDB.get_ip_asymmetric_matrix(self.chemsep_db, data.CASs, 'kij')
+                    kijs = interaction_parameters.IPDB.get_ip_asymmetric_matrix(self.chemsep_db, data.CASs, 'kij')
                 except:
                     kijs = None
             self._eos = eos = self.EOS(
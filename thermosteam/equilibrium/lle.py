@@ -9,6 +9,7 @@
 """
 from numba import njit
 from ..utils import Cache
+from ..base import BitSet
 from .equilibrium import Equilibrium
 from ..exceptions import NoEquilibrium
 from .binary_phase_fraction import phase_fraction
@@ -398,7 +399,7 @@ class LLE(Equilibrium, phases='lL'):
         imol = self._imol
         imol['L'] = mol =  imol['l'] + imol['L']
         imol['l'] = 0
-        index = self.chemicals.get_lle_indices(mol.nonzero_keys())
+        index = self.chemicals.get_lle_indices(BitSet(mol.dct))
         mol = mol[index]
         chemicals = self.chemicals.tuple
         lle_chemicals = [chemicals[i] for i in index]
@@ -9,11 +9,11 @@
 """
 from .._settings import settings
 from ..utils import colors, style_axis
+from ..utils.plots import plt
 from chemicals.identifiers import to_searchable_format
 from .bubble_point import BubblePoint
 from .lle import LLE
 from ..indexer import MaterialIndexer
-import matplotlib.pyplot as plt
 from math import floor
 import thermosteam as tmo
 import numpy as np
@@ -88,18 +88,15 @@ def plot_vle_binary_phase_envelope(chemicals, T=None, P=None, vc=None, lc=None,
     zs = np.vstack([zs_a, zs_b]).transpose()
     if P:
         assert not T, "must pass either T or P, but not both"
-        bps = [BP(z, P=P) for z in zs]
-        ms = [bp.T for bp in bps]
+        ms, ys = BP.solve_Ty_batch(zs, P)
         ylabel = 'Temperature [K]'
     elif T:
         assert not P, "must pass either T or P, but not both"
-        bps = [BP(z, T=T) for z in zs]
-        ms = [bp.P for bp in bps]
+        ms, ys = BP.solve_Py_batch(zs, T)
         ylabel = 'Pressure [Pa]'
     else:
         raise AssertionError("must pass either T or P")
-    ms = np.array(ms)
-    ys_a = np.array([bp.y[0] for bp in bps])
+    ys_a = ys[:, 0]
     top, bottom = (chemical_a, chemical_b) if ys_a.mean() > 0.5 else (chemical_a, chemical_b)
     plt.figure()
     plt.xlim([0, 1])
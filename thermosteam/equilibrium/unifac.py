@@ -26,6 +26,7 @@ __all__ = ('DDBST_UNIFAC_assignments',
            'PSRKGroupCounts')
 import os
 import json
+from collections.abc import MutableMapping
 
 # %% Data
 
@@ -836,12 +837,43 @@ def load_json(json_file, hook=None):
     with open(os.path.join(folder, json_file)) as f:
         return json.loads(f.read(), object_hook=hook)
 
+class JSONData(MutableMapping):
+    # Dictionary-like data loaded from a JSON file on first use (to avoid 
+    # loading large data files when thermosteam is imported).
+    __slots__ = ('file', 'hook', 'cls', '_data')
+    
+    def __init__(self, file, hook=None, cls=None):
+        self.file = file
+        self.hook = hook
+        self.cls = cls
+        self._data = None
+    
+    @property
+    def data(self):
+        data = self._data
+        if data is None:
+            data = load_json(self.file, self.hook)
+            cls = self.cls
+            if cls is not None: data = {i: cls.from_dict(j) for i, j in data.items()}
+            self._data = data
+        return data
+    
+    def __getitem__(self, key): return self.data[key]
+    def __setitem__(self, key, value): self.data[key] = value
+    def __delitem__(self, key): del self.data[key]
+    def __contains__(self, key): return key in self.data
+    def __iter__(self): return iter(self.data)
+    def __len__(self): return len(self.data)
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.file!r})"
+
 folder = os.path.dirname(__file__)
 folder = os.path.join(folder, 'UNIFAC')
-UFIP = load_json('UNIFAC original interaction parameters.json', keys2int)
-DOUFIP2016 = load_json('UNIFAC modified Dortmund interaction parameters.json', keys2int)
-NISTUFIP = load_json('UNIFAC modified NIST 2015 interaction parameters.json', keys2int)
-PSRKIP = load_json('PSRK interaction parameters.json', keys2int)
+UFIP = JSONData('UNIFAC original interaction parameters.json', keys2int)
+DOUFIP2016 = JSONData('UNIFAC modified Dortmund interaction parameters.json', keys2int)
+NISTUFIP = JSONData('UNIFAC modified NIST 2015 interaction parameters.json', keys2int)
+PSRKIP = JSONData('PSRK interaction parameters.json', keys2int)
 
 
 # %% Assignments
@@ -917,12 +949,7 @@ class GroupAssigner:
     def __setitem__(self, key, count):
         self.group_counts[key] = count
 
-data = load_json('DDBST UNIFAC-original assignments.json')
-DDBST_UNIFAC_assignments = {i: UNIFACGroupCounts.from_dict(j) for i,j in data.items()}
-data = load_json('DDBST UNIFAC-Dortmund assignments.json')
-DDBST_MODIFIED_UNIFAC_assignments = {i: DortmundGroupCounts.from_dict(j) for i,j in data.items()}
-data = load_json('DDBST UNIFAC-original assignments.json')
-DDBST_PSRK_assignments = {i: PSRKGroupCounts.from_dict(j) for i,j in data.items()}
-
-del data, load_json, keys2int
+DDBST_UNIFAC_assignments = JSONData('DDBST UNIFAC-original assignments.json', cls=UNIFACGroupCounts)
+DDBST_MODIFIED_UNIFAC_assignments = JSONData('DDBST UNIFAC-Dortmund assignments.json', cls=DortmundGroupCounts)
+DDBST_PSRK_assignments = JSONData('DDBST UNIFAC-original assignments.json', cls=PSRKGroupCounts)
 
@@ -11,7 +11,7 @@ from scipy.optimize import shgo
 import flexsolve as flx
 from numba import njit
 from warnings import warn
-from ..base import SparseVector
+from ..base import SparseVector, BitSet
 from ..exceptions import InfeasibleRegion, NoEquilibrium
 from . import binary_phase_fraction as binary
 from .equilibrium import Equilibrium
@@ -19,6 +19,7 @@ from .dew_point import DewPoint
 from .bubble_point import BubblePoint
 from .fugacity_coefficients import IdealFugacityCoefficients
 from .poyinting_correction_factors import MockPoyintingCorrectionFactors
+from .caches import equilibrium_caches, KValueCache
 from . import activity_coefficients as ac
 from .. import functional as fn
 from ..utils import Cache
@@ -305,6 +306,11 @@ class VLE(Equilibrium, phases='lg'):
     y_tol = 1e-8
     default_method = 'fixed-point'
     
+    #: [KValueCache|None] Converged partition coefficients and vapor fractions
+    #: shared by all VLE objects to warm start equilibrium at nearly identical
+    #: states. Set to None to disable warm starts.
+    K_cache = equilibrium_caches.new('VLE', KValueCache)
+    
     def __init__(self, imol=None, thermal_condition=None,
                  thermo=None):
         self.method = self.default_method
@@ -1304,7 +1310,7 @@ class VLE(Equilibrium, phases='lg'):
                 raise RuntimeError('shgo is not a valid method (yet) when reactions are present')
             gamma = self._gamma
             phi = self._phi
-            Psats = np.array([i(T) for i in self._bubble_point.Psats]) 
+            Psats = self._bubble_point.Psat(T)
             pcf = self._pcf(T, P, Psats)
             F_mol_vle = self._F_mol_vle
             mol_vle = self._mol_vle
@@ -1315,8 +1321,7 @@ class VLE(Equilibrium, phases='lg'):
             )
             self._z_last = z
         elif method == 'fixed-point':
-            Psats = np.array([i(T) for i in
-                              self._bubble_point.Psats])
+            Psats = self._bubble_point.Psat(T)
             pcf_Psats_over_P = self._pcf(T, P, Psats) * Psats / P
             self._T = T
             self._v = v = self._solve_v_fixed_point(pcf_Psats_over_P, T, P, gas_conversion, liquid_conversion)
@@ -1347,6 +1352,11 @@ class VLE(Equilibrium, phases='lg'):
             args = (pcf_Psat_over_P, T, P, z, 
                     gamma.f, gamma.args, self._phi, n,
                     gas_conversion, liquid_conversion)
+        K_cache = self.K_cache
+        if K_cache is not None:
+            key = K_cache.key(self._bubble_point.IDs, z, T, P, self._z_light, self._z_heavy)
+            KV = K_cache.retrieve(key)
+            if KV is not None: self._K, self._V = K, V = KV
         xVlogK = np.zeros(2 * n + 1)
         xVlogK[n] = V = self._V
         K[K < 1e-16] = 1e-16
@@ -1359,6 +1369,7 @@ class VLE(Equilibrium, phases='lg'):
         )
         self._V = V = xVlogK[n]
         self._K = K = np.exp(xVlogK[n+1:])
+        if K_cache is not None: K_cache.store(key, K, V)
         x = xVlogK[:n]
         x, y = xy(x, K)
         self._z_last = z
@@ -1383,7 +1394,7 @@ class VLE(Equilibrium, phases='lg'):
         self._vapor_mol = vapor_mol = imol['g']
         mol = liquid_mol + vapor_mol
         if not mol.any(): raise NoEquilibrium('no chemicals to perform equilibrium')
-        nonzero = set(mol.nonzero_keys())
+        nonzero = BitSet(mol.dct)
         if gas_conversion:
             nonzero.update(
                 gas_conversion.reaction.stoichiometry.nonzero_keys()
@@ -374,7 +374,7 @@ class VLLE(Equilibrium, phases='lLg'):
         guess[-1] = F_liq / F_liq_total
     
     def _solve(self, T, P):
-        Psats = np.array([i(T) for i in self._bubble_point.Psats])
+        Psats = self._bubble_point.Psat(T)
         pcf_Psat_over_P = self._pcf(T, P, Psats) * Psats / P
         gamma = self._gamma
         z = self._z
@@ -1032,8 +1032,7 @@ class VLLE(Equilibrium, phases='lLg'):
         """Solve for vapor mol"""
         method = self.method
         if method == 'fixed-point':
-            Psats = np.array([i(T) for i in
-                              self._bubble_point.Psats])
+            Psats = self._bubble_point.Psat(T)
             pcf_Psats_over_P = self._pcf(T, P, Psats) * Psats / P
             self._T = T
             y = self._solve_y(self._y, pcf_Psats_over_P, T, P, gas_conversion, liquid_conversion)
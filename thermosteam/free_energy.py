@@ -9,10 +9,233 @@
 Free energy functors for Chemical objects.
 
 """
+import numpy as np
+from numba import njit
+from thermo import TDependentProperty
 from .constants import R
 from .base import functor, PhaseTFunctorBuilder, PhaseTPFunctorBuilder
 from math import log
+
+__all__ = ('HeatCapacityIntegral', 'compile_heat_capacity')
+
+# %% Compiled heat capacity integrals
+
+@njit(cache=True)
+def polynomial(x, coeffs):
+    y = 0.
+    for c in coeffs: y = y * x + c
+    return y
+
+@njit(cache=True)
+def integrate_heat_capacity(T1, T2, coeffs, params):
+    # Integral of heat capacity with linear extrapolation outside temperature
+    # limits. Parameters are (offset, scale, Tmin, Tmax, value and slope at
+    # Tmin, value and slope at Tmax).
+    if T2 < T1:
+        T1, T2 = T2, T1
+        sign = -1.
+    else:
+        sign = 1.
+    offset, scale, Tmin, Tmax = params[0], params[1], params[2], params[3]
+    integral = 0.
+    if T1 < Tmin:
+        v, d = params[4], params[5]
+        Tb = T2 if T2 < Tmin else Tmin
+        integral += (v - Tmin * d) * (Tb - T1) + 0.5 * d * (Tb * Tb - T1 * T1)
+        T1 = Tmin
+    if T2 > Tmax:
+        v, d = params[6], params[7]
+        Ta = T1 if T1 > Tmax else Tmax
+        integral += (v - Tmax * d) * (T2 - Ta) + 0.5 * d * (T2 * T2 - Ta * Ta)
+        T2 = Tmax
+    if T1 < T2:
+        integral += polynomial(offset + scale * T2, coeffs) - polynomial(offset + scale * T1, coeffs)
+    return sign * integral
+
+#: Gauss-Legendre quadrature nodes and weights.
+quadrature_nodes, quadrature_weights = np.polynomial.legendre.leggauss(16)
+
+#: Maximum ratio of upper to lower temperature of each quadrature interval.
+quadrature_ratio = 2.
+
+@njit(cache=True)
+def integrate_heat_capacity_over_T(T1, T2, coeffs, params, nodes, weights, ratio):
+    # Integral of heat capacity over temperature with linear extrapolation 
+    # outside temperature limits (see integrate_heat_capacity). Antiderivative
+    # coefficients of polynomials over temperature are too large to avoid
+    # round-off error, so the integral is computed by Gauss-Legendre 
+    # quadrature over geometrically spaced intervals.
+    if T2 < T1:
+        T1, T2 = T2, T1
+        sign = -1.
+    else:
+        sign = 1.
+    offset, scale, Tmin, Tmax = params[0], params[1], params[2], params[3]
+    integral = 0.
+    if T1 < Tmin:
+        v, d = params[4], params[5]
+        Tb = T2 if T2 < Tmin else Tmin
+        integral += d * (Tb - T1) + (v - Tmin * d) * log(Tb / T1)
+        T1 = Tmin
+    if T2 > Tmax:
+        v, d = params[6], params[7]
+        Ta = T1 if T1 > Tmax else Tmax
+        integral += d * (T2 - Ta) + (v - Tmax * d) * log(T2 / Ta)
+        T2 = Tmax
+    if T1 < T2:
+        N = int(log(T2 / T1) / log(ratio)) + 1
+        factor = (T2 / T1) ** (1. / N)
+        Ta = T1
+        for n in range(N):
+            Tb = T2 if n == N - 1 else Ta * factor
+            center = 0.5 * (Ta + Tb)
+            radius = 0.5 * (Tb - Ta)
+            quadrature = 0.
+            for i in range(nodes.size):
+                T = center + radius * nodes[i]
+                quadrature += weights[i] * polynomial(offset + scale * T, coeffs) / T
+            integral += radius * quadrature
+            Ta = Tb
+    return sign * integral
+
+def DIPPR100_integral_coefficients(kwargs, extra):
+    coeffs = [kwargs.get(i, 0.) for i in 'ABCDEFG'] # Increasing order
+    int_coeffs = [j / (i + 1) for i, j in enumerate(coeffs)][::-1] + [0.]
+    return coeffs[::-1], int_coeffs, 0., 1.
+
+def polynomial_integral_coefficients(kwargs, extra):
+    return kwargs['coeffs'], extra['int_coeffs'], 0., 1.
+
+def stable_polynomial_integral_coefficients(kwargs, extra):
+    return kwargs['coeffs'], extra['int_coeffs'], extra['offset'], extra['scale']
+
+#: dict[str, function] Functions that return coefficients of heat capacity
+#: and its antiderivative (in decreasing order) and the offset and scale of
+#: temperature by name of heat capacity correlation.
+integral_coefficients = {
+    'DIPPR100': DIPPR100_integral_coefficients,
+    'polynomial': polynomial_integral_coefficients,
+    'stable_polynomial': stable_polynomial_integral_coefficients,
+}
+
+def extrapolation_coefficients(model, method, low):
+    # Return value and slope of linear extrapolation at the temperature limit.
+    extrapolation = model._extrapolation_low if low else model._extrapolation_high
+    if extrapolation == 'constant':
+        return model._get_extrapolation_coeffs(extrapolation, method, low), 0.
+    elif (extrapolation == 'linear'
+          and model.interpolation_T is None
+          and model.interpolation_property is None):
+        return model._get_extrapolation_coeffs(extrapolation, method, low)
+
+class HeatCapacityIntegral:
+    """
+    Create a HeatCapacityIntegral object that integrates a heat capacity model
+    using precompiled coefficients. Polynomial 
+    correlations (e.g., stable polynomial fits and DIPPR equation 100) 
+    with linear or constant extrapolation are compiled while all other 
+    methods are integrated by the heat capacity model. The model is compiled
+    again if its method or extrapolation changes.
+    
+    Parameters
+    ----------
+    model : TDependentProperty
+        Heat capacity model [J/mol/K].
+    
+    Notes
+    -----
+    All other attributes are retrieved from the heat capacity model, so 
+    HeatCapacityIntegral objects can be used in place of heat capacity models.
+    
+    Examples
+    --------
+    >>> from thermosteam.free_energy import HeatCapacityIntegral
+    >>> import thermosteam as tmo
+    >>> Cn = tmo.Chemical('Water').Cn.l
+    >>> integral = HeatCapacityIntegral(Cn)
+    >>> integral
+    <HeatCapacityIntegral(T1, T2) -> HEOS_FIT [compiled]>
+    >>> integral.T_dependent_property_integral(298.15, 350.)
+    3907.854...
+    >>> Cn.T_dependent_property_integral(298.15, 350.)
+    3907.854...
+    
+    """
+    __slots__ = ('model', 'key', 'coeffs', 'int_coeffs', 'params')
+    
+    def __init__(self, model):
+        self.model = model
+        self.compile()
+        
+    def compile(self):
+        """Compile coefficients of the heat capacity model at its current method."""
+        model = self.model
+        method = model._method
+        self.key = (method, model._extrapolation)
+        self.coeffs = self.int_coeffs = self.params = None
+        if method not in model.T_limits or method not in model.correlations: return
+        call, kwargs, name, extra = model.correlations[method]
+        if name not in integral_coefficients: return
+        try:
+            coeffs, int_coeffs, offset, scale = integral_coefficients[name](kwargs, extra)
+            low = extrapolation_coefficients(model, method, True)
+            high = extrapolation_coefficients(model, method, False)
+        except: 
+            return
+        if low is None or high is None: return
+        self.coeffs = coeffs = np.array(coeffs, float)
+        self.int_coeffs = np.array(int_coeffs, float)
+        self.params = np.array(
+            [offset, scale, *model.T_limits[method], *low, *high], float
+        )
+    
+    @property
+    def compiled(self):
+        """[bool] Whether coefficients are compiled at the current method of the model."""
+        model = self.model
+        if self.key != (model._method, model._extrapolation): self.compile()
+        return self.params is not None
     
+    def T_dependent_property_integral(self, T1, T2):
+        """Return the integral of heat capacity from `T1` to `T2` [J/mol]."""
+        if self.compiled and T1 > 0. and T2 > 0.: 
+            return integrate_heat_capacity(T1, T2, self.int_coeffs, self.params)
+        else:
+            return self.model.T_dependent_property_integral(T1, T2)
+    
+    def T_dependent_property_integral_over_T(self, T1, T2):
+        """Return the integral of heat capacity over temperature from `T1` to `T2` [J/mol/K]."""
+        if self.compiled and T1 > 0. and T2 > 0.: 
+            return integrate_heat_capacity_over_T(
+                T1, T2, self.coeffs, self.params, 
+                quadrature_nodes, quadrature_weights, quadrature_ratio,
+            )
+        else:
+            return self.model.T_dependent_property_integral_over_T(T1, T2)
+    
+    def __call__(self, T, P=None):
+        return self.model(T)
+    
+    def __bool__(self):
+        return bool(self.model)
+    
+    def __getattr__(self, name):
+        if name == 'model': raise AttributeError(name) # Not yet initialized
+        return getattr(self.model, name)
+    
+    def __repr__(self):
+        return f"<{type(self).__name__}(T1, T2) -> {self.key[0]} [{'compiled' if self.compiled else 'not compiled'}]>"
+
+
+def compile_heat_capacity(model):
+    """Return a HeatCapacityIntegral object of a heat capacity model, or 
+    the model itself if it is not a temperature dependent property."""
+    if isinstance(model, TDependentProperty): return HeatCapacityIntegral(model)
+    return model
+
+
+# %% Free energy functors
+
 def get_excess_energy(eos, T, P, free_energy, phase):
     eos = eos.to(T, P)
     name = f"{free_energy}_dep_{phase}"
@@ -145,6 +368,17 @@ EntropyRefGas = PhaseTPFunctorBuilder('S',
                                      Liquid_Entropy_Ref_Gas.functor,
                                      Gas_Entropy_Ref_Gas.functor)
 
+#: frozenset[type] Free energy functors that evaluate as a constant plus
+#: a heat capacity integral (over temperature for entropy) from a given
+#: temperature, excluding the ideal gas pressure term.
+free_energy_functors = frozenset([
+    Enthalpy.functor, Entropy.functor, EntropyGas.functor,
+    *[getattr(builder, phase) for phase in 'slg' for builder in (
+        EnthalpyRefLiquid, EnthalpyRefSolid, EnthalpyRefGas,
+        EntropyRefLiquid, EntropyRefSolid, EntropyRefGas,
+    )]
+])
+
 @functor(var='H.l')
 def Excess_Liquid_Enthalpy_Ref_Liquid(T, P):
     return 0
@@ -12,6 +12,7 @@ from chemicals.utils import *
 from fluids.core import Pr, alpha
 from thermosteam.base import functor
 from numba import njit
+from math import exp, sqrt, inf, log as ln
 import numpy as np
 
 @functor
@@ -162,4 +163,138 @@ def remove_negligible_negative_values(material):
         else:
             material[negative_index] = 0. 
 
+def solve_T_newton(f, T, T_tol, maxiter, Tmin=0., Tmax=inf, args=(), log=False, exact=False):
+    """
+    Solve for temperature by Newton's method given f(T, *args) -> 
+    (residual, derivative), where the residual increases with temperature 
+    and the derivative is with respect to log(T) if `log` is True. Return
+    temperature and number of iterations, or None if the residual is not
+    a number or not converged within `maxiter` iterations.
+    
+    The root is kept within a bracket (initially [`Tmin`, `Tmax`]) and 
+    steps that leave the bracket or have a nonpositive derivative are 
+    replaced by bisection (None is returned if the bracket has no upper 
+    bound). When a step overshoots the root (e.g., the derivative is 
+    approximate and underestimated), the slope of the secant is used 
+    instead to avoid oscillations. If the derivative is `exact`, iteration
+    stops early when the error after a Newton step (estimated from the 
+    change in derivative) is within tolerance.
+    
+    Temperature changes within `T_tol` are only accepted as convergence 
+    if the distance to the root estimated from the residual and its 
+    derivative is within 100 times `T_tol`. Otherwise, the bracket no 
+    longer contains a root (e.g., residuals that depend on the path of 
+    inner iterations) and None is returned.
+    
+    Examples
+    --------
+    >>> T, iterations = solve_T_newton(lambda T: (T * T - 2e4, 2 * T), 100., 1e-9, 50)
+    >>> round(T, 9), iterations
+    (141.421356237, 5)
+    
+    """
+    T_low = Tmin
+    T_high = Tmax
+    x_last = y_last = x_newton = dy_newton = None
+    for iteration in range(1, maxiter + 1):
+        y, dy = f(T, *args)
+        if y > 0.:
+            T_high = T
+        elif y < 0.:
+            T_low = T
+        elif y == 0.:
+            return T, iteration
+        else:
+            return
+        x = ln(T) if log else T
+        slope = dy
+        if y_last is not None and (y > 0.) is not (y_last > 0.):
+            secant = (y - y_last) / (x - x_last)
+            if secant > slope: slope = secant
+        x_last = x
+        y_last = y
+        near_root = dy > 0. and abs(y / dy) * (T if log else 1.) < 100. * T_tol
+        if slope > 0.:
+            dx = -y / slope
+            T_new = T * exp(dx) if log else T + dx
+            if abs(T_new - T) < T_tol: return (T_new, iteration) if near_root else None
+            if T_low < T_new < T_high:
+                if exact:
+                    if x_newton is not None:
+                        error = 0.5 * abs((dy - dy_newton) / (x - x_newton)) / dy * dx * dx
+                        if log: error *= T_new
+                        if error < T_tol: return T_new, iteration
+                    x_newton = x
+                    dy_newton = dy
+                T = T_new
+                continue
+        if T_high == inf: return
+        T_new = sqrt(T_low * T_high) if log and T_low > 0. else 0.5 * (T_low + T_high)
+        x_newton = None
+        if abs(T_new - T) < T_tol: return (T_new, iteration) if near_root else None
+        T = T_new
+
+def solve_T_newton_batch(f, T, T_tol, maxiter, Tmin=0., Tmax=inf):
+    """
+    Vectorized :func:`solve_T_newton` given f(T, index) -> (residuals, 
+    derivatives) at temperatures `T` of the problems at `index`. Return 
+    temperatures and numbers of iterations (0 where the residual is not a 
+    number, the bracket no longer contains a root, or not converged within 
+    `maxiter` iterations).
+    
+    Examples
+    --------
+    >>> import numpy as np
+    >>> c = np.array([1e4, 2e4, 4e4])
+    >>> T, iterations = solve_T_newton_batch(lambda T, index: (T * T - c[index], 2 * T), [100., 100., 100.], 1e-9, 50)
+    >>> T.round(9).tolist(), iterations.tolist()
+    ([100.0, 141.421356237, 200.0], [1, 5, 6])
+    
+    """
+    T = np.array(T, float)
+    N = T.size
+    T_low = np.full(N, Tmin, float)
+    T_high = np.full(N, Tmax, float)
+    T_last = T.copy()
+    y_last = np.zeros(N)
+    iterations = np.zeros(N, int)
+    index = np.arange(N)
+    for iteration in range(1, maxiter + 1):
+        Ti = T[index]
+        y, dy = f(Ti, index)
+        defined = ~np.isnan(y)
+        if not defined.all():
+            index = index[defined]
+            Ti = Ti[defined]; y = y[defined]; dy = dy[defined]
+        positive = y > 0.
+        negative = y < 0.
+        T_high[index[positive]] = Ti[positive]
+        T_low[index[negative]] = Ti[negative]
+        near_root = (dy > 0.) & (np.abs(y) < 100. * T_tol * dy)
+        yi_last = y_last[index]
+        overshoot = ((positive & (yi_last < 0.)) | (negative & (yi_last > 0.))) & np.isfinite(y) & np.isfinite(yi_last) 
+        if overshoot.any():
+            secant = (y[overshoot] - yi_last[overshoot]) / (Ti[overshoot] - T_last[index[overshoot]])
+            dy[overshoot] = np.maximum(dy[overshoot], secant)
+        T_last[index] = Ti
+        y_last[index] = y
+        newton = (dy > 0.) & np.isfinite(y)
+        dT = np.divide(-y, dy, out=np.zeros_like(y), where=newton)
+        T_new = Ti + dT
+        Ti_low = T_low[index]
+        Ti_high = T_high[index]
+        small_step = newton & (np.abs(dT) < T_tol)
+        bisect = ~(small_step | (newton & (Ti_low < T_new) & (T_new < Ti_high)))
+        T_new[bisect] = 0.5 * (Ti_low[bisect] + Ti_high[bisect])
+        root = y == 0.
+        T_new[root] = Ti[root]
+        stopped = root | small_step | (np.abs(T_new - Ti) < T_tol)
+        converged = root | (stopped & near_root)
+        unbounded = bisect & ~root & (Ti_high == inf)
+        T[index] = T_new
+        iterations[index[converged]] = iteration
+        index = index[~(stopped | unbounded)]
+        if not index.size: break
+    return T, iterations
+
 del njit
\ No newline at end of file
@@ -12,7 +12,7 @@ from .units_of_measure import AbsoluteUnitsOfMeasure
 from . import utils
 from .exceptions import UndefinedChemicalAlias, UndefinedPhase
 from .base import (
-    SparseVector, SparseArray, sparse_vector, sparse_array,
+    SparseVector, SparseArray, DenseDict, sparse_vector, sparse_array,
     MassFlowDict, VolumetricFlowDict, sum_sparse_vectors, get_ndim,
 )
 from ._phase import PhaseIndexer, phase_tuple, check_phase, index, valid_phases as phase_names
@@ -28,6 +28,7 @@ __all__ = (
     'MassFlowIndexer',
     'ChemicalVolumetricFlowIndexer',
     'VolumetricFlowIndexer',
+    'ChemicalAccessor',
     'parent_indexer',
 )
 
@@ -38,6 +39,13 @@ phase_indexer = PhaseIndexer(all_phases)
 
 _new = object.__new__
 
+def material_data(N_phases, N_chemicals):
+    # Large chemical sets share one contiguous phase x chemical buffer for vectorized math
+    if N_chemicals >= SparseVector.dense_min_size:
+        return SparseArray.from_buffer(np.zeros([N_phases, N_chemicals]))
+    else:
+        return SparseArray.from_shape([N_phases, N_chemicals])
+
 def set_main_phase(main_indexer, indexers):
     other_indexer, *indexers = indexers
     try:
@@ -83,9 +91,42 @@ def index_overlap(left_chemicals, right_chemicals, right_index):
             else:
                 raise UndefinedChemicalAlias(CAS)
         cache[CASs] = (left_index, 0)
-        if len(cache) > 100: cache.pop(cache.__iter__().__next__())
         return left_index, right_index
 
+def mixing_index(left_chemicals, right_chemicals):
+    # Left index of all right chemicals; -1 if undefined and -2 if in conflict with chemical groups
+    dct = left_chemicals._index
+    left_index = np.full(right_chemicals.size, -1)
+    for i, CAS in enumerate(right_chemicals.CASs):
+        if CAS in dct:
+            index = dct[CAS]
+            left_index[i] = -2 if hasattr(index, '__iter__') else index
+    return left_index
+
+def mix_into(values, dct, left_index, right_chemicals):
+    # Accumulate sparse vector storage onto a dense row (mapping chemicals if left_index is given)
+    if dct.__class__ is DenseDict:
+        array = dct.array
+        if left_index is None: 
+            values += array
+            return
+        right_index, = array.nonzero()
+        data = array[right_index]
+    elif dct:
+        right_index = [*dct]
+        data = [*dct.values()]
+        if left_index is None:
+            values[right_index] += data
+            return
+    else:
+        return
+    index = left_index[right_index]
+    if (index < 0).any():
+        i = right_index[(index < 0).argmax()]
+        if left_index[i] == -2: raise RuntimeError('conflict in chemical groups and aliases between property packages')
+        raise UndefinedChemicalAlias(right_chemicals.CASs[i])
+    values[index] += data
+
 def get_sparse_chemical_data(sparse, index, kind):
     if kind is None: return sparse
     dct = sparse.dct
@@ -213,7 +254,7 @@ def parent_indexer(chemicals):
     self._phase_indexer = phase_indexer
     self._load_chemicals(chemicals)
     self._set_cache()
-    self.data = SparseArray.from_shape([len(all_phases), self._chemicals.size])
+    self.data = material_data(len(all_phases), self._chemicals.size)
     self._data_cache = {}
     self._parent = None
     return self
@@ -535,6 +576,10 @@ class ChemicalIndexer(Indexer):
     def __getitem__(self, key):
         return get_sparse_chemical_data(self.data, *self._chemicals._get_index_and_kind(key))
     
+    def accessor(self, IDs):
+        """Return a ChemicalAccessor object for fast, repeated getting and setting of chemical data."""
+        return ChemicalAccessor(self, IDs)
+    
     def __setitem__(self, key, data):
         set_sparse_chemical_data(
             self.data, *self._chemicals._get_index_and_kind(key), 
@@ -679,7 +724,7 @@ class ChemicalIndexer(Indexer):
             dct.clear()
             dct.update(old_data.dct)
             self._phase = phase
-            for i in self._data_cache['linked']: i.dct = dct
+            for i in self._data_cache['linked']: i.vector = self.data
     
     def get_phase_and_composition(self):
         """Return phase and composition."""
@@ -763,6 +808,7 @@ class MaterialIndexer(Indexer):
     __slots__ = ('_chemicals', '_phases', '_phase_indexer',
                  '_index_cache', '_data_cache', '_parent')
     _index_caches = {}
+    _mixing_plans = {}
     _ChemicalIndexer = ChemicalIndexer
     
     def __new__(cls, phases=None, units=None, chemicals=None, parent=None, **phase_data):
@@ -789,7 +835,7 @@ class MaterialIndexer(Indexer):
         old__data_cache = self._data_cache
         N_phases = len(self._phases)
         if container is None:
-            self.data = data = SparseArray.from_shape([N_phases, chemicals.size])
+            self.data = data = material_data(N_phases, chemicals.size)
             self._data_cache = {}
         else:
             data, cache = container
@@ -862,6 +908,7 @@ class MaterialIndexer(Indexer):
         new_phases = other_phases.difference(phases)
         if new_phases: 
             data = self.data
+            contiguous = data.contiguous
             data_by_phase = {i: j for i, j in zip(phases, data.rows)}
             all_phases = new_phases.union(phases)
             self._set_phases(all_phases)
@@ -869,56 +916,88 @@ class MaterialIndexer(Indexer):
             for i in new_phases: data_by_phase[i] = SparseVector.from_size(size)
             phases = self._phases
             data.rows = [data_by_phase[i] for i in phases]
+            if contiguous: data.make_contiguous()
             self._set_cache()
             
-    def mix_from(self, others):
+    def _get_mixing_plan(self, others):
+        # Target phase rows and chemical index maps of all sources; cached by phases and chemicals.
+        # Phases are expanded to fit all sources when compiling a new plan.
         isa = isinstance
         chemicals = self._chemicals
-        material_indexers = []
-        chemical_indexers = []
+        try:
+            sources = [
+                (i._phases if isa(i, MaterialIndexer) else i._phase, 
+                 None if i._chemicals is chemicals else i._chemicals)
+                for i in others
+            ]
+        except AttributeError:
+            raise ValueError("can only mix from chemical or material indexers")
+        key = (self._phases, chemicals, *sources)
+        plans = self._mixing_plans
+        if key in plans: return plans[key]
+        other_phases = []
         for i in others:
-            if isa(i, MaterialIndexer): material_indexers.append(i)
-            elif isa(i, ChemicalIndexer): chemical_indexers.append(i)
+            if isa(i, MaterialIndexer): other_phases.extend(i._phases)
+            elif isa(i, ChemicalIndexer): other_phases.append(i.phase)
             else: raise ValueError("can only mix from chemical or material indexers")
-        other_phases = [i.phase for i in chemical_indexers]
-        for i in material_indexers: other_phases.extend(i._phases)
-        other_phases = set(other_phases)
         phase_indexer = self._phase_indexer
-        new_phases = [i for i in other_phases if i not in phase_indexer]
-        phases = self._phases
-        if new_phases: self._expand_phases(other_phases)
-        scp_data = {i: [] for i in phases} # Same chemicals by phase
-        dcp_data = {i: [] for i in phases} # Different chemicals by phase
-        for i in other_phases.difference(phases):
-            if i.isupper():
-                ilow = i.lower()
-                scp_data[i] = scp_data[ilow]
-                dcp_data[i] = dcp_data[ilow]
-            else:
-                iup = i.upper()
-                scp_data[i] = scp_data[iup]
-                dcp_data[i] = dcp_data[iup]
-        for i in material_indexers:
+        if [i for i in other_phases if i not in phase_indexer]: 
+            self._expand_phases(other_phases)
+            phase_indexer = self._phase_indexer
+            key = (self._phases, chemicals, *sources)
+        identity = [*range(len(self._phases))]
+        plan = []
+        for i in others:
             ichemicals = i._chemicals
-            idata = i.data
-            if chemicals is ichemicals:
-                for i, j in zip(i._phases, idata.rows):
-                    scp_data[i].append(j)
+            left_index = None if ichemicals is chemicals else mixing_index(chemicals, ichemicals)
+            if isa(i, MaterialIndexer):
+                index = [phase_indexer(j) for j in i._phases]
+                if index == identity: index = None
             else:
-                left_index, right_index = index_overlap(chemicals, ichemicals, idata.nonzero_keys())
-                for i, j in zip(i._phases, i.data.rows):
-                    dcp_data[i].append((j, left_index, right_index))
-        for i in chemical_indexers:
-            ichemicals = i._chemicals
+                index = phase_indexer(i.phase)
+            plan.append((index, left_index))
+        if len(plans) > 1000: plans.pop(plans.__iter__().__next__())
+        plans[key] = plan
+        return plan
+    
+    def mix_from(self, others):
+        plan = self._get_mixing_plan(others)
+        data = self.data
+        values = np.zeros(data.shape)
+        rows = []; columns = []; nonzeros = [] # Sparse data accumulated in one pass
+        for i, (index, left_index) in zip(others, plan):
             idata = i.data
-            if chemicals is ichemicals:
-                scp_data[i.phase].append(idata)
+            if index.__class__ is int:
+                dct = idata.dct
+                if left_index is None and dct.__class__ is dict:
+                    rows.extend([index] * len(dct))
+                    columns.extend(dct)
+                    nonzeros.extend(dct.values())
+                else:
+                    mix_into(values[index], dct, left_index, i._chemicals)
+            elif left_index is None and (buffer:=idata._get_buffer()) is not None:
+                if index is None: values += buffer
+                else: np.add.at(values, index, buffer)
             else:
-                dcp_data[i.phase].append((idata, *index_overlap(chemicals, ichemicals, idata.nonzero_keys())))
-        for phase, sv in zip(phases, self.data.rows):
-            sv.mix_from(scp_data[phase])
-            for idata, left_index, right_index in dcp_data[phase]:
-                sv[left_index] += idata[right_index]
+                if index is None: index = range(len(values))
+                for j, row in zip(index, idata.rows):
+                    dct = row.dct
+                    if left_index is None and dct.__class__ is dict:
+                        rows.extend([j] * len(dct))
+                        columns.extend(dct)
+                        nonzeros.extend(dct.values())
+                    else:
+                        mix_into(values[j], dct, left_index, i._chemicals)
+        if nonzeros:
+            M, N = values.shape
+            values += np.bincount(
+                np.array(rows) * N + np.array(columns), nonzeros, M * N
+            ).reshape([M, N])
+        buffer = data._get_buffer()
+        if buffer is None:
+            for i, j in zip(data.rows, values): i._reset_from_array(j.copy())
+        else:
+            buffer[:] = values
     
     def separate_out(self, other):
         isa = isinstance
@@ -970,7 +1049,7 @@ class MaterialIndexer(Indexer):
         try:
             self._index_cache = caches[key]
         except KeyError:
-            self._index_cache = caches[key] = {}
+            self._index_cache = caches[key] = utils.LRUCache(self._chemicals.index_cache_size)
     
     def _copy_without_data(self):
         new = _new(self.__class__)
@@ -989,7 +1068,7 @@ class MaterialIndexer(Indexer):
             self._set_phases(phases)
             self._load_chemicals(chemicals)
             self._set_cache()
-            self.data = SparseArray.from_shape([len(phases), self._chemicals.size])
+            self.data = material_data(len(phases), self._chemicals.size)
         elif (phases:=frozenset(phases)) in parent._data_cache:
             return parent._data_cache[phases]
         else:    
@@ -1059,6 +1138,10 @@ class MaterialIndexer(Indexer):
     
     def get_phase(self, phase, lock=False):
         return self._ChemicalIndexer.blank(phase, self._chemicals, self, lock)
+    
+    def accessor(self, IDs, phase=None):
+        """Return a ChemicalAccessor object for fast, repeated getting and setting of chemical data."""
+        return ChemicalAccessor(self, IDs, phase)
         
     def get_phases(self, phases):
         return self.__class__.blank(phases, self._chemicals, self)
@@ -1145,7 +1228,6 @@ class MaterialIndexer(Indexer):
             else:
                 sum_across_phases = True
             cache[key] = index_data = (index, kind, sum_across_phases)
-            utils.trim_cache(cache)
         except TypeError:
             try:
                 key = tuple([i if i.__hash__ else tuple(i) for i in key])
@@ -1159,7 +1241,6 @@ class MaterialIndexer(Indexer):
                 else:
                     sum_across_phases = True
                 cache[key] = index_data = (index, kind, sum_across_phases)
-                utils.trim_cache(cache)
             except TypeError:
                 raise TypeError("only strings, sequences of strings, and ellipsis are valid index keys")
         return index_data
@@ -1329,6 +1410,159 @@ ChemicalVolumetricFlowIndexer, VolumetricFlowIndexer = _new_Indexer('VolumetricF
 ChemicalMassFlowIndexer.phase = proxy_phase
 ChemicalVolumetricFlowIndexer.phase = proxy_phase
 
+# %% Chemical accessor
+
+class ChemicalAccessor:
+    """
+    Create a ChemicalAccessor object with pre-resolved chemical indices for 
+    fast, repeated getting and setting of indexer data. Chemical groups are 
+    summed when getting values and split by group composition when setting 
+    values, as with indexing.
+    
+    Parameters
+    ----------
+    indexer : ChemicalIndexer|MaterialIndexer
+        Indexer to get and set data.
+    IDs : str|Sequence[str]
+        Chemical identifiers, including chemical groups.
+    phase : str, optional
+        Phase of material indexer data. If not given, material indexer 
+        data is summed across phases and cannot be set.
+    
+    Examples
+    --------
+    >>> import thermosteam as tmo
+    >>> chemicals = tmo.CompiledChemicals(['Water', 'Methanol', 'Ethanol'], cache=True)
+    >>> chemicals.define_group('Alcohol', ['Methanol', 'Ethanol'], composition=[0.5, 0.5])
+    >>> tmo.settings.set_thermo(chemicals)
+    >>> s = tmo.Stream(None, Water=2, Methanol=1, Ethanol=1)
+    >>> accessor = s.imol.accessor(('Water', 'Alcohol'))
+    >>> accessor.get()
+    array([2., 2.])
+    >>> accessor.set([1., 4.])
+    >>> s.imol['Water', 'Methanol', 'Ethanol']
+    array([1., 2., 2.])
+    
+    """
+    __slots__ = ('indexer', 'key', 'phase', 'kind', 'index', 
+                 'index_list', 'starts', 'counts', '_fractions')
+    
+    def __init__(self, indexer, IDs, phase=None):
+        if IDs.__hash__ is None: IDs = tuple(IDs)
+        index, kind = indexer._chemicals._get_index_and_kind(IDs)
+        if kind is None: 
+            index_list = [*range(indexer._chemicals.size)]
+            kind = 3
+        elif kind == 0:
+            index_list = [index]
+        elif kind == 1 or kind == 3:
+            index_list = index
+        else:
+            index_list = []
+            for i in index:
+                if i.__class__ is list: index_list.extend(i)
+                else: index_list.append(i)
+        if kind == 2:
+            counts = np.array([len(i) if i.__class__ is list else 1 for i in index])
+            self.starts = np.cumsum(counts) - counts
+            self.counts = counts
+        else:
+            self.starts = self.counts = None
+        if phase is not None: indexer._phase_indexer(phase) # Make sure phase exists
+        self.indexer = indexer
+        self.key = IDs
+        self.phase = phase
+        self.kind = kind
+        self.index = np.array(index_list, dtype=int)
+        self.index_list = index_list
+        self._fractions = None
+    
+    @property
+    def fractions(self):
+        """[1d array] Fraction of set values allocated to each chemical (by group composition)."""
+        fractions = self._fractions
+        if fractions is None:
+            kind = self.kind
+            if kind == 1:
+                fractions = self.indexer.group_compositions[self.key]
+            elif kind == 2:
+                group_compositions = self.indexer.group_compositions
+                fractions = np.concatenate([
+                    group_compositions[i] if n > 1 else [1.]
+                    for i, n in zip(self.key, self.counts)
+                ])
+            else:
+                fractions = np.ones(self.index.size)
+            self._fractions = fractions
+        return fractions
+    
+    def _get_vector(self):
+        indexer = self.indexer
+        phase = self.phase
+        if phase is None: return indexer.data
+        return indexer.data.rows[indexer._phase_indexer(phase)]
+    
+    def _gather(self, vector):
+        dct = vector.dct
+        if dct.__class__ is DenseDict: return dct.array[self.index]
+        return np.array([dct.get(i, 0.) for i in self.index_list])
+    
+    def get(self):
+        """Return chemical data."""
+        vector = self._get_vector()
+        if vector.__class__ is SparseArray:
+            values = sum([self._gather(i) for i in vector.rows])
+        else:
+            values = self._gather(vector)
+        kind = self.kind
+        if kind == 0: 
+            return float(values[0])
+        elif kind == 1:
+            return float(values.sum())
+        elif kind == 2:
+            return np.add.reduceat(values, self.starts)
+        else:
+            return values
+    
+    def set(self, data):
+        """Set chemical data."""
+        vector = self._get_vector()
+        if vector.__class__ is SparseArray:
+            raise IndexError("multiple phases present; must include phase key "
+                             "to set chemical data")
+        data = np.asarray(data, dtype=float)
+        ndim = data.ndim
+        kind = self.kind
+        if ndim == 0:
+            values = float(data) if kind == 0 or kind == 3 else data * self.fractions
+        elif ndim == 1 and kind:
+            if kind == 2: data = np.repeat(data, self.counts) * self.fractions
+            if data.size != self.index.size:
+                raise IndexError(f'cannot set {data.size} values to {self.index.size} chemicals')
+            values = data
+        else:
+            raise IndexError(
+                'cannot set an array element with a sequence'
+            )
+        dct = vector.dct
+        if dct.__class__ is DenseDict:
+            dct.array[self.index] = values
+        elif values.__class__ is float:
+            if values:
+                for i in self.index_list: dct[i] = values
+            else:
+                for i in self.index_list: 
+                    if i in dct: del dct[i]
+        else:
+            for i, j in zip(self.index_list, values.tolist()):
+                if j: dct[i] = j
+                elif i in dct: del dct[i]
+    
+    def __repr__(self):
+        phase = '' if self.phase is None else f", phase={self.phase!r}"
+        return f"{type(self).__name__}({self.key!r}{phase})"
+    
+
 # %% Mass flow properties
 
 def by_mass(self):
@@ -1337,7 +1571,7 @@ def by_mass(self):
         mass = self._data_cache['mass']
     except:
         chemicals = self.chemicals
-        dct = MassFlowDict(self.data.dct, chemicals.MW)
+        dct = MassFlowDict(self.data, chemicals.MW)
         data_cache = self._data_cache
         if 'linked' in data_cache: data_cache['linked'].append(dct)
         data_cache['mass'] = mass = \
@@ -1364,7 +1598,7 @@ def by_mass(self):
         self._data_cache['mass'] = mass = \
         MassFlowIndexer.from_data(
             SparseArray.from_rows([
-                SparseVector.from_dict(MassFlowDict(i.dct, MW), size)
+                SparseVector.from_dict(MassFlowDict(i, MW), size)
                 for i in self.data
             ]),
             self.phases, chemicals,
@@ -1389,7 +1623,7 @@ def by_volume(self, TP):
     except:
         chemicals = self._chemicals
         V = [i.V for i in chemicals]
-        dct = VolumetricFlowDict(self.data.dct, TP, V, None, self, {})
+        dct = VolumetricFlowDict(self.data, TP, V, None, self, {})
         data_cache = self._data_cache
         if 'linked' in data_cache: data_cache['linked'].append(dct)
         data_cache['vol'] = \
@@ -1422,7 +1656,7 @@ def by_volume(self, TP):
         self._data_cache['vol'] = \
         vol = VolumetricFlowIndexer.from_data(
             SparseArray.from_rows([
-                SparseVector.from_dict(VolumetricFlowDict(i.dct, TP, V, j, None, {}), size)
+                SparseVector.from_dict(VolumetricFlowDict(i, TP, V, j, None, {}), size)
                 for i, j in zip(self.data, self._phases)
             ]),
             phases, chemicals,
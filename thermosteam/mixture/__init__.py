@@ -9,10 +9,13 @@
 """
 from . import mixture
 from . import ideal_mixture_model
+from . import property_array
 
 __all__ = (*mixture.__all__,
            *ideal_mixture_model.__all__,         
+           *property_array.__all__,
 )
 
 from .mixture import *
 from .ideal_mixture_model import *
+from .property_array import *
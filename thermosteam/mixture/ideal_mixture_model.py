@@ -7,7 +7,8 @@
 # for license details.
 """
 """
-from ..base import display_asfunctor, SparseVector
+import numpy as np
+from ..base import display_asfunctor, SparseVector, SparseArray
 from math import log
 
 __all__ = (
@@ -15,6 +16,34 @@ __all__ = (
     'IdealHvapModel', 'SinglePhaseIdealTMixtureModel', 'SinglePhaseIdealTPMixtureModel',
 )
 
+def batch_args(mol, T, P):
+    # Return a 2-d array of molar flow rates (one row per state) and
+    # arrays of temperatures and pressures (or None) with an entry per state.
+    if mol.__class__ is SparseArray:
+        mol = mol.to_array()
+    elif not isinstance(mol, np.ndarray):
+        mol = [(i.to_array() if i.__class__ is SparseVector else i) for i in mol]
+    mol = np.asarray(mol, float)
+    if mol.ndim != 2: raise ValueError('mol must be a 2-d array with a row for each state')
+    N_states = len(mol)
+    T = np.broadcast_to(np.asarray(T, float), N_states)
+    if P is not None: P = np.broadcast_to(np.asarray(P, float), N_states)
+    return mol, T, P
+
+def batch_values(array, models, phase, mol, T, P):
+    # Return a 2-d array of pure component properties for each state,
+    # with zeros where there is no flow.
+    mask = mol != 0.
+    values = None if array is None else array.batch(phase, T, P, mask)
+    if values is None:
+        values = np.zeros(mol.shape)
+        for k, i in zip(*[i.tolist() for i in np.nonzero(mask)]):
+            values[k, i] = models[i](phase, T[k], None if P is None else P[k])
+    else:
+        values[~mask] = 0.
+    return values
+
+
 class IdealTPMixtureModel:
     """
     Create an IdealTPMixtureModel object that calculates mixture properties
@@ -22,10 +51,12 @@ class IdealTPMixtureModel:
     
     Parameters
     ----------
-    models : Iterable[function(T, P)]
-        Chemical property functions of temperature and pressure.
+    models : Iterable[function(phase, T, P)]
+        Chemical property functions of phase, temperature and pressure.
     var : str
         Description of thermodynamic variable returned.
+    array : PhasePropertyArray, optional
+        Vectorized chemical property models for evaluating all chemicals at once.
     
     Notes
     -----
@@ -35,7 +66,7 @@ class IdealTPMixtureModel:
     See also
     --------
     :class:`Mixture`
-    :func:`~.mixture_builders.ideal_mixture`
+    :class:`~.PhasePropertyArray`
     
     Examples
     --------
@@ -50,16 +81,44 @@ class IdealTPMixtureModel:
     5.364...-05
     
     """
-    __slots__ = ('var', 'models')
+    __slots__ = ('var', 'models', 'array')
+    
+    #: Minimum number of chemicals to evaluate with vectorized models.
+    array_min_size = 8
 
-    def __init__(self, models, var):
+    def __init__(self, models, var, array=None):
         self.models = tuple(models)
         self.var = var
+        self.array = array
 
     def __call__(self, phase, mol, T, P):
         if mol.__class__ is not SparseVector: mol = SparseVector(mol)
+        dct = mol.dct
+        array = self.array
+        if array is not None and len(dct) >= self.array_min_size:
+            values = array(phase, T, P, dct)
+            if values is not None: return sum([j * values[i] for i, j in dct.items()])
         models = self.models
-        return sum([j * models[i](phase, T, P) for i, j in mol.dct.items()])
+        return sum([j * models[i](phase, T, P) for i, j in dct.items()])
+    
+    def batch(self, phase, mol, T, P):
+        """
+        Return an array of mixture properties with an entry for each row
+        of molar flow rates in `mol` and each temperature in `T` and
+        pressure in `P` (arrays or scalars).
+        
+        Examples
+        --------
+        >>> from thermosteam.mixture import IdealTPMixtureModel
+        >>> from thermosteam import Chemicals
+        >>> chemicals = Chemicals(['Water', 'Ethanol'])
+        >>> mixture_model = IdealTPMixtureModel([i.V for i in chemicals], 'V')
+        >>> mixture_model.batch('l', [[0.2, 0.8], [0.5, 0.5]], [350, 300], 101325)
+        array([5.364e-05, 3.844e-05])
+        
+        """
+        mol, T, P = batch_args(mol, T, P)
+        return (mol * batch_values(self.array, self.models, phase, mol, T, P)).sum(1)
     
     def __repr__(self):
         return f"<{display_asfunctor(self)}>"
@@ -103,12 +162,33 @@ class IdealEntropyModel:
     __slots__ = IdealTPMixtureModel.__slots__
     __init__ = IdealTPMixtureModel.__init__
     __repr__ = IdealTPMixtureModel.__repr__
+    array_min_size = IdealTPMixtureModel.array_min_size
 
     def __call__(self, phase, mol, T, P):
         if mol.__class__ is not SparseVector: mol = SparseVector(mol)
         total_mol = mol.sum()
+        dct = mol.dct
+        array = self.array
+        if array is not None and len(dct) >= self.array_min_size:
+            values = array(phase, T, P, dct)
+            if values is not None: return sum([j * values[i] + j * log(j / total_mol) for i, j in dct.items()])
         models = self.models
-        return sum([j * models[i](phase, T, P) + j * log(j / total_mol) for i, j in mol.dct.items()])
+        return sum([j * models[i](phase, T, P) + j * log(j / total_mol) for i, j in dct.items()])
+    
+    def batch(self, phase, mol, T, P):
+        """
+        Return an array of mixture entropies with an entry for each row
+        of molar flow rates in `mol` and each temperature in `T` and
+        pressure in `P` (arrays or scalars).
+        
+        """
+        mol, T, P = batch_args(mol, T, P)
+        S = (mol * batch_values(self.array, self.models, phase, mol, T, P)).sum(1)
+        total_mol = mol.sum(1, keepdims=True)
+        total_mol[total_mol == 0.] = 1.
+        x = mol / total_mol
+        x[mol == 0.] = 1.
+        return S + (mol * np.log(x)).sum(1)
     
 
 class IdealTMixtureModel:
@@ -148,11 +228,27 @@ class IdealTMixtureModel:
     __slots__ = IdealTPMixtureModel.__slots__
     __init__ = IdealTPMixtureModel.__init__
     __repr__ = IdealTPMixtureModel.__repr__
+    array_min_size = IdealTPMixtureModel.array_min_size
 
     def __call__(self, phase, mol, T, P=None):
         if mol.__class__ is not SparseVector: mol = SparseVector(mol)
+        dct = mol.dct
+        array = self.array
+        if array is not None and len(dct) >= self.array_min_size:
+            values = array(phase, T, P, dct)
+            if values is not None: return sum([j * values[i] for i, j in dct.items()])
         models = self.models
-        return sum([j * models[i](phase, T) for i, j in mol.dct.items()])
+        return sum([j * models[i](phase, T) for i, j in dct.items()])
+    
+    def batch(self, phase, mol, T, P=None):
+        """
+        Return an array of mixture properties with an entry for each row
+        of molar flow rates in `mol` and each temperature in `T` (an array
+        or a scalar).
+        
+        """
+        mol, T, P = batch_args(mol, T, P)
+        return (mol * batch_values(self.array, self.models, phase, mol, T, P)).sum(1)
 
 
 class SinglePhaseIdealTMixtureModel:
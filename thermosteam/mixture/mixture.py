@@ -10,70 +10,38 @@
 import flexsolve as flx
 import thermosteam as tmo
 import numpy as np
-from math import exp
+from sys import getsizeof
 from thermosteam import functional as fn
-from thermo.interaction_parameters import IPDB
+from thermo import interaction_parameters
 from thermo import eos_mix
 from .. import units_of_measure as thermo_units
-from ..base import PhaseHandle, MockPhaseTHandle, MockPhaseTPHandle, SparseVector, sparse
+from ..base import SparseVector, sparse
+from ..utils import LRUCache, MemoryLRUCache
 from .ideal_mixture_model import (
+    batch_args,
     SinglePhaseIdealTMixtureModel,
     IdealTMixtureModel, 
     IdealTPMixtureModel, 
     IdealEntropyModel, 
     IdealHvapModel
 )
+from .property_array import get_phase_handles, PhasePropertyArray
 from .._chemicals import Chemical, CompiledChemicals, chemical_data_array
 
-__all__ = ('Mixture', 'IdealMixture')
+__all__ = ('Mixture', 'IdealMixture', 'EOSCache')
 
 # %% Functions for building mixture models
 
 def create_mixture_model(chemicals, var, Model):
-    getfield = getattr
-    isa = isinstance
-    handles = []
-    for chemical in chemicals:
-        obj = getfield(chemical, var)
-        if isa(obj, PhaseHandle):
-            phase_handle = obj
-        elif var == 'Cn':
-            phase_handle = MockPhaseTHandle(var, obj)
-        else:
-            phase_handle = MockPhaseTPHandle(var, obj)
-        handles.append(phase_handle)
-    return Model(handles, var)
+    handles = get_phase_handles(chemicals, var)
+    return Model(handles, var, PhasePropertyArray(handles, var))
     
 
 # %% Energy balance
 
-def iter_T_at_HP(T, H, H_model, phase, mol, P, Cn_model, Cn_cache):
-    # Used to solve for temperature at given ethalpy 
-    counter, Cn = Cn_cache
-    if not counter % 5: Cn_cache[1] = Cn = Cn_model(phase, mol, T, P)
-    Cn_cache[0] += 1
-    return T + (H - H_model(phase, mol, T, P)) / Cn
-
-def xiter_T_at_HP(T, H, H_model, phase_mol, P, Cn_model, Cn_cache):
-    # Used to solve for temperature at given ethalpy 
-    counter, Cn = Cn_cache
-    if not counter % 5: Cn_cache[1] = Cn = Cn_model(phase_mol, T, P)
-    Cn_cache[0] += 1
-    return T + (H - H_model(phase_mol, T, P)) / Cn
-
-def iter_T_at_SP(T, S, S_model, phase, mol, P, Cn_model, Cn_cache):
-    # Used to solve for temperature at given entropy 
-    counter, Cn = Cn_cache
-    if not counter % 5: Cn_cache[1] = Cn = Cn_model(phase, mol, T, P)
-    Cn_cache[0] += 1
-    return T * exp((S - S_model(phase, mol, T, P)) / Cn)
-
-def xiter_T_at_SP(T, S, S_model, phase_mol, P, Cn_model, Cn_cache):
-    # Used to solve for temperature at given entropy 
-    counter, Cn = Cn_cache
-    if not counter % 5: Cn_cache[1] = Cn = Cn_model(phase_mol, T, P)
-    Cn_cache[0] += 1
-    return T * exp((S - S_model(phase_mol, T, P)) / Cn)
+def solve_T_with_secant(f, T_guess, T_tol):
+    # Fallback for non-monotonic or slowly converging energy balances.
+    return flx.secant(f, x0=T_guess, x1=T_guess + 1., xtol=T_tol, ytol=0., checkiter=False)
 
 
 # %% Abstract mixture
@@ -106,6 +74,9 @@ class Mixture:
     Abstract attributes
     MWs : 1d array[float]
         Component molecular weights [g/mol].
+    T_iter : int
+        Number of iterations of the last temperature solution (e.g., 
+        by `solve_T_at_HP`).
     
     """
     maxiter = 20
@@ -208,80 +179,76 @@ class Mixture:
     def _load_free_energy_args(self, *args): pass
     def _load_xfree_energy_args(self, *args): pass
     
+    def _solve_T(self, f, T_guess, log):
+        result = fn.solve_T_newton(f, T_guess, self.T_tol, self.maxiter, log=log, exact=True)
+        if result is None:
+            T = solve_T_with_secant(lambda T: f(T)[0], T_guess, self.T_tol)
+            self.T_iter = self.maxiter
+        else:
+            T, self.T_iter = result
+        return T
+    
     def solve_T_at_HP(self, phase, mol, H, T_guess, P):
-        """Solve for temperature in Kelvin."""
+        """
+        Solve for temperature in Kelvin at given enthalpy [J/mol] by Newton's
+        method using heat capacity as the derivative of enthalpy.
+        
+        Examples
+        --------
+        >>> from thermosteam import IdealMixture
+        >>> mixture = IdealMixture.from_chemicals(['Water', 'Ethanol'])
+        >>> H = mixture.H('l', [0.5, 0.5], 350, 101325)
+        >>> round(mixture.solve_T_at_HP('l', [0.5, 0.5], H, 298.15, 101325), 6)
+        350.0
+        >>> mixture.T_iter
+        3
+        
+        """
         self._load_free_energy_args(phase, mol, T_guess, P)
         try:
-            args = (H, self.H, phase, mol, P, self.Cn, [0, None])
-            T = iter_T_at_HP(T_guess, *args)
-            if abs(T - T_guess) < self.T_tol: return T
-            T_guess = flx.aitken(iter_T_at_HP, T, self.T_tol, args, self.maxiter, checkiter=False)
-            T = iter_T_at_HP(T_guess, *args)
-            return (
-                flx.secant(
-                    lambda T: self.H(phase, mol, T, P) - H,
-                    x0=T_guess, x1=T, xtol=self.T_tol, ytol=0.
-                )
-                if abs(T - T_guess) > self.T_tol else T
+            return self._solve_T(
+                lambda T: (self.H(phase, mol, T, P) - H, self.Cn(phase, mol, T, P)),
+                T_guess, False
             )
         finally:
             self._free_energy_args.clear()
         
     def xsolve_T_at_HP(self, phase_mol, H, T_guess, P):
-        """Solve for temperature in Kelvin."""
+        """Solve for temperature in Kelvin at given enthalpy [J/mol] of a multi-phase mixture."""
         phase_mol = tuple(phase_mol)
         self._load_xfree_energy_args(phase_mol, T_guess, P)
         try:
-            args = (H, self.xH, phase_mol, P, self.xCn, [0, None])
-            T = xiter_T_at_HP(T_guess, *args)
-            if abs(T - T_guess) < self.T_tol: return T
-            T_guess = flx.aitken(xiter_T_at_HP, T, self.T_tol, args, self.maxiter, checkiter=False)
-            T = xiter_T_at_HP(T_guess, *args)
-            return (
-                flx.secant(
-                    lambda T: self.xH(phase_mol, T, P) - H,
-                    x0=T_guess, x1=T, xtol=self.T_tol, ytol=0., checkiter=False
-                )
-                if abs(T - T_guess) > self.T_tol else T
+            return self._solve_T(
+                lambda T: (self.xH(phase_mol, T, P) - H, self.xCn(phase_mol, T, P)),
+                T_guess, False
             )
         finally:
             self._free_energy_args.clear()
     
     def solve_T_at_SP(self, phase, mol, S, T_guess, P):
-        """Solve for temperature in Kelvin."""
+        """
+        Solve for temperature in Kelvin at given entropy [J/mol/K] by 
+        Newton's method in log(T) using heat capacity as the derivative of 
+        entropy.
+        
+        """
         self._load_free_energy_args(phase, mol, T_guess, P)
         try:
-            args = (S, self.S, phase, mol, P, self.Cn, [0, None])
-            T = iter_T_at_SP(T_guess, *args)
-            if abs(T - T_guess) < self.T_tol: return T
-            T_guess = flx.aitken(iter_T_at_SP, T, self.T_tol, args, self.maxiter, checkiter=False)
-            T = iter_T_at_SP(T_guess, *args)
-            return (
-                flx.secant(
-                    lambda T: self.S(phase, mol, T, P) - S,
-                    x0=T_guess, x1=T, xtol=self.T_tol, ytol=0.
-                )
-                if abs(T - T_guess) > self.T_tol else T
+            return self._solve_T(
+                lambda T: (self.S(phase, mol, T, P) - S, self.Cn(phase, mol, T, P)),
+                T_guess, True
             )
         finally:
             self._free_energy_args.clear()
         
     def xsolve_T_at_SP(self, phase_mol, S, T_guess, P):
-        """Solve for temperature in Kelvin."""
+        """Solve for temperature in Kelvin at given entropy [J/mol/K] of a multi-phase mixture."""
         phase_mol = tuple(phase_mol)
         self._load_xfree_energy_args(phase_mol, T_guess, P)
         try:
-            args = (S, self.xS, phase_mol, P, self.xCn, [0, None])
-            T = xiter_T_at_SP(T_guess, *args)
-            if abs(T - T_guess) < self.T_tol: return T
-            T_guess = flx.aitken(xiter_T_at_SP, T, self.T_tol, args, self.maxiter, checkiter=False)
-            T = xiter_T_at_SP(T_guess, *args)
-            return (
-                flx.secant(
-                    lambda T: self.xS(phase_mol, T, P) - S,
-                    x0=T_guess, x1=T, xtol=self.T_tol, ytol=0.
-                )
-                if abs(T - T_guess) > self.T_tol else T
+            return self._solve_T(
+                lambda T: (self.xS(phase_mol, T, P) - S, self.xCn(phase_mol, T, P)),
+                T_guess, True
             )
         finally:
             self._free_energy_args.clear()
@@ -316,6 +283,81 @@ class Mixture:
         """Multi-phase mixture thermal conductivity [W/m/K]."""
         return sum([self.kappa(phase, mol, T, P) for phase, mol in phase_mol])
     
+    def batch(self, name, phase, mol, T, P):
+        """
+        Return an array of a mixture property with an entry for each row
+        of molar flow rates in `mol` and each temperature in `T` and 
+        pressure in `P`.
+        
+        Parameters
+        ----------
+        name : str
+            Name of mixture property (e.g., 'H', 'S', 'Cn', 'V', 'mu', 'kappa').
+        phase : str
+            Phase of all states.
+        mol : 2d array[float]
+            Molar flow rates or composition with a row for each state.
+        T : 1d array[float]|float
+            Temperatures [K].
+        P : 1d array[float]|float
+            Pressures [Pa].
+        
+        Examples
+        --------
+        >>> from thermosteam import IdealMixture
+        >>> mixture = IdealMixture.from_chemicals(['Water', 'Ethanol'])
+        >>> mol = [[0.2, 0.8], [0.5, 0.5], [1.0, 0.0]]
+        >>> mixture.batch('H', 'l', mol, [350, 320, 300], 101325)
+        array([5870.318, 2093.432,  139.344])
+        >>> mixture.H_batch('l', mol, 350, 101325)
+        array([5870.318, 5134.394, 3907.854])
+        
+        """
+        mol, T, P = batch_args(mol, T, P)
+        if P is None: P = [None] * len(mol)
+        f = getattr(self, name)
+        return np.array([f(phase, i, j, k) for i, j, k in zip(mol, T, P)], float)
+    
+    def xbatch(self, name, phase_mol, T, P):
+        """
+        Return an array of a multi-phase mixture property with an entry 
+        for each state given pairs of phases and 2-d arrays of molar flow 
+        rates with a row for each state.
+        """
+        return sum([self.batch(name, phase, mol, T, P) for phase, mol in phase_mol])
+    
+    def H_batch(self, phase, mol, T, P):
+        """Return an array of enthalpies [J/mol] with an entry for each state."""
+        return self.batch('H', phase, mol, T, P)
+    
+    def S_batch(self, phase, mol, T, P):
+        """Return an array of entropies [J/mol/K] with an entry for each state."""
+        return self.batch('S', phase, mol, T, P)
+    
+    def Cn_batch(self, phase, mol, T, P=None):
+        """Return an array of molar isobaric heat capacities [J/mol/K] with an entry for each state."""
+        return self.batch('Cn', phase, mol, T, P)
+    
+    def V_batch(self, phase, mol, T, P):
+        """Return an array of molar volumes [m^3/mol] with an entry for each state."""
+        return self.batch('V', phase, mol, T, P)
+    
+    def mu_batch(self, phase, mol, T, P):
+        """Return an array of dynamic viscosities [Pa*s] with an entry for each state."""
+        return self.batch('mu', phase, mol, T, P)
+    
+    def kappa_batch(self, phase, mol, T, P):
+        """Return an array of thermal conductivities [W/m/K] with an entry for each state."""
+        return self.batch('kappa', phase, mol, T, P)
+    
+    def xH_batch(self, phase_mol, T, P):
+        """Return an array of multi-phase enthalpies [J/mol] with an entry for each state."""
+        return self.xbatch('H', phase_mol, T, P)
+    
+    def xS_batch(self, phase_mol, T, P):
+        """Return an array of multi-phase entropies [J/mol/K] with an entry for each state."""
+        return self.xbatch('S', phase_mol, T, P)
+    
         
     def __repr__(self):
         return f"{type(self).__name__}(...)"
@@ -403,7 +445,7 @@ class IdealMixture(Mixture):
         'Cn', 'mu', 'V', 'kappa',
         'Hvap', 'sigma', 'epsilon',
         'MWs', '_H', '_H_excess', '_S', '_S_excess',
-        '_free_energy_args',
+        '_free_energy_args', 'T_iter',
     )
     
     def __init__(self, Cn, H, S, H_excess, S_excess,
@@ -423,6 +465,7 @@ class IdealMixture(Mixture):
         self._H_excess = H_excess
         self._S_excess = S_excess
         self._free_energy_args = {}
+        self.T_iter = 0
     
     @classmethod
     def from_chemicals(cls, chemicals, 
@@ -486,6 +529,19 @@ class IdealMixture(Mixture):
         return cls(Cn, H, S, H_excess, S_excess,
                    mu, V, kappa, Hvap, sigma, epsilon, MWs, include_excess_energies)
     
+    def batch(self, name, phase, mol, T, P):
+        if name == 'H':
+            models = (self._H, self._H_excess) if self.include_excess_energies else (self._H,)
+        elif name == 'S':
+            models = (self._S, self._S_excess) if self.include_excess_energies else (self._S,)
+        else:
+            models = (getattr(self, name),)
+        if all([hasattr(i, 'batch') for i in models]):
+            return sum([i.batch(phase, mol, T, P) for i in models])
+        else:
+            return super().batch(name, phase, mol, T, P)
+    batch.__doc__ = Mixture.batch.__doc__
+    
     def __repr__(self):
         return f"{type(self).__name__}(..., include_excess_energies={self.include_excess_energies})"
     
@@ -495,16 +551,98 @@ class IdealMixture(Mixture):
                  ")")
     
     
+# %% Equation of state cache
+
+def eos_memory(eos):
+    # Estimated memory of an equation of state object [bytes] including its 
+    # attributes and rows of nested lists (e.g., interaction parameters), 
+    # but not the floats they reference.
+    size = getsizeof(eos)
+    for cls in type(eos).__mro__:
+        names = cls.__dict__.get('__slots__', ())
+        if isinstance(names, str): names = (names,)
+        for name in names:
+            value = getattr(eos, name, None)
+            size += getsizeof(value)
+            if value.__class__ is list and value and value[0].__class__ is list:
+                size += sum([getsizeof(i) for i in value])
+    if hasattr(eos, '__dict__'):
+        size += sum([getsizeof(i) for i in eos.__dict__.values()])
+    return size
+
+def departure(eos, name, phase):
+    # Return departure property of the liquid or gas root, or of the other
+    # root for liquids without a liquid root.
+    if phase == 'l':
+        try: return getattr(eos, name + '_l')
+        except: 
+            try: return getattr(eos, name + '_g')
+            except: return 0.
+    else:
+        try: return getattr(eos, name + '_g')
+        except: return 0.
+
+def eos_at(eos, T, P, zs, only_g, only_l, tol):
+    # Return equation of state object at given temperature, pressure and 
+    # composition, reusing the given object if its state is within tolerance.
+    if (abs(eos.T - T) <= tol * T and abs(eos.P - P) <= tol * P
+        and all([abs(i - j) <= tol for i, j in zip(eos.zs, zs)])):
+        return eos
+    else:
+        return eos.to_TP_zs(
+            T=T, P=P, zs=zs, only_g=only_g, only_l=only_l, fugacities=False
+        )
+
+class EOSCache(MemoryLRUCache):
+    """
+    Create an EOSCache object, an LRUCache of equation of state objects
+    that also discards the least recently used objects when their 
+    estimated memory exceeds `maxmemory`.
+    
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of objects. Defaults to 128.
+    maxmemory : float, optional
+        Maximum estimated memory [bytes]. Defaults to 10 MB.
+    
+    Examples
+    --------
+    >>> from thermosteam import PRMixture
+    >>> mixture = PRMixture.from_chemicals(['Water', 'Ethanol'])
+    >>> PRMixture.cache.clear()
+    >>> mixture.H('l', [0.5, 0.5], 350, 101325) == mixture.H('l', [0.5, 0.5], 350, 101325)
+    True
+    >>> len(PRMixture.cache), PRMixture.cache.memory > 0
+    (1, True)
+    
+    """
+    __slots__ = ()
+    
+    def __init__(self, maxsize=128, maxmemory=1e7):
+        super().__init__(maxsize, maxmemory, eos_memory)
+    
+    def __reduce__(self):
+        return self.__class__, (self.maxsize, self.maxmemory)
+
+
 # %% Thermo mixture
 
 class EOSMixture(Mixture):
     __slots__ = (
         'chemicals', 'eos_chemicals', 'Cn_ideal', 'mu', 'V', 'kappa',
         'Hvap', 'sigma', 'epsilon', 'H_ideal', 'S_ideal', 'MWs', 
-        '_free_energy_args',
+        '_free_energy_args', '_departure_cache', 'T_iter',
     )
     chemsep_db = None
     
+    #: Maximum number of states in the departure property cache of new mixtures.
+    departure_cache_size = 256
+    
+    #: Relative tolerance of temperature and pressure, and absolute tolerance
+    #: of composition within which equation of state objects are reused.
+    eos_tol = 1e-10
+    
     def __init__(self, chemicals, eos_chemicals, Cn_ideal, H_ideal, S_ideal, mu, V, kappa, Hvap, sigma, epsilon, MWs):
         self.chemicals = chemicals
         self.eos_chemicals = eos_chemicals
@@ -519,6 +657,8 @@ class EOSMixture(Mixture):
         self.epsilon = epsilon
         self.MWs = MWs
         self._free_energy_args = {}
+        self._departure_cache = LRUCache(self.departure_cache_size)
+        self.T_iter = 0
     
     def eos_args(self, phase, mol, T, P):
         chemicals = self.chemicals
@@ -539,30 +679,56 @@ class EOSMixture(Mixture):
         cache = self.cache
         only_g = phase == 'g'
         only_l = phase == 'l'
-        if key in cache:
-            eos = cache[key].to_TP_zs(
+        eos = cache.get(key)
+        if eos is None:
+            Tcs, Pcs, omegas, kijs = self.eos_data(eos_chemicals)
+            cache[key] = eos = self.EOS(
+                Tcs=Tcs, Pcs=Pcs, omegas=omegas, kijs=kijs,
                 T=T, P=P, zs=zs, only_g=only_g, only_l=only_l,
                 fugacities=False
             )
         else:
-            data = tmo.ChemicalData(eos_chemicals)
-            if self.chemsep_db is None:
-                kijs = None
-            else:
-                try:
-                    kijs = IPDB.get_ip_asymmetric_matrix(self.chemsep_db, data.CASs, 'kij')
-                except:
-                    kijs = None
-            self.cache[key] = eos = self.EOS(
-                Tcs=data.Tcs, Pcs=data.Pcs, omegas=data.omegas, kijs=kijs,
-                T=T, P=P, zs=zs, only_g=only_g, only_l=only_l,
-                fugacities=False
-            )
+            new = eos_at(eos, T, P, zs, only_g, only_l, self.eos_tol)
+            if new is not eos: cache[key] = eos = new
         return eos, eos_mol, dict(
             P=P, zs=zs, only_g=only_g, only_l=only_l,
             fugacities=False
         )
 
+    def eos_data(self, eos_chemicals):
+        """
+        Return critical temperatures, critical pressures, acentric factors,
+        and binary interaction parameters (or None) of chemicals. Results 
+        are cached by chemical subset.
+        """
+        key = (eos_chemicals, self.chemsep_db)
+        data_cache = self.data_cache
+        if key in data_cache: return data_cache[key]
+        data = tmo.ChemicalData(eos_chemicals)
+        if self.chemsep_db is None:
+            kijs = None
+        else:
+            try:
+                kijs = interaction_parameters.IPDB.get_ip_asymmetric_matrix(self.chemsep_db, data.CASs, 'kij')
+            except:
+                kijs = None
+        data_cache[key] = result = (data.Tcs, data.Pcs, data.omegas, kijs)
+        return result
+    
+    def _eos(self, phase, mol, T, P):
+        # Return equation of state object at given temperature and the 
+        # molar flow of chemicals with equations of state.
+        free_energy_args = self._free_energy_args
+        if phase in free_energy_args:
+            eos, eos_mol, eos_kwargs = free_energy_args[phase]
+            new = eos_at(eos, T, eos_kwargs['P'], eos_kwargs['zs'],
+                         eos_kwargs['only_g'], eos_kwargs['only_l'], self.eos_tol)
+            if new is not eos: free_energy_args[phase] = (new, eos_mol, eos_kwargs)
+            return new, eos_mol
+        else:
+            eos, eos_mol, eos_kwargs = self.eos_args(phase, mol, T, P)
+            return eos, eos_mol
+    
     def _load_free_energy_args(self, phase, mol, T, P):
         self._free_energy_args[phase] = self.eos_args(phase, mol, T, P)
     
@@ -571,28 +737,38 @@ class EOSMixture(Mixture):
         for phase, mol in phase_mol: 
             if mol.dct: fea[phase] = self.eos_args(phase, mol, T, P)
     
+    def departures(self, phase, mol, T, P):
+        """
+        Return enthalpy [J/mol], entropy [J/mol/K], and heat capacity 
+        [J/mol/K] departures from ideal gas behavior, all from one 
+        equation of state solution. Results are cached by phase, temperature, 
+        pressure, and molar flows.
+        
+        Examples
+        --------
+        >>> from thermosteam import PRMixture
+        >>> mixture = PRMixture.from_chemicals(['Water', 'Ethanol'])
+        >>> [round(i, 2) for i in mixture.departures('l', [0.5, 0.5], 350, 101325)]
+        [-38389.1, -110.51, 64.83]
+        
+        """
+        if mol.__class__ is not SparseVector: mol = SparseVector(mol)
+        key = (phase, T, P, *mol.dct.items())
+        departure_cache = self._departure_cache
+        if key in departure_cache: return departure_cache[key]
+        eos, eos_mol = self._eos(phase, mol, T, P)
+        departure_cache[key] = departures = (
+            eos_mol * departure(eos, 'H_dep', phase),
+            eos_mol * departure(eos, 'S_dep', phase),
+            eos_mol * departure(eos, 'Cp_dep', phase),
+        )
+        return departures
+    
     def Cn(self, phase, mol, T, P):
         if mol.__class__ is not SparseVector: mol = SparseVector(mol)
         if not mol.dct: return 0
         Cn = self.Cn_ideal(phase, mol, T, P)
-        if phase != 's':
-            if phase in self._free_energy_args:
-                eos, eos_mol, eos_kwargs = self._free_energy_args[phase]
-            else:
-                eos, eos_mol, eos_kwargs = self.eos_args(
-                    phase, mol, T, P
-                )
-            eos = eos.to_TP_zs(
-                T=T, **eos_kwargs
-            )
-            if phase == 'l':
-                try: Cn += eos.Cn_dep_l * eos_mol
-                except: 
-                    try: Cn += eos.Cn_dep_g * eos_mol
-                    except: pass
-            else:
-                try: Cn += eos.Cn_dep_g * eos_mol
-                except: pass
+        if phase != 's': Cn += self.departures(phase, mol, T, P)[2]
         return Cn
     
     def H(self, phase, mol, T, P):
@@ -600,24 +776,7 @@ class EOSMixture(Mixture):
         if mol.__class__ is not SparseVector: mol = SparseVector(mol)
         if not mol.dct: return 0
         H = self.H_ideal(phase, mol, T, P)
-        if phase != 's':
-            if phase in self._free_energy_args:
-                eos, eos_mol, eos_kwargs = self._free_energy_args[phase]
-            else:
-                eos, eos_mol, eos_kwargs = self.eos_args(
-                    phase, mol, T, P
-                )
-            eos = eos.to_TP_zs(
-                T=T, **eos_kwargs
-            )
-            if phase == 'l':
-                try: H += eos.H_dep_l * eos_mol
-                except: 
-                    try: H += eos.H_dep_g * eos_mol
-                    except: pass
-            else:
-                try: H += eos.H_dep_g * eos_mol
-                except: pass
+        if phase != 's': H += self.departures(phase, mol, T, P)[0]
         return H
     
     def S(self, phase, mol, T, P):
@@ -625,24 +784,7 @@ class EOSMixture(Mixture):
         if mol.__class__ is not SparseVector: mol = SparseVector(mol)
         if not mol.dct: return 0
         S = self.S_ideal(phase, mol, T, P)
-        if phase != 's':
-            if phase in self._free_energy_args:
-                eos, eos_mol, eos_kwargs = self._free_energy_args[phase]
-            else:
-                eos, eos_mol, eos_kwargs = self.eos_args(
-                    phase, mol, T, P
-                )
-            eos = eos.to_TP_zs(
-                T=T, **eos_kwargs
-            )
-            if phase == 'l':
-                try: S += eos.S_dep_l * eos_mol
-                except: 
-                    try: S += eos.S_dep_g * eos_mol
-                    except: pass
-            else:
-                try: S += eos.S_dep_g * eos_mol
-                except: pass
+        if phase != 's': S += self.departures(phase, mol, T, P)[1]
         return S
     
     @classmethod
@@ -700,7 +842,7 @@ class EOSMixture(Mixture):
     @classmethod
     def subclass(cls, EOS, name=None):
         if name is None: name = EOS.__name__.replace('MIX', '') + 'Mixture'
-        return type(name, (cls,), dict(EOS=EOS, cache={}))
+        return type(name, (cls,), dict(EOS=EOS, cache=EOSCache(), data_cache=LRUCache()))
 
     def _info(self):
         return (
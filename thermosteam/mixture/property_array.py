@@ -0,0 +1,963 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Vectorized evaluation of pure component properties. Common temperature
+dependent correlations (i.e., polynomial fits, DIPPR equations 100-105, and
+Antoine and Wagner vapor pressure equations) and pressure corrections (i.e.,
+COSTALD compressed liquid volume, Lucas liquid viscosity, and DIPPR 9G liquid
+thermal conductivity) are compiled into arrays of parameters and evaluated
+for all chemicals in one pass. All other models, as well as correlations
+evaluated outside their temperature limits, are evaluated chemical by chemical.
+Vapor pressures (including Ambrose-Walton and Lee-Kesler corresponding states
+methods) and their temperature derivatives are also compiled for phase
+equilibrium calculations.
+
+"""
+import numpy as np
+from numba import njit
+from math import inf, exp, log, log1p, sqrt
+from operator import attrgetter
+from functools import partial
+from thermo import TDependentProperty, TPDependentProperty
+from thermo.utils import NEGLECT_P
+from thermo.volume import COSTALD_COMPRESSED
+from thermo.viscosity import LUCAS
+from thermo.thermal_conductivity import DIPPR_9G
+from thermo.vapor_pressure import AMBROSE_WALTON, LEE_KESLER_PSAT
+from ..base import (
+    PhaseHandle, MockPhaseHandle, MockPhaseTHandle, MockPhaseTPHandle,
+    PhaseTHandle, PhaseTPHandle,
+)
+from ..constants import R
+from ..free_energy import (
+    HeatCapacityIntegral, free_energy_functors,
+    integrate_heat_capacity, integrate_heat_capacity_over_T,
+    quadrature_nodes, quadrature_weights, quadrature_ratio,
+)
+
+__all__ = (
+    'get_phase_handles',
+    'TDependentArray',
+    'TPDependentArray',
+    'VaporPressureArray',
+    'PhasePropertyArray',
+    'PropertyArrays',
+)
+
+# %% Correlations
+
+NOT_COMPILED = -1
+POLYNOMIAL = 0
+EXP_POLYNOMIAL = 1
+CONSTANT = 2
+DIPPR101 = 3
+DIPPR102 = 4
+DIPPR105 = 5
+DIPPR105_RECIPROCAL = 6
+ANTOINE = 7
+WAGNER = 8
+WAGNER_ORIGINAL = 9
+ENTHALPY = 10
+ENTROPY = 11
+
+@njit(cache=True)
+def safe_exp(x):
+    return exp(x) if x < 709.78 else inf
+
+@njit(cache=True)
+def evaluate_correlations(T, kinds, coeffs, params, Tmin, Tmax, ymin, ymax):
+    N = kinds.size
+    values = np.full(N, np.nan)
+    failed = np.ones(N, np.bool_)
+    if T <= 0.: return values, failed
+    logT = log(T)
+    for i in range(N):
+        kind = kinds[i]
+        if kind == NOT_COMPILED or not (Tmin[i] <= T <= Tmax[i]): continue
+        p = params[i]
+        if kind == POLYNOMIAL or kind == EXP_POLYNOMIAL:
+            x = p[0] + p[1] * T
+            y = 0.
+            for c in coeffs[i]: y = y * x + c
+            if kind == EXP_POLYNOMIAL: y = safe_exp(y)
+        elif kind == CONSTANT:
+            y = p[0]
+        elif kind == DIPPR101:
+            y = p[0] + p[1] / T + p[2] * logT
+            if p[3] != 0.: y += p[3] * safe_exp(p[4] * logT)
+            y = safe_exp(y)
+        elif kind == DIPPR102:
+            y = p[0] * safe_exp(p[1] * logT) / (1. + p[2] / T + p[3] / (T * T))
+        elif kind == DIPPR105 or kind == DIPPR105_RECIPROCAL:
+            A, B, C, D = p[0], p[1], p[2], p[3]
+            tau = 1. - T / C
+            if tau < 0.:
+                if D < 1.: tau = 0.
+                else: continue
+            if B <= 0.: continue
+            x = (1. + tau ** D) * log(B)
+            y = safe_exp(x) / A if kind == DIPPR105_RECIPROCAL else A * safe_exp(-x)
+        elif kind == ANTOINE:
+            T_C = T + p[2]
+            y = safe_exp((p[0] - p[1] / T_C) * log(p[3])) if T_C > 0. else 0.
+        elif kind == WAGNER or kind == WAGNER_ORIGINAL:
+            Tc, Pc, a, b, c, d = p[0], p[1], p[2], p[3], p[4], p[5]
+            Tr = T / Tc
+            if Tr > 1.: Tr = 1.
+            tau = 1. - Tr
+            tau_rt = sqrt(tau)
+            if kind == WAGNER:
+                tau15 = tau * tau_rt
+                y = Pc * safe_exp((a + b * tau_rt + tau15 * (c + d * tau * tau15)) * tau / Tr)
+            else:
+                tau2 = tau * tau
+                y = Pc * safe_exp(((d * tau2 * tau + c) * tau2 + a + b * tau_rt) * tau / Tr)
+        elif kind == ENTHALPY:
+            y = p[9] + integrate_heat_capacity(p[8], T, coeffs[i], p)
+        elif kind == ENTROPY:
+            y = p[9] + integrate_heat_capacity_over_T(
+                p[8], T, coeffs[i], p, quadrature_nodes, quadrature_weights, quadrature_ratio
+            )
+        else:
+            continue
+        values[i] = y
+        failed[i] = not (ymin[i] <= y <= ymax[i])
+    return values, failed
+
+@njit(cache=True)
+def evaluate_correlations_batch(T, kinds, coeffs, params, Tmin, Tmax, ymin, ymax):
+    M = T.size
+    N = kinds.size
+    values = np.empty((M, N))
+    failed = np.empty((M, N), np.bool_)
+    for k in range(M):
+        values[k], failed[k] = evaluate_correlations(
+            T[k], kinds, coeffs, params, Tmin, Tmax, ymin, ymax
+        )
+    return values, failed
+
+@njit(cache=True)
+def differentiate_correlations(T, kinds, coeffs, params, values, failed):
+    # Return temperature derivatives of correlations given their values; 
+    # correlations that cannot be differentiated are marked as failed
+    N = kinds.size
+    derivatives = np.full(N, np.nan)
+    for i in range(N):
+        if failed[i]: continue
+        kind = kinds[i]
+        p = params[i]
+        y = values[i]
+        if kind == POLYNOMIAL or kind == EXP_POLYNOMIAL:
+            x = p[0] + p[1] * T
+            f = 0.
+            df = 0.
+            for c in coeffs[i]: 
+                df = df * x + f
+                f = f * x + c
+            dy = p[1] * df
+            if kind == EXP_POLYNOMIAL: dy *= y
+        elif kind == CONSTANT:
+            dy = 0.
+        elif kind == DIPPR101:
+            dlny = -p[1] / (T * T) + p[2] / T
+            if p[3] != 0.: dlny += p[3] * p[4] * safe_exp((p[4] - 1.) * log(T))
+            dy = y * dlny
+        elif kind == DIPPR102:
+            dy = y * (p[1] / T + (p[2] / (T * T) + 2. * p[3] / (T * T * T)) 
+                      / (1. + p[2] / T + p[3] / (T * T)))
+        elif kind == DIPPR105 or kind == DIPPR105_RECIPROCAL:
+            A, B, C, D = p[0], p[1], p[2], p[3]
+            tau = 1. - T / C
+            dlny = D * tau ** (D - 1.) * log(B) / C if tau > 0. else 0.
+            dy = -y * dlny if kind == DIPPR105_RECIPROCAL else y * dlny
+        elif kind == ANTOINE:
+            T_C = T + p[2]
+            dy = y * log(p[3]) * p[1] / (T_C * T_C) if T_C > 0. else 0.
+        elif kind == WAGNER or kind == WAGNER_ORIGINAL:
+            Tc, a, b, c, d = p[0], p[2], p[3], p[4], p[5]
+            if T > Tc:
+                dy = 0.
+            else:
+                Tr = T / Tc
+                tau = 1. - Tr
+                tau_rt = sqrt(tau)
+                if kind == WAGNER:
+                    tau15 = tau * tau_rt
+                    tau4 = tau * tau * tau * tau
+                    f = tau * (a + b * tau_rt + tau15 * (c + d * tau * tau15))
+                    df = a + 1.5 * b * tau_rt + 2.5 * c * tau15 + 5. * d * tau4
+                else:
+                    tau2 = tau * tau
+                    f = tau * ((d * tau2 * tau + c) * tau2 + a + b * tau_rt)
+                    df = a + 1.5 * b * tau_rt + tau2 * (3. * c + 6. * d * tau2 * tau)
+                dy = -y * (df * Tr + f) / (Tc * Tr * Tr)
+        else:
+            failed[i] = True
+            continue
+        derivatives[i] = dy
+    return derivatives
+
+@njit(cache=True)
+def evaluate_correlations_and_derivatives(T, kinds, coeffs, params, Tmin, Tmax, ymin, ymax):
+    values, failed = evaluate_correlations(T, kinds, coeffs, params, Tmin, Tmax, ymin, ymax)
+    derivatives = differentiate_correlations(T, kinds, coeffs, params, values, failed)
+    return values, derivatives, failed
+
+@njit(cache=True)
+def evaluate_correlations_and_derivatives_batch(T, kinds, coeffs, params, Tmin, Tmax, ymin, ymax):
+    M = T.size
+    N = kinds.size
+    values = np.empty((M, N))
+    derivatives = np.empty((M, N))
+    failed = np.empty((M, N), np.bool_)
+    for k in range(M):
+        values[k], derivatives[k], failed[k] = evaluate_correlations_and_derivatives(
+            T[k], kinds, coeffs, params, Tmin, Tmax, ymin, ymax
+        )
+    return values, derivatives, failed
+
+def stable_polynomial_args(kwargs, extra):
+    return kwargs['coeffs'], (extra['offset'], extra['scale'])
+
+def polynomial_args(kwargs, extra):
+    return kwargs['coeffs'], (0., 1.)
+
+def DIPPR100_args(kwargs, extra):
+    return [kwargs.get(i, 0.) for i in 'GFEDCBA'], (0., 1.)
+
+def parameter_getter(names, defaults):
+    def get_args(kwargs, extra):
+        return (), [kwargs.get(i, j) for i, j in zip(names, defaults)]
+    return get_args
+
+#: dict[str, tuple[int, function]] Kind of correlation and argument getter by name of correlation model.
+correlations = {
+    'stable_polynomial': (POLYNOMIAL, stable_polynomial_args),
+    'exp_stable_polynomial': (EXP_POLYNOMIAL, stable_polynomial_args),
+    'polynomial': (POLYNOMIAL, polynomial_args),
+    'exp_polynomial': (EXP_POLYNOMIAL, polynomial_args),
+    'DIPPR100': (POLYNOMIAL, DIPPR100_args),
+    'DIPPR101': (DIPPR101, parameter_getter('ABCDE', (None, None, 0., 0., 0.))),
+    'DIPPR102': (DIPPR102, parameter_getter('ABCD', (None, None, 0., 0.))),
+    'DIPPR105': (DIPPR105, parameter_getter('ABCD', (None,) * 4)),
+    'DIPPR105_reciprocal': (DIPPR105_RECIPROCAL, parameter_getter('ABCD', (None,) * 4)),
+    'constant': (CONSTANT, parameter_getter(['value'], [None])),
+    'Antoine': (ANTOINE, parameter_getter(['A', 'B', 'C', 'base'], (None, None, None, 10.))),
+    'Wagner': (WAGNER, parameter_getter(['Tc', 'Pc', 'a', 'b', 'c', 'd'], (None,) * 6)),
+    'Wagner_original': (WAGNER_ORIGINAL, parameter_getter(['Tc', 'Pc', 'a', 'b', 'c', 'd'], (None,) * 6)),
+}
+
+#: Temperature at which constants of free energy functors are evaluated [K].
+T_anchor = 298.15
+
+def compile_free_energy(functor):
+    # Free energies are a constant plus the integral of heat capacity (over 
+    # temperature for entropy) from any given temperature. Return kind, 
+    # coefficients, and parameters of the integral; or None if it cannot
+    # be compiled.
+    for integral in functor.__dict__.values():
+        if isinstance(integral, HeatCapacityIntegral): break
+    else:
+        return
+    if not integral.compiled: return
+    P_ref = functor.__dict__.get('P_ref', 101325.)
+    try: constant = float(functor(T_anchor, P_ref))
+    except: return # Evaluated per chemical instead (e.g., missing data)
+    if functor.var[0] == 'H':
+        return ENTHALPY, tuple(integral.int_coeffs), [*integral.params, T_anchor, constant], integral.model
+    else:
+        return ENTROPY, tuple(integral.coeffs), [*integral.params, T_anchor, constant], integral.model
+
+def compile_T_dependent(model):
+    # Return kind, coefficients, parameters, temperature limits, property
+    # limits, and the thermo model whose method is compiled (if any) of a 
+    # temperature dependent model, or None if it cannot be compiled.
+    if model is None: return
+    if not callable(model):
+        return CONSTANT, (), [model], (-inf, inf), (-inf, inf), None
+    if type(model) in free_energy_functors:
+        result = compile_free_energy(model)
+        if result is None: return
+        kind, coeffs, params, source = result
+        return kind, coeffs, params, (0., inf), (-inf, inf), source
+    if not isinstance(model, TDependentProperty): return
+    method = model._method
+    if method not in model.correlations or method not in model.T_limits: return
+    call, kwargs, name, extra = model.correlations[method]
+    if name not in correlations: return
+    kind, get_args = correlations[name]
+    coeffs, params = get_args(kwargs, extra)
+    if any([i is None for i in params]): return
+    return kind, coeffs, params, model.T_limits[method], (model.property_min, model.property_max), model
+
+def Ambrose_Walton_args(Tc, Pc, omega):
+    # Equivalent to the Wagner equation with coefficients that depend on omega
+    if omega < 0.: omega = 0.
+    return WAGNER, [
+        Tc, Pc, 
+        -5.97616 + omega * (-5.03365 - 0.64771 * omega),
+        1.29874 + omega * (1.11505 + 2.41539 * omega),
+        -0.60394 + omega * (-5.41217 - 4.26979 * omega),
+        -1.06841 + omega * (-7.46628 + 3.25259 * omega),
+    ]
+
+def Lee_Kesler_args(Tc, Pc, omega):
+    # Equivalent to the DIPPR 101 equation with coefficients that depend on omega
+    C = -1.28862 - 13.4721 * omega
+    return DIPPR101, [
+        log(Pc) + 5.92714 + 15.2518 * omega - C * log(Tc),
+        -(6.09648 + 15.6875 * omega) * Tc,
+        C,
+        (0.169347 + 0.43577 * omega) / Tc ** 6,
+        6.,
+    ]
+
+#: dict[str, function] Kind of correlation and parameters by name of 
+#: corresponding states vapor pressure method.
+vapor_pressure_methods = {
+    AMBROSE_WALTON: Ambrose_Walton_args,
+    LEE_KESLER_PSAT: Lee_Kesler_args,
+}
+
+def compile_vapor_pressure(model):
+    # Same as `compile_T_dependent` but also compiles corresponding states 
+    # vapor pressure methods.
+    result = compile_T_dependent(model)
+    if result is not None or not isinstance(model, TDependentProperty): return result
+    method = model._method
+    if method not in vapor_pressure_methods or method not in model.T_limits: return
+    constants = [getattr(model, i, None) for i in ('Tc', 'Pc', 'omega')]
+    if any([i is None for i in constants]): return
+    kind, params = vapor_pressure_methods[method](*constants)
+    return kind, (), params, model.T_limits[method], (model.property_min, model.property_max), model
+
+
+# %% Pressure corrections
+
+COSTALD = 0
+LUCAS_ = 1
+DIPPR9G = 2
+IDEAL_GAS = 3
+
+@njit(cache=True)
+def correct_pressure(T, P, kinds, Psat, Tc, Pc, omega, ymin, ymax, values, failed):
+    for i in range(kinds.size):
+        kind = kinds[i]
+        if kind == NOT_COMPILED or failed[i]: continue
+        y = values[i]
+        if kind == COSTALD:
+            w = omega[i]
+            e = exp(4.79594 + w * (0.250047 + 1.14188 * w))
+            C = 0.0861488 + 0.0344483 * w
+            tau = 1. - T / Tc[i]
+            if tau < 0.: tau = 0.
+            tau13 = tau ** (1. / 3.)
+            B = Pc[i] * (-1. + tau13 * (-9.070217 + tau13 * (62.45326 + tau13 * (-135.1102 + e * tau13))))
+            if P > Psat[i]:
+                x = (P - Psat[i]) / (B + Psat[i])
+                if x <= -1.:
+                    failed[i] = True
+                    continue
+                y *= 1. - C * log1p(x)
+        elif kind == LUCAS_:
+            Tr = T / Tc[i]
+            if Tr > 1.: Tr = 1.
+            C = Tr*(Tr*(Tr*(Tr*(Tr*(Tr*(15.6719*Tr - 59.8127) + 96.1209) - 84.8291) + 44.1706) - 13.404) + 2.1616) - 0.07921
+            D = 0.3257 * (1.0039 - Tr ** 2.573) ** -0.2906 - 0.2086
+            A = 0.9991 - 4.674E-4 / (1.0523 * Tr ** -0.03877 - 1.0513)
+            dPr = (P - Psat[i]) / Pc[i]
+            if dPr < 0.: dPr = 0.
+            y *= (1. + D * (dPr * (1. / 2.118)) ** A) / (1. + C * omega[i] * dPr)
+        elif kind == DIPPR9G:
+            if T < 0. or P < 0.:
+                failed[i] = True
+                continue
+            Tr = T / Tc[i]
+            Pr = P / Pc[i]
+            Tr_2_10 = Tr ** 0.2
+            Tr_12_10 = Tr_2_10 * Tr_2_10 * Tr_2_10
+            Tr_12_10 *= Tr_12_10
+            y *= 0.98 + Tr_12_10 * (0.0079 * Pr * Tr_2_10 + 0.63 * (Pr / (30. + Pr)))
+        elif kind == IDEAL_GAS: # Reference pressure is stored as Pc
+            if P <= 0.:
+                failed[i] = True
+                continue
+            y -= R * log(P / Pc[i])
+        values[i] = y
+        failed[i] = not (ymin[i] <= y <= ymax[i])
+
+@njit(cache=True)
+def correct_pressure_batch(T, P, kinds, Psat, Tc, Pc, omega, ymin, ymax, values, failed):
+    for k in range(T.size):
+        correct_pressure(
+            T[k], P[k], kinds, Psat[k], Tc, Pc, omega, ymin, ymax, values[k], failed[k]
+        )
+
+#: dict[str, tuple[int, bool]] Kind of pressure correction and whether saturation pressure is required by pressure dependent method.
+pressure_corrections = {
+    COSTALD_COMPRESSED: (COSTALD, True),
+    LUCAS: (LUCAS_, True),
+    DIPPR_9G: (DIPPR9G, False),
+}
+
+def compile_TP_dependent(model):
+    # Return kind of pressure correction, whether saturation pressure is
+    # required, and critical constants of a temperature and pressure dependent
+    # model, None if pressure is neglected, or False if it cannot be compiled.
+    method_P = model._method_P
+    if not method_P or method_P == NEGLECT_P: return None
+    if method_P not in pressure_corrections: return False
+    kind, Psat = pressure_corrections[method_P]
+    constants = (model.Tc, model.Pc, model.omega)
+    if any([i is None for i in constants]) or Psat and model.Psat is None: return False
+    return kind, Psat, constants
+
+
+# %% Property arrays
+
+def get_phase_handles(chemicals, var):
+    """Return phase handles of chemical property models."""
+    getfield = getattr
+    isa = isinstance
+    handles = []
+    for chemical in chemicals:
+        obj = getfield(chemical, var)
+        if isa(obj, PhaseHandle):
+            phase_handle = obj
+        elif var == 'Cn':
+            phase_handle = MockPhaseTHandle(var, obj)
+        else:
+            phase_handle = MockPhaseTPHandle(var, obj)
+        handles.append(phase_handle)
+    return handles
+
+def fallback_indices(failed, index):
+    if index is None: return np.flatnonzero(failed).tolist()
+    return [i for i in index if failed[i]]
+
+def fallback_entries(failed, mask):
+    if mask is not None: failed &= mask
+    return zip(*[i.tolist() for i in np.nonzero(failed)])
+
+def missing(T):
+    return np.nan
+
+get_method = attrgetter('_method')
+get_methods = attrgetter('_method', '_method_P', 'hook')
+
+class TDependentArray:
+    """
+    Create a TDependentArray object that evaluates temperature dependent
+    models of many chemicals at once. Models with compiled correlations
+    are evaluated in one pass while all other models (or correlations
+    evaluated outside their temperature limits) are called one by one.
+
+    Parameters
+    ----------
+    models : Iterable[function(T)]
+        Temperature dependent property models (e.g., thermo
+        TDependentProperty objects) or constant values. Values of
+        missing models (i.e., None) are NaN.
+
+    Examples
+    --------
+    >>> from thermosteam.mixture import TDependentArray
+    >>> from thermosteam import Chemicals
+    >>> chemicals = Chemicals(['Water', 'Ethanol'])
+    >>> Psat = TDependentArray([i.Psat for i in chemicals])
+    >>> Psat
+    <TDependentArray(T) [1/2 compiled]>
+    >>> Psat(350).round(-1)
+    array([41680., 95200.])
+
+    """
+    __slots__ = ('models', 'functions', 'kinds', 'coeffs', 'params',
+                 'Tmin', 'Tmax', 'ymin', 'ymax', 'compiled_models', 'methods')
+
+    #: [function] Return kind, coefficients, parameters, temperature limits,
+    #: property limits, and source of compiled model (or None if it cannot be compiled).
+    compile_model = staticmethod(compile_T_dependent)
+
+    def __init__(self, models):
+        self.models = models = tuple(models)
+        self.functions = [
+            missing if i is None else 
+            (i.T_dependent_property if isinstance(i, TDependentProperty) else i)
+            if callable(i) else partial(float, i) for i in models
+        ]
+        self.compile()
+
+    def compile(self):
+        """Compile models."""
+        models = self.models
+        compile_model = self.compile_model
+        N = len(models)
+        kinds = np.full(N, NOT_COMPILED)
+        all_coeffs = [()] * N
+        params = np.zeros([N, 10])
+        limits = np.zeros([N, 4])
+        compiled_models = []
+        for i, model in enumerate(models):
+            result = compile_model(model)
+            if result is None:
+                # Methods may be selected later that can be compiled (e.g., tabulated methods)
+                if isinstance(model, TDependentProperty): compiled_models.append(model)
+                continue
+            kinds[i], all_coeffs[i], args, T_limits, y_limits, source = result
+            params[i, :len(args)] = args
+            limits[i] = (*T_limits, *y_limits)
+            if source is not None: compiled_models.append(source)
+        coeffs = np.zeros([N, max([len(i) for i in all_coeffs], default=0)])
+        for i, j in zip(coeffs, all_coeffs):
+            if j: i[-len(j):] = j # Leading zeros do not change polynomials
+        self.kinds = kinds
+        self.coeffs = coeffs
+        self.params = params
+        self.Tmin, self.Tmax, self.ymin, self.ymax = limits.T.copy()
+        self.compiled_models = compiled_models
+        self.methods = list(map(get_method, compiled_models))
+
+    @property
+    def size(self):
+        return len(self.models)
+
+    @property
+    def compiled(self):
+        """[list[bool]] Whether each model is compiled."""
+        return (self.kinds != NOT_COMPILED).tolist()
+
+    def refresh(self):
+        """Compile models again if their methods were changed."""
+        if self.methods != list(map(get_method, self.compiled_models)):
+            self.compile()
+
+    def evaluate(self, T):
+        """
+        Return an array of property values at given temperature and a boolean
+        array of whether each value could not be computed by compiled
+        correlations. Missing values are NaN.
+
+        """
+        return evaluate_correlations(
+            T, self.kinds, self.coeffs, self.params,
+            self.Tmin, self.Tmax, self.ymin, self.ymax,
+        )
+
+    def __call__(self, T, index=None):
+        """
+        Return an array of property values at given temperature.
+        If `index` is given, only values at these indices are guaranteed
+        (other values may be NaN).
+
+        """
+        self.refresh()
+        values, failed = self.evaluate(T)
+        functions = self.functions
+        for i in fallback_indices(failed, index): values[i] = functions[i](T)
+        return values
+
+    def batch(self, T, mask=None):
+        """
+        Return a 2-d array of property values with a row for each 
+        temperature in `T`. If a boolean `mask` of the same shape is given,
+        only values where `mask` is True are guaranteed (other values
+        may be NaN).
+
+        """
+        self.refresh()
+        T = np.asarray(T, float)
+        values, failed = evaluate_correlations_batch(
+            T, self.kinds, self.coeffs, self.params,
+            self.Tmin, self.Tmax, self.ymin, self.ymax,
+        )
+        functions = self.functions
+        for k, i in fallback_entries(failed, mask): values[k, i] = functions[i](T[k])
+        return values
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(T) [{sum(self.compiled)}/{len(self.models)} compiled]>"
+
+
+class TPDependentArray:
+    """
+    Create a TPDependentArray object that evaluates temperature and
+    pressure dependent models of many chemicals at once. Temperature
+    dependent correlations and pressure corrections (COSTALD compressed
+    liquid volume, Lucas liquid viscosity, and DIPPR 9G liquid thermal
+    conductivity) are compiled while all other models are called one by one.
+
+    Parameters
+    ----------
+    models : Iterable[function(T, P)]
+        Property models (e.g., thermo TDependentProperty and
+        TPDependentProperty objects).
+    fallbacks : Iterable[function(T, P)], optional
+        Functions to call for values that cannot be computed by compiled
+        correlations. Defaults to `models`.
+
+    Examples
+    --------
+    >>> from thermosteam.mixture import TPDependentArray
+    >>> from thermosteam import Chemicals
+    >>> chemicals = Chemicals(['Water', 'Ethanol'])
+    >>> V = TPDependentArray([i.V.l for i in chemicals])
+    >>> V(350, 101325)
+    array([1.850e-05, 6.243e-05])
+
+    """
+    __slots__ = ('models', 'fallbacks', 'T_dependent', 'kinds', 'Psat',
+                 'Tc', 'Pc', 'omega', 'ymin', 'ymax', 'compiled_models', 'methods')
+
+    def __init__(self, models, fallbacks=None):
+        self.models = models = tuple(models)
+        self.fallbacks = models if fallbacks is None else tuple(fallbacks)
+        N = len(models)
+        T_dependent = []
+        kinds = np.full(N, NOT_COMPILED)
+        Psats = [None] * N
+        constants = np.zeros([N, 3])
+        limits = np.zeros([N, 2])
+        compiled_models = []
+        for i, model in enumerate(models):
+            if isinstance(model, TPDependentProperty):
+                compiled_models.append(model)
+                if model.hook or type(model).__call__ is not TPDependentProperty.__call__:
+                    model = None
+                else:
+                    result = compile_TP_dependent(model)
+                    if result is False:
+                        model = None
+                    elif result is not None:
+                        kinds[i], Psat, constants[i] = result
+                        if Psat: Psats[i] = model.Psat
+                        limits[i] = (model.property_min, model.property_max)
+            elif type(model) in free_energy_functors:
+                P_ref = model.__dict__.get('P_ref')
+                if P_ref is not None:
+                    kinds[i] = IDEAL_GAS
+                    constants[i] = (0., P_ref, 0.)
+                limits[i] = (-inf, inf)
+            elif not (isinstance(model, TDependentProperty)
+                      and type(model).__call__ is TDependentProperty.__call__):
+                model = None
+            T_dependent.append(model)
+        self.T_dependent = TDependentArray(T_dependent)
+        self.kinds = kinds
+        self.Psat = TDependentArray(Psats) if any([i is not None for i in Psats]) else None
+        self.Tc, self.Pc, self.omega = constants.T.copy()
+        self.ymin, self.ymax = limits.T.copy()
+        self.compiled_models = compiled_models
+        self.methods = list(map(get_methods, compiled_models))
+
+    @property
+    def size(self):
+        return len(self.models)
+
+    @property
+    def compiled(self):
+        """[list[bool]] Whether each model is compiled."""
+        return self.T_dependent.compiled
+
+    def refresh(self):
+        """Compile models again if their methods were changed."""
+        T_dependent = self.T_dependent
+        if (self.methods != list(map(get_methods, self.compiled_models))
+            or T_dependent.methods != list(map(get_method, T_dependent.compiled_models))):
+            self.__init__(self.models, self.fallbacks)
+
+    def __call__(self, T, P, index=None):
+        """
+        Return an array of property values at given temperature and pressure.
+        If `index` is given, only values at these indices are guaranteed
+        (other values may be NaN).
+
+        """
+        self.refresh()
+        values, failed = self.T_dependent.evaluate(T)
+        Psat = self.Psat
+        if P is not None:
+            correct_pressure(
+                T, P, self.kinds, np.zeros(self.kinds.size) if Psat is None else Psat(T, index),
+                self.Tc, self.Pc, self.omega, self.ymin, self.ymax, values, failed
+            )
+        fallbacks = self.fallbacks
+        for i in fallback_indices(failed, index): values[i] = fallbacks[i](T, P)
+        return values
+
+    def batch(self, T, P, mask=None):
+        """
+        Return a 2-d array of property values with a row for each
+        temperature in `T` and pressure in `P`. If a boolean `mask` of the
+        same shape is given, only values where `mask` is True are guaranteed
+        (other values may be NaN).
+
+        """
+        self.refresh()
+        T_dependent = self.T_dependent
+        T = np.asarray(T, float)
+        values, failed = evaluate_correlations_batch(
+            T, T_dependent.kinds, T_dependent.coeffs, T_dependent.params,
+            T_dependent.Tmin, T_dependent.Tmax, T_dependent.ymin, T_dependent.ymax,
+        )
+        if P is not None:
+            P = np.asarray(P, float)
+            Psat = self.Psat
+            correct_pressure_batch(
+                T, P, self.kinds, np.zeros(values.shape) if Psat is None else Psat.batch(T, mask),
+                self.Tc, self.Pc, self.omega, self.ymin, self.ymax, values, failed
+            )
+        fallbacks = self.fallbacks
+        if P is None:
+            for k, i in fallback_entries(failed, mask): values[k, i] = fallbacks[i](T[k], None)
+        else:
+            for k, i in fallback_entries(failed, mask): values[k, i] = fallbacks[i](T[k], P[k])
+        return values
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(T, P) [{sum(self.compiled)}/{len(self.models)} compiled]>"
+
+
+def zero(T):
+    return 0.
+
+def central_difference(f, dT=1e-4):
+    return lambda T: (f(T + dT) - f(T - dT)) / (2. * dT)
+
+class VaporPressureArray(TDependentArray):
+    """
+    Create a VaporPressureArray object that evaluates vapor pressures of 
+    many chemicals (and optionally their temperature derivatives) at once.
+    Besides correlations, corresponding states methods (i.e., Ambrose-Walton
+    and Lee-Kesler) are compiled.
+
+    Parameters
+    ----------
+    chemicals : Iterable[Chemical]
+        Chemicals with vapor pressure models.
+
+    Examples
+    --------
+    >>> from thermosteam.mixture import VaporPressureArray
+    >>> from thermosteam import Chemicals
+    >>> chemicals = Chemicals(['Water', 'Ethanol', 'Glucose'])
+    >>> Psat = VaporPressureArray(chemicals)
+    >>> Psat
+    <VaporPressureArray(T) [2/3 compiled]>
+    >>> Psat(350).round(-1)
+    array([41680., 95200.,     0.])
+    >>> Psats, dPsats_dT = Psat(350, derivative=True)
+    >>> dPsats_dT.round(-1)
+    array([1720., 3800.,    0.])
+    >>> Psat([300, 350]).round(-1) # A row for each temperature
+    array([[ 3540.,  8770.,     0.],
+           [41680., 95200.,     0.]])
+
+    """
+    __slots__ = ('chemicals', 'derivatives')
+    
+    compile_model = staticmethod(compile_vapor_pressure)
+
+    def __init__(self, chemicals):
+        self.chemicals = chemicals = tuple(chemicals)
+        models = [i.Psat for i in chemicals]
+        self.derivatives = [
+            missing if i is None else 
+            (i.T_dependent_property_derivative if isinstance(i, TDependentProperty) 
+             else central_difference(i))
+            if callable(i) else zero for i in models
+        ]
+        super().__init__(models)
+
+    def __call__(self, T, index=None, derivative=False):
+        """
+        Return an array of vapor pressures at given temperature (and an 
+        array of their temperature derivatives if `derivative` is True). 
+        If `T` is an array, return 2-d arrays with a row for each 
+        temperature. If `index` is given, only values at these indices 
+        are guaranteed (other values may be NaN).
+
+        """
+        if np.ndim(T):
+            if index is None:
+                mask = None
+            else:
+                mask = np.zeros([len(T), self.size], bool)
+                mask[:, index] = True
+            return self.batch(T, mask, derivative)
+        elif not derivative:
+            return TDependentArray.__call__(self, T, index)
+        self.refresh()
+        values, derivatives, failed = evaluate_correlations_and_derivatives(
+            T, self.kinds, self.coeffs, self.params,
+            self.Tmin, self.Tmax, self.ymin, self.ymax,
+        )
+        functions = self.functions
+        fallbacks = self.derivatives
+        for i in fallback_indices(failed, index): 
+            values[i] = functions[i](T)
+            derivatives[i] = fallbacks[i](T)
+        return values, derivatives
+
+    def batch(self, T, mask=None, derivative=False):
+        """
+        Return a 2-d array of vapor pressures (and of their temperature 
+        derivatives if `derivative` is True) with a row for each temperature
+        in `T`. If a boolean `mask` of the same shape is given, only values 
+        where `mask` is True are guaranteed (other values may be NaN).
+
+        """
+        if not derivative: return TDependentArray.batch(self, T, mask)
+        self.refresh()
+        T = np.asarray(T, float)
+        values, derivatives, failed = evaluate_correlations_and_derivatives_batch(
+            T, self.kinds, self.coeffs, self.params,
+            self.Tmin, self.Tmax, self.ymin, self.ymax,
+        )
+        functions = self.functions
+        fallbacks = self.derivatives
+        for k, i in fallback_entries(failed, mask): 
+            values[k, i] = functions[i](T[k])
+            derivatives[k, i] = fallbacks[i](T[k])
+        return values, derivatives
+
+
+class PhasePropertyArray:
+    """
+    Create a PhasePropertyArray object that evaluates phase dependent
+    property models (i.e., phase handles) of many chemicals at once.
+    Models are compiled by phase on first use.
+
+    Parameters
+    ----------
+    handles : Iterable[function(phase, T, P)]
+        Phase dependent property models (e.g., PhaseTPHandle objects).
+    var : str
+        Description of thermodynamic variable returned.
+
+    Examples
+    --------
+    >>> from thermosteam.mixture import PhasePropertyArray
+    >>> from thermosteam import Chemicals
+    >>> chemicals = Chemicals(['Water', 'Ethanol'])
+    >>> Cn = PhasePropertyArray([i.Cn for i in chemicals], 'Cn')
+    >>> Cn('l', 350).round(1)
+    array([ 75.6, 134.3])
+
+    """
+    __slots__ = ('handles', 'var', 'arrays', 'versions')
+
+    def __init__(self, handles, var):
+        self.handles = tuple(handles)
+        self.var = var
+        self.arrays = {}
+        self.versions = {}
+
+    def get(self, phase):
+        """Return the TPDependentArray object of the models at given phase
+        (or None if no models can be compiled). Phases without compiled
+        models are compiled again after any model method is selected."""
+        arrays = self.arrays
+        if phase in arrays:
+            array = arrays[phase]
+            if array is not None or self.versions[phase] == TDependentProperty.method_version:
+                return array
+        return self.compile(phase)
+
+    def compile(self, phase):
+        """Return a TPDependentArray object of the models at given phase
+        (or None if no models can be compiled)."""
+        self.versions[phase] = TDependentProperty.method_version
+        models = []
+        for handle in self.handles:
+            if isinstance(handle, MockPhaseHandle):
+                model = handle.model
+            elif isinstance(handle, PhaseHandle):
+                model = getattr(handle, phase)
+            else:
+                model = None
+            models.append(model)
+        array = TPDependentArray(models, [partial(i, phase) for i in self.handles])
+        if not any(array.compiled): array = None
+        self.arrays[phase] = array
+        return array
+
+    def __call__(self, phase, T, P=None, index=None):
+        """
+        Return an array of property values at given phase, temperature,
+        and pressure, or None if no models are compiled at the given phase.
+        If `index` is given, only values at these indices are guaranteed
+        (other values may be NaN).
+
+        """
+        if PhaseTHandle.force_gas_critical_phase or PhaseTPHandle.force_gas_critical_phase: return
+        array = self.get(phase)
+        if array is None: return
+        return array(T, P, index)
+
+    def batch(self, phase, T, P=None, mask=None):
+        """
+        Return a 2-d array of property values at given phase with a row for
+        each temperature in `T` and pressure in `P`, or None if no models are
+        compiled at the given phase. If a boolean `mask` is given, only values
+        where `mask` is True are guaranteed (other values may be NaN).
+
+        """
+        if PhaseTHandle.force_gas_critical_phase or PhaseTPHandle.force_gas_critical_phase: return
+        array = self.get(phase)
+        if array is None: return
+        return array.batch(T, P, mask)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(phase, T, P=None) -> {self.var}>"
+
+
+class PropertyArrays:
+    """
+    Create a PropertyArrays object that evaluates pure component
+    properties of many chemicals at once.
+
+    Parameters
+    ----------
+    chemicals : Iterable[Chemical]
+        Chemicals to evaluate.
+
+    Examples
+    --------
+    >>> from thermosteam.mixture import PropertyArrays
+    >>> from thermosteam import Chemicals
+    >>> arrays = PropertyArrays(Chemicals(['Water', 'Ethanol']))
+    >>> arrays
+    PropertyArrays(Cn, H, S, mu, V, kappa)
+    >>> arrays('l', 350, 101325)['Cn'].round(1)
+    array([ 75.6, 134.3])
+
+    """
+    __slots__ = ('Cn', 'H', 'S', 'mu', 'V', 'kappa')
+
+    def __init__(self, chemicals):
+        chemicals = tuple(chemicals)
+        for var in self.__slots__:
+            setattr(self, var, PhasePropertyArray(get_phase_handles(chemicals, var), var))
+
+    def __call__(self, phase, T, P):
+        """
+        Return a dictionary of property arrays at given phase, temperature,
+        and pressure. Properties without compiled models at the given phase
+        are evaluated chemical by chemical.
+
+        """
+        arrays = {}
+        for var in self.__slots__:
+            array = getattr(self, var)
+            values = array(phase, T, P)
+            if values is None: values = np.array([i(phase, T, P) for i in array.handles])
+            arrays[var] = values
+        return arrays
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(self.__slots__)})"
@@ -18,6 +18,7 @@
 from . import (
     t_dependent_property,
     tp_dependent_property,
+    tabulation,
 )
 import thermo
 from thermo import *
@@ -68,6 +68,10 @@ def _set_method(self, method, stacklevel):
             warn("Method '%s' does not exist, but was assummed to indicate '%s'" %(old_method, method),
                  category=RuntimeWarning, stacklevel=stacklevel)
     self._method = method
+    TDependentProperty.method_version += 1
+
+#: Incremented whenever a method is selected (e.g., to refresh compiled models).
+TDependentProperty.method_version = 0
 
 @TDependentProperty.method.setter
 def method(self, method):
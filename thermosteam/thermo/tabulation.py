@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2023, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module extends the t_dependent_property module from the thermo library:
+# https://github.com/CalebBell/thermo
+# Copyright (C) 2020 Caleb Bell <Caleb.Andrew.Bell@gmail.com>
+#
+# This module is under a dual license:
+# 1. The UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+#
+# 2. The MIT open-source license. See
+# https://github.com/CalebBell/chemicals/blob/master/LICENSE.txt for details.
+"""
+"""
+import numpy as np
+from numpy.polynomial import Chebyshev
+from numpy.polynomial.chebyshev import cheb2poly
+from thermo import TDependentProperty
+
+__all__ = ('Tabulation', 'TABULATED')
+
+#: Name of tabulated methods.
+TABULATED = 'TABULATED'
+
+#: Degrees of Chebyshev interpolants tried (in order) when tabulating. Higher
+#: degrees lose precision when converted to monomial coefficients.
+degrees = (8, 12, 16, 20, 24)
+
+#: Minimum ratio of largest to smallest property value to fit the logarithm
+#: of the property (e.g., vapor pressure and viscosity).
+log_ratio = 10.
+
+#: Smallest property magnitude (relative to the largest) used to estimate
+#: relative errors of properties that vanish (e.g., surface tension at the
+#: critical point).
+error_floor = 1e-3
+
+def relative_error(values, exact, log):
+    scale = np.abs(exact)
+    if not log: scale = np.maximum(scale, error_floor * scale.max())
+    return float((np.abs(values - exact) / scale).max())
+
+def evaluate(coeffs, T, Tmin, Tmax, log):
+    values = np.polyval(coeffs, (2. * T - (Tmin + Tmax)) / (Tmax - Tmin))
+    return np.exp(values) if log else values
+
+class Tabulation:
+    """
+    Create a Tabulation object, a Chebyshev interpolant of a method of a
+    temperature dependent model over its valid temperature range. Once
+    applied, the model evaluates the interpolant (as a thermo
+    'stable_polynomial' correlation named 'TABULATED') instead of the
+    original method.
+
+    Parameters
+    ----------
+    method : str
+        Original method.
+    Tmin : float
+        Minimum temperature [K].
+    Tmax : float
+        Maximum temperature [K].
+    coeffs : Iterable[float]
+        Polynomial coefficients in decreasing order of the property (or its
+        natural logarithm if `log` is True) at temperatures scaled to [-1, 1].
+    log : bool
+        Whether the logarithm of the property is fit.
+    error : float
+        Maximum relative error at check points (relative to the largest
+        magnitude times `error_floor` where the property vanishes).
+
+    Examples
+    --------
+    >>> import thermosteam as tmo
+    >>> Psat = tmo.Chemical('Water').Psat.copy()
+    >>> Psat.method
+    'IAPWS_PSAT'
+    >>> tabulation = Psat.tabulate(rtol=1e-5)
+    >>> tabulation
+    Tabulation(method='IAPWS_PSAT', T=(235, 647.1), degree=20, log=True, error=8.2e-06)
+    >>> Psat.method
+    'TABULATED'
+    >>> round(Psat(373.15) / Psat.calculate(373.15, 'IAPWS_PSAT'), 5)
+    1.0
+    >>> tabulation.check(Psat) < 1e-5
+    True
+    >>> Psat.untabulate()
+    >>> Psat.method
+    'IAPWS_PSAT'
+
+    """
+    __slots__ = ('method', 'Tmin', 'Tmax', 'coeffs', 'log', 'error')
+
+    def __init__(self, method, Tmin, Tmax, coeffs, log, error):
+        self.method = method
+        self.Tmin = Tmin
+        self.Tmax = Tmax
+        self.coeffs = tuple(coeffs)
+        self.log = log
+        self.error = error
+
+    @classmethod
+    def from_model(cls, model, rtol=1e-5, method=None):
+        """
+        Return a Tabulation object of the method (defaults to the selected
+        method) of a model with the lowest degree that meets the relative
+        tolerance, or None if the method cannot be tabulated.
+        """
+        if method is None: method = model.method
+        if method is None or method not in model.T_limits: return
+        Tmin, Tmax = model.T_limits[method]
+        if not (np.isfinite(Tmin) and np.isfinite(Tmax) and 0. < Tmin < Tmax): return
+        calculate = model.calculate
+        def f(T):
+            return np.array([calculate(float(i), method) for i in T], dtype=float)
+        try:
+            T_check = np.linspace(Tmin, Tmax, 10 * degrees[-1] + 1)
+            y_check = f(T_check)
+        except:
+            return
+        if not np.isfinite(y_check).all(): return
+        log = bool((y_check > 0.).all() and y_check.max() > log_ratio * y_check.min())
+        fit = (lambda T: np.log(f(T))) if log else f
+        for degree in degrees:
+            try:
+                chebyshev = Chebyshev.interpolate(fit, degree, domain=[Tmin, Tmax])
+            except:
+                return
+            coeffs = cheb2poly(chebyshev.coef)[::-1]
+            values = evaluate(coeffs, T_check, Tmin, Tmax, log)
+            error = relative_error(values, y_check, log)
+            if error <= rtol: return cls(method, Tmin, Tmax, coeffs.tolist(), log, error)
+
+    @property
+    def degree(self):
+        """[int] Degree of interpolating polynomial."""
+        return len(self.coeffs) - 1
+
+    def apply(self, model):
+        """Add the interpolant to the model as the 'TABULATED' method and select it."""
+        # Copies of models share method containers (see TDependentProperty.copy)
+        model.correlations = correlations = model.correlations.copy()
+        model.T_limits = model.T_limits.copy()
+        model.all_methods = model.all_methods.copy()
+        if TABULATED in correlations:
+            del correlations[TABULATED]
+            del model.T_limits[TABULATED]
+            model.all_methods.discard(TABULATED)
+        name = 'exp_stable_polynomial' if self.log else 'stable_polynomial'
+        parameters = name + '_parameters'
+        setattr(model, parameters, getattr(model, parameters, {}).copy())
+        model.add_correlation(TABULATED, name, self.Tmin, self.Tmax, coeffs=list(self.coeffs))
+        model.tabulation = self
+
+    def check(self, model, N=100):
+        """Return the maximum relative error of the interpolant with respect to
+        the original method of the model at `N` temperatures."""
+        T = np.linspace(self.Tmin, self.Tmax, N)
+        calculate = model.calculate
+        exact = np.array([calculate(i, self.method) for i in T])
+        values = np.array([calculate(i, TABULATED) for i in T])
+        return relative_error(values, exact, self.log)
+
+    def to_dict(self):
+        """Return a dictionary of the tabulation data (e.g., for JSON files)."""
+        return {i: getattr(self, i) for i in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, dct):
+        """Return a Tabulation object from a dictionary (see `to_dict`)."""
+        return cls(**dct)
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(method={self.method!r}, T=({self.Tmin:.5g}, {self.Tmax:.5g}), "
+                f"degree={self.degree}, log={self.log}, error={self.error:.2g})")
+
+
+# %% Tabulation of thermo models
+
+def tabulate(self, rtol=1e-5):
+    """
+    Tabulate the selected method by Chebyshev interpolation over its valid
+    temperature range and select the tabulated method. Return the
+    Tabulation object, or None if the method cannot be tabulated within
+    tolerance or is already an inexpensive correlation.
+    """
+    tabulation = self.tabulation
+    if tabulation is not None and self.method == TABULATED: return tabulation
+    method = self.method
+    if method in self.correlations: return
+    tabulation = Tabulation.from_model(self, rtol, method)
+    if tabulation is not None: tabulation.apply(self)
+    return tabulation
+
+def untabulate(self):
+    """Select the original method of a tabulated model."""
+    tabulation = self.tabulation
+    if tabulation is None: return
+    if self.method == TABULATED: self.method = tabulation.method
+    self.tabulation = None
+
+TDependentProperty.tabulation = None
+TDependentProperty.tabulate = tabulate
+TDependentProperty.untabulate = untabulate
@@ -15,7 +15,7 @@
 # https://github.com/CalebBell/chemicals/blob/master/LICENSE.txt for details.
 from thermo.volume import COOLPROP, EOS, IDEAL, NEGLECT_P
 from thermo import (
-    TPDependentProperty,
+    TDependentProperty, TPDependentProperty,
     VaporPressure, 
     EnthalpyVaporization,
     SurfaceTension,
@@ -65,6 +65,7 @@ def method_P(self, method):
             raise ValueError("Pressure dependent method '%s' is not available for this chemical; "
                              "available methods are %s" %(method, self.all_methods_P))
     self._method_P = method
+    TDependentProperty.method_version += 1
 
 TPDependentProperty.method_P = method_P
 
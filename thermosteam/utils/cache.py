@@ -7,8 +7,15 @@
 # for license details.
 """
 """
+from collections import OrderedDict
+from sys import getsizeof
+from hashlib import sha1
+import tempfile
+import shutil
+import pickle
+import os
 
-__all__ = ('Cache', 'trim_cache') 
+__all__ = ('Cache', 'LRUCache', 'MemoryLRUCache', 'PropertyCache', 'DiskCache', 'trim_cache') 
 
 class Cache:
     __slots__ = ('args', 'value')
@@ -36,7 +43,271 @@ class Cache:
             self.value = value = self.load(*self.args)
         return value
     
+class LRUCache(OrderedDict):
+    """
+    Create an LRUCache object, a dictionary that discards the least recently 
+    used items when its size exceeds `maxsize`.
+    
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of items. Defaults to 128.
+    
+    Examples
+    --------
+    >>> from thermosteam.utils import LRUCache
+    >>> cache = LRUCache(2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache['a']
+    1
+    >>> cache['c'] = 3 # Discards 'b', the least recently used item
+    >>> list(cache)
+    ['a', 'c']
+    
+    """
+    __slots__ = ('maxsize',)
+    
+    def __init__(self, maxsize=128):
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def __reduce__(self):
+        return self.__class__, (self.maxsize,), None, None, iter(self.items())
+    
+    def __getitem__(self, key):
+        self.move_to_end(key)
+        return OrderedDict.__getitem__(self, key)
+    
+    def __setitem__(self, key, value):
+        OrderedDict.__setitem__(self, key, value)
+        self.move_to_end(key)
+        if self.__len__() > self.maxsize: self.popitem(False)
+    
+    def get(self, key, default=None):
+        if key in self: 
+            self.move_to_end(key)
+            return OrderedDict.__getitem__(self, key)
+        else:
+            return default
+    
+    def resize(self, maxsize):
+        """Set the maximum number of items, discarding least recently used items if needed."""
+        self.maxsize = maxsize
+        while self.__len__() > maxsize: self.popitem(False)
+    
+class MemoryLRUCache(LRUCache):
+    """
+    Create a MemoryLRUCache object, an LRUCache that also discards the least 
+    recently used items when their estimated memory exceeds `maxmemory`.
+    The memory of an item is estimated once, when first set.
+    
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of items. Defaults to 128.
+    maxmemory : float, optional
+        Maximum estimated memory [bytes]. Defaults to 10 MB.
+    sizeof : Callable[[object], int], optional
+        Function that returns the estimated memory of an item [bytes].
+        Defaults to `sys.getsizeof`.
+    
+    Examples
+    --------
+    >>> from thermosteam.utils import MemoryLRUCache
+    >>> cache = MemoryLRUCache(maxmemory=100, sizeof=len)
+    >>> cache['a'] = 'a' * 60
+    >>> cache['b'] = 'b' * 30
+    >>> cache.memory
+    90
+    >>> cache['c'] = 'c' * 30 # Discards 'a', the least recently used item
+    >>> list(cache), cache.memory
+    (['b', 'c'], 60)
+    
+    """
+    __slots__ = ('maxmemory', 'memory', 'sizes', 'sizeof')
+    
+    def __init__(self, maxsize=128, maxmemory=1e7, sizeof=getsizeof):
+        super().__init__(maxsize)
+        self.maxmemory = maxmemory
+        self.memory = 0
+        self.sizes = {}
+        self.sizeof = sizeof
+    
+    def __reduce__(self):
+        return self.__class__, (self.maxsize, self.maxmemory, self.sizeof), None, None, iter(self.items())
+    
+    def __setitem__(self, key, value):
+        sizes = self.sizes
+        if key in sizes: # Items by key are assumed to have the same size
+            OrderedDict.__setitem__(self, key, value)
+            self.move_to_end(key)
+        else:
+            OrderedDict.__setitem__(self, key, value)
+            sizes[key] = size = self.sizeof(value)
+            self.memory += size
+            self._trim()
+    
+    def __delitem__(self, key):
+        OrderedDict.__delitem__(self, key)
+        self.memory -= self.sizes.pop(key)
+    
+    def pop(self, key, *default):
+        if key in self:
+            value = OrderedDict.__getitem__(self, key)
+            self.__delitem__(key)
+            return value
+        elif default:
+            return default[0]
+        else:
+            raise KeyError(key)
+    
+    def popitem(self, last=True):
+        key, value = OrderedDict.popitem(self, last)
+        self.memory -= self.sizes.pop(key)
+        return key, value
+    
+    def clear(self):
+        OrderedDict.clear(self)
+        self.sizes.clear()
+        self.memory = 0
+    
+    def _trim(self):
+        while self.__len__() > self.maxsize or (self.memory > self.maxmemory and self.__len__() > 1):
+            self.popitem(False)
+    
+    def resize(self, maxsize=None, maxmemory=None):
+        """Set the maximum number of items and/or estimated memory [bytes], discarding least recently used items if needed."""
+        if maxsize is not None: self.maxsize = maxsize
+        if maxmemory is not None: self.maxmemory = maxmemory
+        self._trim()
+    
+class PropertyCache(LRUCache):
+    """
+    Create a PropertyCache object, an LRUCache of property values by
+    thermodynamic state (e.g., phase, temperature, pressure, and composition).
+    Streams with the same thermodynamic property package may share a 
+    PropertyCache object.
+    
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of states. Defaults to 8.
+    
+    Examples
+    --------
+    >>> import thermosteam as tmo
+    >>> from thermosteam.utils import PropertyCache
+    >>> tmo.settings.set_thermo(['Water'], cache=True)
+    >>> PropertyCache.counting = True
+    >>> s = tmo.Stream(None, Water=1, T=300)
+    >>> for T in (300, 350, 300, 350): 
+    ...     s.T = T
+    ...     Cn = s.Cn # Second time at each state is a hit
+    >>> s.property_cache.hits, s.property_cache.misses
+    (2, 2)
+    >>> PropertyCache.counting = False
+    
+    """
+    __slots__ = ('hits', 'misses')
+    
+    #: Whether to count hits and misses of property lookups (e.g., for reporting metrics).
+    counting = False
+    
+    def __init__(self, maxsize=8):
+        super().__init__(maxsize)
+        self.hits = self.misses = 0
+    
+    def state(self, key):
+        """Return dictionary of property values at given state."""
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = values = {}
+            return values
+    
+    def reset_counters(self):
+        """Reset hit and miss counters."""
+        self.hits = self.misses = 0
+    
+    @property
+    def hit_rate(self):
+        """Fraction of property lookups that were hits."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.
+    
+class DiskCache:
+    """
+    Create a DiskCache object that stores pickled objects as files in a
+    directory. Objects are stored in a subdirectory named by the `version`
+    so that objects pickled by other versions are never loaded. Files are 
+    written atomically so that many processes may share the same cache.
+    
+    Parameters
+    ----------
+    path : str
+        Directory of cache.
+    version : str
+        Version of cached objects (e.g., of packages that create them).
+    
+    Examples
+    --------
+    >>> import tempfile
+    >>> from thermosteam.utils import DiskCache
+    >>> cache = DiskCache(tempfile.mkdtemp(), 'v1')
+    >>> cache[('Water', 'g')] = [1, 2]
+    >>> cache.get(('Water', 'g'))
+    [1, 2]
+    >>> DiskCache(cache.root, 'v2').get(('Water', 'g')) is None
+    True
+    >>> cache.clear()
+    >>> cache.get(('Water', 'g')) is None
+    True
+    
+    """
+    __slots__ = ('root', 'version', 'path')
+    
+    def __init__(self, path, version):
+        self.root = path
+        self.version = version
+        self.path = os.path.join(path, version)
+    
+    def file(self, key):
+        """Return the file name of a key (any object with a deterministic representation)."""
+        return os.path.join(self.path, sha1(repr(key).encode()).hexdigest() + '.pkl')
+    
+    def get(self, key, default=None):
+        """Return the object stored by key, or `default` if missing or unreadable."""
+        try:
+            with open(self.file(key), 'rb') as f: return pickle.load(f)
+        except Exception:
+            return default
+    
+    def __setitem__(self, key, value):
+        # Caching is best effort (e.g., on read-only file systems)
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            f = tempfile.NamedTemporaryFile('wb', dir=self.path, delete=False)
+        except OSError:
+            return
+        try:
+            with f: pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, self.file(key))
+        except Exception:
+            try: os.remove(f.name)
+            except OSError: pass
+    
+    def __contains__(self, key):
+        return os.path.exists(self.file(key))
+    
+    def clear(self):
+        """Remove all objects of this version."""
+        shutil.rmtree(self.path, ignore_errors=True)
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.root!r}, {self.version!r})"
+    
 def trim_cache(cache): # pragma: no cover
     if cache.__len__() > 500: 
         iter = cache.__iter__()
-        for i in 100: del cache[iter.__next__()]
\ No newline at end of file
+        for i in [iter.__next__() for i in range(100)]: del cache[i]
\ No newline at end of file
@@ -17,6 +17,7 @@ from collections.abc import Iterable
 from math import floor, log10
 from inspect import signature
 from types import FunctionType
+from importlib import import_module
 
 __all__ = (
     'extended_signature',
@@ -36,8 +37,56 @@ __all__ = (
     'roundsigfigs',
     'array_roundsigfigs',
     'docround',
+    'LazyModule',
 )
 
+# %% Lazy imports
+
+class LazyModule:
+    """
+    Create a LazyModule object, a proxy that imports a module on first
+    attribute access (e.g., to avoid importing plotting libraries when
+    thermosteam is imported).
+    
+    Parameters
+    ----------
+    name : str
+        Name of module.
+    setup : function(module), optional
+        Called once after the module is imported.
+    
+    Examples
+    --------
+    >>> from thermosteam.utils import LazyModule
+    >>> json = LazyModule('json')
+    >>> json
+    <LazyModule: json (not imported)>
+    >>> json.dumps([1])
+    '[1]'
+    
+    """
+    __slots__ = ('_name', '_setup', '_module')
+    
+    def __init__(self, name, setup=None):
+        self._name = name
+        self._setup = setup
+        self._module = None
+    
+    def _load(self):
+        module = self._module
+        if module is None:
+            self._module = module = import_module(self._name)
+            if self._setup is not None: self._setup(module)
+        return module
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+    
+    def __repr__(self):
+        status = '' if self._module else ' (not imported)'
+        return f"<{type(self).__name__}: {self._name}{status}>"
+    
+
 # %% Function signature
 
 def extended_signature(f, g):
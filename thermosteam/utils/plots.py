@@ -8,12 +8,13 @@
 """
 """
 
-import matplotlib.pyplot as plt
+import sys
 from typing import Iterable
-import matplotlib.ticker as ticker
+from .misc import LazyModule
 import numpy as np
 
 __all__ = (
+    'set_facecolors',
     'set_font',
     'set_figure_size',
     'style_axis',
@@ -24,12 +25,26 @@ __all__ = (
     'set_axes_ylabels',
 )   
 
-plt.rcParams.update({
-    "figure.facecolor": (1, 1, 1, 0.95),
-    "axes.facecolor": (1, 1, 1, 0.95),
-    "legend.facecolor": (1, 1, 1, 0.95),
-    "savefig.facecolor": (1, 1, 1, 0.95),
-})
+def set_facecolors():
+    """
+    Set thermosteam's default (nearly opaque white) facecolors of figures,
+    axes, and legends in matplotlib's rcParams. Matplotlib is not imported 
+    with thermosteam, so these defaults are only set when thermosteam first
+    plots or if matplotlib was imported before thermosteam; call this 
+    function to apply them to plots made directly with matplotlib.
+    """
+    import matplotlib
+    matplotlib.rcParams.update({
+        "figure.facecolor": (1, 1, 1, 0.95),
+        "axes.facecolor": (1, 1, 1, 0.95),
+        "legend.facecolor": (1, 1, 1, 0.95),
+        "savefig.facecolor": (1, 1, 1, 0.95),
+    })
+
+# Matplotlib is only imported when plotting
+plt = LazyModule('matplotlib.pyplot', lambda plt: set_facecolors())
+ticker = LazyModule('matplotlib.ticker')
+if 'matplotlib' in sys.modules: set_facecolors()
 
 def set_font(size=8, family='sans-serif', font='Arial'):
     import matplotlib